@@ -4,23 +4,17 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
 from bot.keyboards.admin import get_groups_selection_keyboard
-from services.user_manager import UserManager
+from services.async_db import AsyncService
 from states.admin import AdminStates
 
 router = Router()
 
-@router.message(Command("creategroup"))
+@router.message(Command("creategroup"), flags={"role": "admin"})
 async def cmd_create_group(message: Message, state: FSMContext):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
     await state.set_state(AdminStates.creating_group)
     await message.answer("Введите название для новой группы:")
 
-@router.message(F.text == "Создать группу")
+@router.message(F.text == "Создать группу", flags={"role": "admin"})
 async def create_group_button(message: Message, state: FSMContext):
     await cmd_create_group(message, state)
 
@@ -40,21 +34,18 @@ async def create_group_callback(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @router.message(AdminStates.creating_group)
-async def process_new_group(message: Message, state: FSMContext):
+async def process_new_group(message: Message, state: FSMContext, user_manager: AsyncService):
     group_name = message.text.strip()
     if not group_name:
         await message.answer("Название группы не может быть пустым. Введите название:")
         return
 
-    user_manager = UserManager()
-
-    if user_manager.create_group(group_name):
+    if await user_manager.create_group(group_name):
         await message.answer(f"Группа '{group_name}' создана!")
 
-        groups = user_manager.get_all_groups()
         await message.answer(
             "Выберите группу для просмотра:",
-            reply_markup=get_groups_selection_keyboard("group_info")
+            reply_markup=get_groups_selection_keyboard(await user_manager.get_groups_page(), "group_info")
         )
     else:
         await message.answer("Ошибка при создании группы. Возможно, группа с таким названием уже существует.")
@@ -62,7 +53,7 @@ async def process_new_group(message: Message, state: FSMContext):
     await state.clear()
 
 @router.message(AdminStates.creating_group_for_user)
-async def process_new_group_for_user(message: Message, state: FSMContext):
+async def process_new_group_for_user(message: Message, state: FSMContext, user_manager: AsyncService):
     group_name = message.text.strip()
     data = await state.get_data()
     user_telegram_id = data.get('approving_user_id')
@@ -71,27 +62,25 @@ async def process_new_group_for_user(message: Message, state: FSMContext):
         await message.answer("Название группы не может быть пустым. Введите название:")
         return
 
-    user_manager = UserManager()
-
-    if user_manager.create_group(group_name):
-        groups = user_manager.get_all_groups()
+    if await user_manager.create_group(group_name):
+        groups = await user_manager.get_all_groups()
         new_group = next((g for g in groups if g['name'] == group_name), None)
 
         if new_group and user_telegram_id:
-            user_data = user_manager.get_user(user_telegram_id)
+            user_data = await user_manager.get_user(user_telegram_id)
 
             if not user_data:
                 await message.answer("Пользователь не найден")
                 await state.clear()
                 return
 
-            user_manager.approve_user(user_telegram_id)
+            await user_manager.approve_user(user_telegram_id)
 
             if user_data['role'] == 'teacher':
-                success = user_manager.assign_teacher_to_group(user_data['id'], new_group['id'])
+                success = await user_manager.assign_teacher_to_group(user_data['id'], new_group['id'])
                 action_text = "назначен учителем"
             else:
-                success = user_manager.assign_user_to_group(user_data['id'], new_group['id'])
+                success = await user_manager.assign_user_to_group(user_data['id'], new_group['id'])
                 action_text = "добавлен в"
 
             if success:
@@ -109,15 +98,8 @@ async def process_new_group_for_user(message: Message, state: FSMContext):
 
     await state.clear()
 
-@router.callback_query(F.data == "cmd_creategroup")
+@router.callback_query(F.data == "cmd_creategroup", flags={"role": "admin"})
 async def cmd_creategroup_callback(callback: CallbackQuery, state: FSMContext):
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
     await state.set_state(AdminStates.creating_group)
     await callback.message.answer("Введите название для новой группы:")
     await callback.answer()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
+from aiogram.exceptions import TelegramBadRequest
 
 from bot.keyboards.admin import (
     get_groups_selection_keyboard, get_group_management_keyboard,
@@ -8,40 +9,33 @@ from bot.keyboards.admin import (
     get_teachers_selection_keyboard, get_students_selection_keyboard,
     get_confirmation_keyboard
 )
-from services.user_manager import UserManager
+from bot.keyboards.pagination import parse_page_callback
+from services.async_db import AsyncService
 from states.admin import AdminStates
 
 router = Router()
 
-@router.message(F.text == "Группы")
-async def admin_groups(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
+@router.message(F.text == "Группы", flags={"role": "admin"})
+async def admin_groups(message: Message, user_manager: AsyncService):
+    page = await user_manager.get_groups_page()
 
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
-    groups = user_manager.get_all_groups()
-
-    if not groups:
+    if not page['items']:
         await message.answer("Нет созданных групп")
         return
 
     await message.answer(
         "Выберите группу для просмотра:",
-        reply_markup=get_groups_selection_keyboard("group_info")
+        reply_markup=get_groups_selection_keyboard(page, "group_info")
     )
 
 @router.callback_query(F.data.startswith("group_info_"))
-async def group_info(callback: CallbackQuery):
+async def group_info(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
-    await show_group_info(callback.message, group_id)
+    await show_group_info(callback.message, group_id, user_manager)
     await callback.answer()
 
-async def show_group_info(message: Message, group_id: int):
-    user_manager = UserManager()
-
-    group_details = user_manager.get_group_with_details(group_id)
+async def show_group_info(message: Message, group_id: int, user_manager: AsyncService):
+    group_details = await user_manager.get_group_with_details(group_id)
     if not group_details:
         await message.answer("Группа не найдена")
         return
@@ -79,11 +73,10 @@ async def show_group_info(message: Message, group_id: int):
         )
 
 @router.callback_query(F.data.startswith("group_members_"))
-async def group_members(callback: CallbackQuery):
+async def group_members(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
-    user_manager = UserManager()
 
-    group_details = user_manager.get_group_with_details(group_id)
+    group_details = await user_manager.get_group_with_details(group_id)
     if not group_details:
         await callback.answer("Группа не найдена")
         return
@@ -111,11 +104,10 @@ async def group_members(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data.startswith("manage_students_"))
-async def manage_students(callback: CallbackQuery):
+async def manage_students(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
-    user_manager = UserManager()
 
-    group_details = user_manager.get_group_with_details(group_id)
+    group_details = await user_manager.get_group_with_details(group_id)
     if not group_details:
         await callback.answer("Группа не найдена")
         return
@@ -131,34 +123,29 @@ async def manage_students(callback: CallbackQuery):
     await callback.message.edit_text(
         f"Удаление учеников из группы {group_details['name']}:\n\n"
         "Нажмите на ученика, которого хотите удалить из группы:",
-        reply_markup=get_students_management_keyboard(group_id, group_details['students'])
+        reply_markup=get_students_management_keyboard(group_id, await user_manager.get_group_students_page(group_id))
     )
     await callback.answer()
 
 @router.callback_query(F.data.startswith("remove_student_"))
-async def remove_student(callback: CallbackQuery):
+async def remove_student(callback: CallbackQuery, user_manager: AsyncService):
     data_parts = callback.data.split("_")
     group_id = int(data_parts[2])
     student_id = int(data_parts[3])
 
-    user_manager = UserManager()
-
-    student_data = user_manager.db.fetch_one(
-        "SELECT * FROM users WHERE id = ?",
-        (student_id,)
-    )
+    student_data = await user_manager.get_user_by_id(student_id)
 
     if not student_data:
         await callback.answer("Ученик не найден")
         return
 
-    if user_manager.remove_student_from_group(student_id):
+    if await user_manager.remove_student_from_group(student_id):
         await callback.answer(f"Ученик {student_data['full_name']} удален из группы!", show_alert=True)
 
-        group_details = user_manager.get_group_with_details(group_id)
-        if group_details and group_details['students']:
+        page = await user_manager.get_group_students_page(group_id)
+        if page['items']:
             await callback.message.edit_reply_markup(
-                reply_markup=get_students_management_keyboard(group_id, group_details['students'])
+                reply_markup=get_students_management_keyboard(group_id, page)
             )
         else:
             await callback.message.edit_text(
@@ -169,20 +156,59 @@ async def remove_student(callback: CallbackQuery):
         await callback.answer("Ошибка при удалении ученика из группы", show_alert=True)
 
 @router.callback_query(F.data == "back_to_groups")
-async def back_to_groups(callback: CallbackQuery):
-    user_manager = UserManager()
-    groups = user_manager.get_all_groups()
+async def back_to_groups(callback: CallbackQuery, user_manager: AsyncService):
+    page = await user_manager.get_groups_page()
 
-    if not groups:
+    if not page['items']:
         await callback.message.edit_text("Нет созданных групп")
         return
 
     await callback.message.edit_text(
         "Выберите группу для просмотра:",
-        reply_markup=get_groups_selection_keyboard("group_info")
+        reply_markup=get_groups_selection_keyboard(page, "group_info")
     )
     await callback.answer()
 
+@router.callback_query(F.data.regexp(r"^pg:(groups|teachers|students|members):"), flags={"role": "admin"})
+async def change_page(callback: CallbackQuery, user_manager: AsyncService):
+    list_name, scope, direction, cursor = parse_page_callback(callback.data)
+    after_id, before_id = (cursor, None) if direction == "next" else (None, cursor)
+
+    if list_name == "groups":
+        action, user_id = scope.split(":")
+        page = await user_manager.get_groups_page(after_id, before_id)
+        if not page['items']:
+            page = await user_manager.get_groups_page()
+        reply_markup = get_groups_selection_keyboard(page, action, int(user_id) or None)
+    elif list_name == "teachers":
+        group_data = await user_manager.get_group(int(scope))
+        if not group_data:
+            await callback.answer("Группа не найдена")
+            return
+        page = await user_manager.get_available_teachers_page(after_id, before_id)
+        if not page['items']:
+            page = await user_manager.get_available_teachers_page()
+        reply_markup = get_teachers_selection_keyboard(
+            group_data['id'], page, has_teacher=bool(group_data.get('teacher_id'))
+        )
+    elif list_name == "students":
+        page = await user_manager.get_students_without_groups_page(after_id, before_id)
+        if not page['items']:
+            page = await user_manager.get_students_without_groups_page()
+        reply_markup = get_students_selection_keyboard(int(scope), page)
+    else:
+        page = await user_manager.get_group_students_page(int(scope), after_id, before_id)
+        if not page['items']:
+            page = await user_manager.get_group_students_page(int(scope))
+        reply_markup = get_students_management_keyboard(int(scope), page)
+
+    try:
+        await callback.message.edit_reply_markup(reply_markup=reply_markup)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in e.message:
+            raise
+    await callback.answer()
+
 @router.callback_query(F.data.startswith("edit_group_name_"))
 async def edit_group_name(callback: CallbackQuery, state: FSMContext):
     group_id = int(callback.data.split("_")[3])
@@ -194,7 +220,7 @@ async def edit_group_name(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @router.message(AdminStates.editing_group_name)
-async def process_edit_group_name(message: Message, state: FSMContext):
+async def process_edit_group_name(message: Message, state: FSMContext, user_manager: AsyncService):
     new_name = message.text.strip()
     data = await state.get_data()
     group_id = data.get('group_id')
@@ -203,44 +229,44 @@ async def process_edit_group_name(message: Message, state: FSMContext):
         await message.answer("Название группы не может быть пустым. Введите название:")
         return
 
-    user_manager = UserManager()
-
-    if user_manager.update_group_name(group_id, new_name):
+    if await user_manager.update_group_name(group_id, new_name):
         await message.answer(f"Название группы изменено на '{new_name}'!")
-        await show_group_info(message, group_id)
+        await show_group_info(message, group_id, user_manager)
     else:
         await message.answer("Ошибка при изменении названия группы.")
-        await show_group_info(message, group_id)
+        await show_group_info(message, group_id, user_manager)
 
     await state.clear()
 
 @router.callback_query(F.data.startswith("assign_teacher_"))
-async def assign_teacher(callback: CallbackQuery, state: FSMContext):
+async def assign_teacher(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
 
     await state.update_data(current_group_id=group_id)
 
-    user_manager = UserManager()
-    group_data = user_manager.get_group(group_id)
+    group_data = await user_manager.get_group(group_id)
     if not group_data:
         await callback.answer("Группа не найдена")
         return
 
     await callback.message.edit_text(
         f"Выберите учителя для группы {group_data['name']}:",
-        reply_markup=get_teachers_selection_keyboard(group_id)
+        reply_markup=get_teachers_selection_keyboard(
+            group_id,
+            await user_manager.get_available_teachers_page(),
+            has_teacher=bool(group_data.get('teacher_id'))
+        )
     )
     await callback.answer()
 
 @router.callback_query(F.data.startswith("select_teacher_"))
-async def select_teacher(callback: CallbackQuery):
+async def select_teacher(callback: CallbackQuery, user_manager: AsyncService):
     data_parts = callback.data.split("_")
     group_id = int(data_parts[2])
     teacher_id = int(data_parts[3])
 
-    user_manager = UserManager()
-    group_data = user_manager.get_group(group_id)
-    teacher_data = user_manager.get_user_by_id(teacher_id)
+    group_data = await user_manager.get_group(group_id)
+    teacher_data = await user_manager.get_user_by_id(teacher_id)
 
     if not group_data:
         await callback.answer("Группа не найдена")
@@ -250,58 +276,56 @@ async def select_teacher(callback: CallbackQuery):
         await callback.answer("Учитель не найден")
         return
 
-    if user_manager.assign_teacher_to_group(teacher_id, group_id):
+    if await user_manager.assign_teacher_to_group(teacher_id, group_id):
         await callback.message.edit_text(
             f"Учитель {teacher_data['full_name']} назначен на группу {group_data['name']}!"
         )
-        await show_group_info(callback.message, group_id)
+        await show_group_info(callback.message, group_id, user_manager)
     else:
         await callback.message.edit_text(
             f"Ошибка при назначении учителя {teacher_data['full_name']} на группу {group_data['name']}!"
         )
-        await show_group_info(callback.message, group_id)
+        await show_group_info(callback.message, group_id, user_manager)
 
     await callback.answer()
 
 @router.callback_query(F.data.startswith("remove_teacher_"))
-async def remove_teacher(callback: CallbackQuery):
+async def remove_teacher(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
 
-    user_manager = UserManager()
-    group_data = user_manager.get_group(group_id)
+    group_data = await user_manager.get_group(group_id)
 
     if not group_data:
         await callback.answer("Группа не найдена")
         return
 
-    if user_manager.update_group_teacher(group_id, None):
+    if await user_manager.update_group_teacher(group_id, None):
         await callback.message.edit_text(
             f"Учитель удален из группы {group_data['name']}!"
         )
-        await show_group_info(callback.message, group_id)
+        await show_group_info(callback.message, group_id, user_manager)
     else:
         await callback.message.edit_text(
             f"Ошибка при удалении учителя из группы {group_data['name']}!"
         )
-        await show_group_info(callback.message, group_id)
+        await show_group_info(callback.message, group_id, user_manager)
 
     await callback.answer()
 
 @router.callback_query(F.data.startswith("add_students_"))
-async def add_students(callback: CallbackQuery, state: FSMContext):
+async def add_students(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
 
     await state.update_data(current_group_id=group_id)
 
-    user_manager = UserManager()
-    group_data = user_manager.get_group(group_id)
+    group_data = await user_manager.get_group(group_id)
     if not group_data:
         await callback.answer("Группа не найдена")
         return
 
-    students = user_manager.get_students_without_groups()
+    page = await user_manager.get_students_without_groups_page()
 
-    if not students:
+    if not page['items']:
         await callback.message.edit_text(
             f"Нет учеников без групп для добавления в {group_data['name']}.\n\n"
             "Все ученики уже распределены по группам.",
@@ -312,19 +336,18 @@ async def add_students(callback: CallbackQuery, state: FSMContext):
 
     await callback.message.edit_text(
         f"Выберите учеников для добавления в группу {group_data['name']}:",
-        reply_markup=get_students_selection_keyboard(group_id)
+        reply_markup=get_students_selection_keyboard(group_id, page)
     )
     await callback.answer()
 
 @router.callback_query(F.data.startswith("select_student_"))
-async def select_student(callback: CallbackQuery):
+async def select_student(callback: CallbackQuery, user_manager: AsyncService):
     data_parts = callback.data.split("_")
     group_id = int(data_parts[2])
     student_id = int(data_parts[3])
 
-    user_manager = UserManager()
-    group_data = user_manager.get_group(group_id)
-    student_data = user_manager.get_user_by_id(student_id)
+    group_data = await user_manager.get_group(group_id)
+    student_data = await user_manager.get_user_by_id(student_id)
 
     if not group_data:
         await callback.answer("Группа не найдена", show_alert=True)
@@ -334,17 +357,17 @@ async def select_student(callback: CallbackQuery):
         await callback.answer("Ученик не найден", show_alert=True)
         return
 
-    if user_manager.assign_user_to_group(student_id, group_id):
+    if await user_manager.assign_user_to_group(student_id, group_id):
         await callback.answer(
             f"Ученик {student_data['full_name']} добавлен в группу {group_data['name']}!",
             show_alert=False
         )
 
-        students = user_manager.get_students_without_groups()
+        page = await user_manager.get_students_without_groups_page()
 
-        if students:
+        if page['items']:
             await callback.message.edit_reply_markup(
-                reply_markup=get_students_selection_keyboard(group_id)
+                reply_markup=get_students_selection_keyboard(group_id, page)
             )
         else:
             await callback.message.edit_text(
@@ -358,16 +381,15 @@ async def select_student(callback: CallbackQuery):
         )
 
 @router.callback_query(F.data.startswith("delete_group_"))
-async def delete_group_confirmation(callback: CallbackQuery):
+async def delete_group_confirmation(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
-    user_manager = UserManager()
 
-    group_data = user_manager.get_group(group_id)
+    group_data = await user_manager.get_group(group_id)
     if not group_data:
         await callback.answer("Группа не найдена")
         return
 
-    students = user_manager.get_group_students(group_id)
+    students = await user_manager.get_group_students(group_id)
 
     warning_text = ""
     if students:
@@ -380,23 +402,22 @@ async def delete_group_confirmation(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data.startswith("confirm_delete_group_"))
-async def confirm_delete_group(callback: CallbackQuery):
+async def confirm_delete_group(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[3])
-    user_manager = UserManager()
 
-    group_data = user_manager.get_group(group_id)
+    group_data = await user_manager.get_group(group_id)
     if not group_data:
         await callback.answer("Группа не найдена")
         return
 
-    if user_manager.delete_group(group_id):
+    if await user_manager.delete_group(group_id):
         await callback.message.edit_text(f"Группа '{group_data['name']}' успешно удалена!")
 
-        groups = user_manager.get_all_groups()
-        if groups:
+        page = await user_manager.get_groups_page()
+        if page['items']:
             await callback.message.answer(
                 "Выберите группу для просмотра:",
-                reply_markup=get_groups_selection_keyboard("group_info")
+                reply_markup=get_groups_selection_keyboard(page, "group_info")
             )
         else:
             await callback.message.answer("Нет созданных групп")
@@ -406,17 +427,16 @@ async def confirm_delete_group(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data.startswith("cancel_delete_group_"))
-async def cancel_delete_group(callback: CallbackQuery):
+async def cancel_delete_group(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[3])
-    await group_info(callback)
+    await group_info(callback, user_manager)
     await callback.answer()
 
 @router.callback_query(F.data.startswith("group_stats_"))
-async def group_stats(callback: CallbackQuery):
+async def group_stats(callback: CallbackQuery, user_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
-    user_manager = UserManager()
 
-    group_details = user_manager.get_group_with_details(group_id)
+    group_details = await user_manager.get_group_with_details(group_id)
     if not group_details:
         await callback.answer("Группа не найдена")
         return
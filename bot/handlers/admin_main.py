@@ -3,17 +3,14 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 
 from bot.keyboards.admin import get_admin_keyboard, get_reports_keyboard
-from services.user_manager import UserManager
+from services.async_db import AsyncService
 import logging
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 @router.message(Command("admin"))
-async def admin_panel(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
+async def admin_panel(message: Message, user: dict):
     if not user:
         await message.answer("Пользователь не найден в системе")
         return
@@ -31,15 +28,9 @@ async def admin_panel(message: Message):
         reply_markup=get_admin_keyboard()
     )
 
-@router.message(F.text == "Отчеты")
-async def admin_reports(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
-    stats = user_manager.get_system_stats()
+@router.message(F.text == "Отчеты", flags={"role": "admin"})
+async def admin_reports(message: Message, user_manager: AsyncService):
+    stats = await user_manager.get_system_stats()
 
     reports_text = (
         "Отчеты системы:\n\n"
@@ -54,10 +45,7 @@ async def admin_reports(message: Message):
     await message.answer(reports_text, reply_markup=get_reports_keyboard())
 
 @router.message(Command("status"))
-async def check_status(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
+async def check_status(message: Message, user: dict):
     if user:
         status_info = (
             f"Ваш статус:\n"
@@ -1,55 +1,64 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
+from aiogram.exceptions import TelegramBadRequest
 
-from services.user_manager import UserManager
-from services.schedule_manager import ScheduleManager
-from services.subjects_manager import SubjectsManager
+from bot.keyboards.pagination import get_paginated_keyboard, parse_page_callback
+from services.async_db import AsyncService
 from states.admin import AdminStates
 
 router = Router()
 
-@router.message(F.text == "Управление расписанием")
-async def manage_schedule(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
+@router.message(F.text == "Управление расписанием", flags={"role": "admin"})
+async def manage_schedule(message: Message, user_manager: AsyncService):
+    page = await user_manager.get_groups_page()
 
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
-    groups = user_manager.get_all_groups()
-
-    if not groups:
+    if not page['items']:
         await message.answer("Нет созданных групп для управления расписанием")
         return
 
-    keyboard = []
-    for group in groups:
-        keyboard.append([
-            InlineKeyboardButton(
-                text=group['name'],
-                callback_data=f"manage_schedule_{group['id']}"
-            )
-        ])
-
     await message.answer(
         "Выберите группу для управления расписанием:",
-        reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+        reply_markup=get_schedule_groups_keyboard(page)
     )
 
+def get_schedule_groups_keyboard(page: dict) -> InlineKeyboardMarkup:
+    return get_paginated_keyboard(
+        page,
+        lambda group: InlineKeyboardButton(text=group['name'], callback_data=f"manage_schedule_{group['id']}"),
+        "schedule"
+    )
+
+@router.callback_query(F.data.startswith("pg:schedule:"), flags={"role": "admin"})
+async def change_schedule_groups_page(callback: CallbackQuery, user_manager: AsyncService):
+    _, _, direction, cursor = parse_page_callback(callback.data)
+    if direction == "next":
+        page = await user_manager.get_groups_page(after_id=cursor)
+    else:
+        page = await user_manager.get_groups_page(before_id=cursor)
+
+    if not page['items']:
+        page = await user_manager.get_groups_page()
+
+    try:
+        await callback.message.edit_reply_markup(reply_markup=get_schedule_groups_keyboard(page))
+    except TelegramBadRequest as e:
+        if "message is not modified" not in e.message:
+            raise
+    await callback.answer()
+
 @router.callback_query(F.data.startswith("manage_schedule_"))
-async def manage_group_schedule(callback: CallbackQuery, state: FSMContext):
+async def manage_group_schedule(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService,
+                                schedule_manager: AsyncService):
     group_id = int(callback.data.split("_")[2])
 
-    user_manager = UserManager()
-    group = user_manager.get_group(group_id)
+    group = await user_manager.get_group(group_id)
 
     if not group:
         await callback.answer("Группа не найдена")
         return
 
-    schedule_manager = ScheduleManager()
-    schedule = schedule_manager.get_group_schedule(group_id)
+    schedule = await schedule_manager.get_group_schedule(group_id)
 
     schedule_text = f"Расписание группы {group['name']}:\n\n"
 
@@ -138,7 +147,7 @@ async def process_day_selection(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @router.message(AdminStates.adding_schedule_time)
-async def process_time_input(message: Message, state: FSMContext):
+async def process_time_input(message: Message, state: FSMContext, subjects_manager: AsyncService):
     time_input = message.text.strip()
 
     if not ("-" in time_input and ":" in time_input):
@@ -171,8 +180,7 @@ async def process_time_input(message: Message, state: FSMContext):
     await state.update_data(start_time=start_time.strip(), end_time=end_time.strip())
     await state.set_state(AdminStates.adding_schedule_subject)
 
-    subjects_manager = SubjectsManager()
-    subjects = subjects_manager.get_all_subjects()
+    subjects = await subjects_manager.get_all_subjects()
 
     if subjects:
         keyboard = []
@@ -193,7 +201,8 @@ async def process_time_input(message: Message, state: FSMContext):
         await message.answer("Введите название предмета для занятия:")
 
 @router.callback_query(F.data.startswith("subject_"))
-async def process_subject_selection(callback: CallbackQuery, state: FSMContext):
+async def process_subject_selection(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService,
+                                    subjects_manager: AsyncService, schedule_manager: AsyncService):
     subject_data = callback.data.replace("subject_", "")
 
     if subject_data == "manual":
@@ -202,12 +211,11 @@ async def process_subject_selection(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    subjects_manager = SubjectsManager()
-    subject = subjects_manager.get_subject(int(subject_data))
+    subject = await subjects_manager.get_subject(int(subject_data))
 
     if subject:
         await state.update_data(subject=subject['name'])
-        await complete_schedule_creation(callback.message, state)
+        await complete_schedule_creation(callback.message, state, user_manager, schedule_manager)
     else:
         await callback.message.edit_text("Предмет не найден. Введите название предмета:")
         await state.set_state(AdminStates.adding_schedule_subject)
@@ -215,7 +223,8 @@ async def process_subject_selection(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @router.message(AdminStates.adding_schedule_subject)
-async def process_subject_input(message: Message, state: FSMContext):
+async def process_subject_input(message: Message, state: FSMContext, user_manager: AsyncService,
+                                schedule_manager: AsyncService):
     subject_name = message.text.strip()
 
     if not subject_name:
@@ -223,9 +232,10 @@ async def process_subject_input(message: Message, state: FSMContext):
         return
 
     await state.update_data(subject=subject_name)
-    await complete_schedule_creation(message, state)
+    await complete_schedule_creation(message, state, user_manager, schedule_manager)
 
-async def complete_schedule_creation(message: Message, state: FSMContext):
+async def complete_schedule_creation(message: Message, state: FSMContext, user_manager: AsyncService,
+                                     schedule_manager: AsyncService):
     data = await state.get_data()
 
     group_id = data.get('group_id')
@@ -239,8 +249,7 @@ async def complete_schedule_creation(message: Message, state: FSMContext):
         await state.clear()
         return
 
-    schedule_manager = ScheduleManager()
-    success = schedule_manager.add_schedule_item(
+    success = await schedule_manager.add_schedule_item(
         group_id=group_id,
         day_of_week=day_of_week,
         start_time=start_time,
@@ -268,18 +277,16 @@ async def complete_schedule_creation(message: Message, state: FSMContext):
             f"Предмет: {subject}"
         )
 
-        await show_updated_schedule(message, group_id)
+        await show_updated_schedule(message, group_id, user_manager, schedule_manager)
     else:
         await message.answer("Ошибка при добавлении занятия. Попробуйте еще раз.")
 
     await state.clear()
 
-async def show_updated_schedule(message: Message, group_id: int):
-    user_manager = UserManager()
-    schedule_manager = ScheduleManager()
-
-    group = user_manager.get_group(group_id)
-    schedule = schedule_manager.get_group_schedule(group_id)
+async def show_updated_schedule(message: Message, group_id: int, user_manager: AsyncService,
+                                schedule_manager: AsyncService):
+    group = await user_manager.get_group(group_id)
+    schedule = await schedule_manager.get_group_schedule(group_id)
 
     schedule_text = f"Расписание группы {group['name']}:\n\n"
 
@@ -317,7 +324,7 @@ async def show_updated_schedule(message: Message, group_id: int):
     )
 
 @router.callback_query(F.data == "back_to_schedule_management")
-async def back_to_schedule_management(callback: CallbackQuery, state: FSMContext):
+async def back_to_schedule_management(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService):
     await state.clear()
-    await manage_schedule(callback.message)
+    await manage_schedule(callback.message, user_manager)
     await callback.answer()
\ No newline at end of file
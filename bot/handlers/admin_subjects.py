@@ -3,23 +3,15 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKe
 from aiogram.fsm.context import FSMContext
 from aiogram.filters import Command
 
-from services.subjects_manager import SubjectsManager
-from services.user_manager import UserManager
+from services.async_db import AsyncService
 from states.admin import AdminStates
 from bot.keyboards.admin import get_subjects_management_keyboard, get_confirmation_keyboard
 
 router = Router()
 
-@router.message(Command("subjects"))
-async def manage_subjects(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
-    subjects_manager = SubjectsManager()
-    subjects = subjects_manager.get_all_subjects()
+@router.message(Command("subjects"), flags={"role": "admin"})
+async def manage_subjects(message: Message, subjects_manager: AsyncService):
+    subjects = await subjects_manager.get_all_subjects()
 
     if not subjects:
         await message.answer(
@@ -46,19 +38,12 @@ async def manage_subjects(message: Message):
         reply_markup=get_subjects_management_keyboard()
     )
 
-@router.message(F.text == "Предметы")
-async def subjects_button(message: Message):
-    await manage_subjects(message)
+@router.message(F.text == "Предметы", flags={"role": "admin"})
+async def subjects_button(message: Message, subjects_manager: AsyncService):
+    await manage_subjects(message, subjects_manager)
 
-@router.callback_query(F.data == "add_subject")
+@router.callback_query(F.data == "add_subject", flags={"role": "admin"})
 async def add_subject_callback(callback: CallbackQuery, state: FSMContext):
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
     await state.set_state(AdminStates.adding_subject_name)
     await callback.message.answer("Введите название нового предмета:")
     await callback.answer()
@@ -77,7 +62,7 @@ async def process_subject_name(message: Message, state: FSMContext):
     await message.answer("Введите описание предмета (или отправьте '-' чтобы пропустить):")
 
 @router.message(AdminStates.adding_subject_description)
-async def process_subject_description(message: Message, state: FSMContext):
+async def process_subject_description(message: Message, state: FSMContext, subjects_manager: AsyncService):
     description = message.text.strip()
     if description == "-":
         description = None
@@ -85,26 +70,16 @@ async def process_subject_description(message: Message, state: FSMContext):
     data = await state.get_data()
     subject_name = data['subject_name']
 
-    subjects_manager = SubjectsManager()
-
-    if subjects_manager.add_subject(subject_name, description):
+    if await subjects_manager.add_subject(subject_name, description):
         await message.answer(f"Предмет '{subject_name}' успешно добавлен!")
     else:
         await message.answer("Ошибка при добавлении предмета. Возможно, предмет с таким названием уже существует.")
 
     await state.clear()
 
-@router.callback_query(F.data == "view_subjects")
-async def view_subjects_callback(callback: CallbackQuery):
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
-    subjects_manager = SubjectsManager()
-    subjects = subjects_manager.get_all_subjects()
+@router.callback_query(F.data == "view_subjects", flags={"role": "admin"})
+async def view_subjects_callback(callback: CallbackQuery, subjects_manager: AsyncService):
+    subjects = await subjects_manager.get_all_subjects()
 
     if not subjects:
         await callback.message.edit_text("Нет добавленных предметов")
@@ -121,19 +96,11 @@ async def view_subjects_callback(callback: CallbackQuery):
     await callback.message.edit_text(subjects_text)
     await callback.answer()
 
-@router.callback_query(F.data.startswith("delete_subject_"))
-async def delete_subject_confirmation(callback: CallbackQuery):
+@router.callback_query(F.data.startswith("delete_subject_"), flags={"role": "admin"})
+async def delete_subject_confirmation(callback: CallbackQuery, subjects_manager: AsyncService):
     subject_id = int(callback.data.split("_")[2])
 
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
-    subjects_manager = SubjectsManager()
-    subject = subjects_manager.get_subject(subject_id)
+    subject = await subjects_manager.get_subject(subject_id)
 
     if not subject:
         await callback.answer("Предмет не найден")
@@ -145,25 +112,17 @@ async def delete_subject_confirmation(callback: CallbackQuery):
     )
     await callback.answer()
 
-@router.callback_query(F.data.startswith("confirm_delete_subject_"))
-async def confirm_delete_subject(callback: CallbackQuery):
+@router.callback_query(F.data.startswith("confirm_delete_subject_"), flags={"role": "admin"})
+async def confirm_delete_subject(callback: CallbackQuery, subjects_manager: AsyncService):
     subject_id = int(callback.data.split("_")[3])
 
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
-    subjects_manager = SubjectsManager()
-    subject = subjects_manager.get_subject(subject_id)
+    subject = await subjects_manager.get_subject(subject_id)
 
     if not subject:
         await callback.answer("Предмет не найден")
         return
 
-    if subjects_manager.delete_subject(subject_id):
+    if await subjects_manager.delete_subject(subject_id):
         await callback.message.edit_text(f"Предмет '{subject['name']}' успешно удален!")
     else:
         await callback.message.edit_text("Ошибка при удалении предмета.")
@@ -175,17 +134,10 @@ async def cancel_delete_subject(callback: CallbackQuery):
     await callback.message.edit_text("Удаление предмета отменено.")
     await callback.answer()
 
-@router.callback_query(F.data == "back_to_admin_menu")
+@router.callback_query(F.data == "back_to_admin_menu", flags={"role": "admin"})
 async def back_to_admin_menu(callback: CallbackQuery):
     from bot.keyboards.admin import get_admin_keyboard
 
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
     await callback.message.edit_text(
         "Панель администратора",
         reply_markup=get_admin_keyboard()
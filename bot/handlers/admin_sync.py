@@ -1,138 +1,140 @@
+from functools import partial
+
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 
-from services.user_manager import UserManager
-from services.sync_manager import SyncManager
+from services.async_db import AsyncService
+from services.jobs import JobRunner
+from services.sync_manager import SyncManager, ImportPlan, USER_IMPORT_FIELDS
+from services.database import Database
+from services.user_cache import UserCache
+from utils.auto_sync import AutoSyncScheduler
 
 router = Router()
 
-@router.message(Command("sync"))
-async def cmd_sync(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
-    await message.answer("Начинаю синхронизацию с Google Sheets...")
-
-    sync_manager = SyncManager()
-    success = sync_manager.full_sync()
-
-    if success:
-        await message.answer("Синхронизация завершена!")
-    else:
-        await message.answer("Ошибка синхронизации. Проверьте логи.")
-
-@router.message(Command("export"))
-async def cmd_export(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
-    await message.answer("Экспортирую данные в Google Sheets...")
-
-    sync_manager = SyncManager()
-    sync_manager.sync_users_to_sheets()
-    sync_manager.sync_groups_to_sheets()
-
-    await message.answer("Экспорт завершен!")
-
-@router.message(Command("import"))
-async def cmd_import(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
+def run_full_sync(db: Database, user_cache: UserCache, progress):
+    return SyncManager(db, user_cache=user_cache).full_sync(progress)
+
+def run_export(db: Database, user_cache: UserCache, progress):
+    return SyncManager(db, user_cache=user_cache).export_to_sheets(progress, full=True)
+
+def run_import(db: Database, user_cache: UserCache, progress):
+    return SyncManager(db, user_cache=user_cache).sync_from_sheets(progress)
+
+def run_import_preview(db: Database, user_cache: UserCache, progress):
+    plan = SyncManager(db, user_cache=user_cache).preview_import(progress)
+    if plan is None:
+        return False
+    return format_import_plan(plan)
+
+SYNC_JOBS = {
+    'sync': ("Синхронизация с Google Sheets", run_full_sync),
+    'export': ("Экспорт в Google Sheets", run_export),
+    'import': ("Импорт из Google Sheets", run_import),
+    'import_preview': ("Предпросмотр импорта", run_import_preview)
+}
+
+PREVIEW_LIMIT = 20
+
+def format_changes(before: dict, after: dict, fields: tuple) -> str:
+    changes = [f"{field}: {before[field]} → {after[field]}" for field in fields if before[field] != after[field]]
+    if after.get('new_group'):
+        changes.append(f"group: {before['group_id']} → {after['new_group']} (новая)")
+    return ", ".join(changes)
+
+def format_import_plan(plan: ImportPlan) -> str:
+    if plan.is_empty:
+        return "Изменений нет: данные совпадают с Google Sheets"
+
+    changes = [f"+ группа {group['name']}" for group in plan.group_inserts]
+    changes += [
+        f"~ группа {before['name']}: {format_changes(before, after, ('name', 'teacher_id'))}"
+        for before, after in plan.group_updates.values()
+    ]
+    changes += [f"+ {user['full_name']} ({telegram_id}, {user['role']})" for telegram_id, user in plan.user_inserts.items()]
+    changes += [
+        f"~ {before['full_name']} ({telegram_id}): {format_changes(before, after, USER_IMPORT_FIELDS)}"
+        for telegram_id, (before, after) in plan.user_updates.items()
+    ]
+
+    lines = [
+        f"Группы: добавить {len(plan.group_inserts)}, изменить {len(plan.group_updates)}",
+        f"Пользователи: добавить {len(plan.user_inserts)}, изменить {len(plan.user_updates)}",
+        ""
+    ]
+    lines += changes[:PREVIEW_LIMIT]
+    if len(changes) > PREVIEW_LIMIT:
+        lines.append(f"...и еще {len(changes) - PREVIEW_LIMIT}")
+    lines.append("\nПрименить изменения: /import")
+    return "\n".join(lines)
+
+def busy_text(job) -> str:
+    return (
+        f"Уже выполняется: {job.title} "
+        f"(начато в {job.started_at.strftime('%H:%M:%S')}).\n"
+        "Дождитесь завершения. Статус: /sync_status"
+    )
 
-    await message.answer("Импортирую данные из Google Sheets...")
+async def start_sync_job(message: Message, user_id: int, kind: str, job_runner: JobRunner, db: Database,
+                         user_cache: UserCache):
+    running = job_runner.running_job()
+    if running:
+        return await message.answer(busy_text(running))
 
-    sync_manager = SyncManager()
-    success = sync_manager.sync_from_sheets()
+    title, func = SYNC_JOBS[kind]
+    status_message = await message.answer(f"{title}: запуск...")
 
-    if success:
-        await message.answer("Импорт завершен!")
-    else:
-        await message.answer("Ошибка импорта. Проверьте логи.")
+    notify = partial(message.bot.edit_message_text, chat_id=status_message.chat.id,
+                     message_id=status_message.message_id)
 
-@router.message(F.text == "Синхронизация")
-async def sync_button(message: Message):
-    await cmd_sync(message)
+    job = job_runner.start(title, partial(func, db, user_cache), user_id, notify=notify)
+    if not job:
+        await notify(busy_text(job_runner.running_job()))
 
-@router.callback_query(F.data == "cmd_sync")
-async def cmd_sync_callback(callback: CallbackQuery):
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
+@router.message(Command("sync"), flags={"role": "admin"})
+async def cmd_sync(message: Message, job_runner: JobRunner, db: Database, user_cache: UserCache):
+    await start_sync_job(message, message.from_user.id, 'sync', job_runner, db, user_cache)
 
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
+@router.message(Command("export"), flags={"role": "admin"})
+async def cmd_export(message: Message, job_runner: JobRunner, db: Database, user_cache: UserCache):
+    await start_sync_job(message, message.from_user.id, 'export', job_runner, db, user_cache)
 
-    await callback.message.answer("Начинаю синхронизацию с Google Sheets...")
+@router.message(Command("import"), flags={"role": "admin"})
+async def cmd_import(message: Message, job_runner: JobRunner, db: Database, user_cache: UserCache):
+    await start_sync_job(message, message.from_user.id, 'import', job_runner, db, user_cache)
 
-    sync_manager = SyncManager()
-    success = sync_manager.full_sync()
+@router.message(Command("import_preview"), flags={"role": "admin"})
+async def cmd_import_preview(message: Message, job_runner: JobRunner, db: Database, user_cache: UserCache):
+    await start_sync_job(message, message.from_user.id, 'import_preview', job_runner, db, user_cache)
 
-    if success:
-        await callback.message.answer("Синхронизация завершена!")
+@router.message(Command("sync_status"), flags={"role": "admin"})
+async def cmd_sync_status(message: Message, job_runner: JobRunner, auto_sync: AutoSyncScheduler):
+    if job_runner.current:
+        status_text = job_runner.current.describe()
     else:
-        await callback.message.answer("Ошибка синхронизации. Проверьте логи.")
-
-    await callback.answer()
-
-@router.callback_query(F.data == "cmd_export")
-async def cmd_export_callback(callback: CallbackQuery):
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
-    await callback.message.answer("Экспортирую данные в Google Sheets...")
-
-    sync_manager = SyncManager()
-    sync_manager.sync_users_to_sheets()
-    sync_manager.sync_groups_to_sheets()
+        status_text = "Синхронизация еще не запускалась"
 
-    await callback.message.answer("Экспорт завершен!")
-    await callback.answer()
-
-@router.callback_query(F.data == "cmd_import")
-async def cmd_import_callback(callback: CallbackQuery):
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
+    if auto_sync.enabled and auto_sync.next_run_at:
+        status_text += f"\n\nСледующая автосинхронизация: {auto_sync.next_run_at.strftime('%d.%m.%Y %H:%M')}"
+    elif not auto_sync.enabled:
+        status_text += "\n\nАвтосинхронизация отключена"
 
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
+    await message.answer(status_text)
 
-    await callback.message.answer("Импортирую данные из Google Sheets...")
-
-    sync_manager = SyncManager()
-    success = sync_manager.sync_from_sheets()
-
-    if success:
-        await callback.message.answer("Импорт завершен!")
-    else:
-        await callback.message.answer("Ошибка импорта. Проверьте логи.")
+@router.message(F.text == "Синхронизация", flags={"role": "admin"})
+async def sync_button(message: Message, job_runner: JobRunner, db: Database, user_cache: UserCache):
+    await cmd_sync(message, job_runner, db, user_cache)
 
+@router.callback_query(F.data.in_({"cmd_sync", "cmd_export", "cmd_import"}), flags={"role": "admin"})
+async def sync_job_callback(callback: CallbackQuery, job_runner: JobRunner, db: Database, user_cache: UserCache):
+    kind = callback.data.replace("cmd_", "")
+    await start_sync_job(callback.message, callback.from_user.id, kind, job_runner, db, user_cache)
     await callback.answer()
 
-@router.callback_query(F.data == "full_stats")
-async def full_stats_callback(callback: CallbackQuery):
-    user_manager = UserManager()
-    user = user_manager.get_user(callback.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        await callback.answer("Доступ запрещен")
-        return
-
-    stats = user_manager.get_system_stats()
+@router.callback_query(F.data == "full_stats", flags={"role": "admin"})
+async def full_stats_callback(callback: CallbackQuery, user_manager: AsyncService):
+    stats = await user_manager.get_system_stats()
 
     reports_text = (
         "Полная статистика системы:\n\n"
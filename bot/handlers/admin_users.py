@@ -3,19 +3,13 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from bot.keyboards.admin import get_approval_keyboard, get_groups_selection_keyboard
-from services.user_manager import UserManager
+from services.async_db import AsyncService
 
 router = Router()
 
-@router.message(F.text == "Пользователи")
-async def admin_approval(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'admin' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
-    pending_users = user_manager.get_pending_users()
+@router.message(F.text == "Пользователи", flags={"role": "admin"})
+async def admin_approval(message: Message, user_manager: AsyncService):
+    pending_users = await user_manager.get_pending_users()
 
     if not pending_users:
         await message.answer("Нет пользователей для подтверждения")
@@ -40,11 +34,10 @@ async def admin_approval(message: Message):
         )
 
 @router.callback_query(F.data.startswith("approve_"))
-async def approve_user(callback: CallbackQuery, state: FSMContext):
+async def approve_user(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService):
     user_id = int(callback.data.split("_")[1])
-    user_manager = UserManager()
 
-    user_data = user_manager.get_user(user_id)
+    user_data = await user_manager.get_user(user_id)
     if not user_data:
         await callback.answer("Пользователь не найден")
         return
@@ -53,18 +46,17 @@ async def approve_user(callback: CallbackQuery, state: FSMContext):
 
     await callback.message.edit_text(
         f"Выберите группу для {role_display} {user_data['full_name']}:",
-        reply_markup=get_groups_selection_keyboard("assign_group", user_id)
+        reply_markup=get_groups_selection_keyboard(await user_manager.get_groups_page(), "assign_group", user_id)
     )
     await callback.answer()
 
 @router.callback_query(F.data.startswith("reject_"))
-async def reject_user(callback: CallbackQuery):
+async def reject_user(callback: CallbackQuery, user_manager: AsyncService):
     user_id = int(callback.data.split("_")[1])
-    user_manager = UserManager()
 
-    user_data = user_manager.get_user(user_id)
+    user_data = await user_manager.get_user(user_id)
     if user_data:
-        user_manager.reject_user(user_id)
+        await user_manager.reject_user(user_id)
         await callback.message.edit_text(
             f"Заявка {user_data['full_name']} отклонена"
         )
@@ -73,15 +65,13 @@ async def reject_user(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data.startswith("assign_group_"))
-async def assign_group(callback: CallbackQuery):
+async def assign_group(callback: CallbackQuery, user_manager: AsyncService):
     data_parts = callback.data.split("_")
     user_telegram_id = int(data_parts[2])
     group_id = int(data_parts[3])
 
-    user_manager = UserManager()
-
-    user_data = user_manager.get_user(user_telegram_id)
-    group_data = user_manager.get_group(group_id)
+    user_data = await user_manager.get_user(user_telegram_id)
+    group_data = await user_manager.get_group(group_id)
 
     if not user_data:
         await callback.answer("Пользователь не найден")
@@ -91,7 +81,7 @@ async def assign_group(callback: CallbackQuery):
         await callback.answer("Группа не найден")
         return
 
-    approval_success = user_manager.approve_user(user_telegram_id)
+    approval_success = await user_manager.approve_user(user_telegram_id)
     if not approval_success:
         await callback.message.edit_text(
             f"Ошибка при подтверждении пользователя {user_data['full_name']}!"
@@ -100,10 +90,10 @@ async def assign_group(callback: CallbackQuery):
         return
 
     if user_data['role'] == 'teacher':
-        assignment_success = user_manager.assign_teacher_to_group(user_data['id'], group_id)
+        assignment_success = await user_manager.assign_teacher_to_group(user_data['id'], group_id)
         role_action = "назначен учителем"
     else:
-        assignment_success = user_manager.assign_user_to_group(user_data['id'], group_id)
+        assignment_success = await user_manager.assign_user_to_group(user_data['id'], group_id)
         role_action = "добавлен в группу"
 
     if assignment_success:
@@ -8,15 +8,12 @@ from bot.keyboards.student import get_student_keyboard
 from bot.keyboards.teacher import get_teacher_keyboard
 from bot.keyboards.admin import get_admin_keyboard
 from states.registration import RegistrationStates
-from services.user_manager import UserManager
+from services.async_db import AsyncService
 
 router = Router()
 
 @router.message(Command("start"))
-async def cmd_start(message: Message, state: FSMContext):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
+async def cmd_start(message: Message, state: FSMContext, user: dict):
     if user:
         if user['status'] == 'pending':
             await message.answer("Ваша заявка на рассмотрении. Ожидайте подтверждения администратора.")
@@ -67,7 +64,7 @@ async def process_name(message: Message, state: FSMContext):
     )
 
 @router.message(RegistrationStates.entering_phone, F.contact)
-async def process_phone_contact(message: Message, state: FSMContext):
+async def process_phone_contact(message: Message, state: FSMContext, user_manager: AsyncService):
     if not message.contact or not message.contact.phone_number:
         await message.answer("Не удалось получить номер телефона. Попробуйте еще раз:")
         return
@@ -77,10 +74,10 @@ async def process_phone_contact(message: Message, state: FSMContext):
         phone = '+' + phone
 
     await state.update_data(phone=phone)
-    await complete_registration(message, state)
+    await complete_registration(message, state, user_manager)
 
 @router.message(RegistrationStates.entering_phone, F.text)
-async def process_phone_text(message: Message, state: FSMContext):
+async def process_phone_text(message: Message, state: FSMContext, user_manager: AsyncService):
     if not message.text:
         await message.answer("Введите номер телефона:")
         return
@@ -100,18 +97,17 @@ async def process_phone_text(message: Message, state: FSMContext):
             phone = '+7' + phone
 
     await state.update_data(phone=phone)
-    await complete_registration(message, state)
+    await complete_registration(message, state, user_manager)
 
-async def complete_registration(message: Message, state: FSMContext):
+async def complete_registration(message: Message, state: FSMContext, user_manager: AsyncService):
     user_data = await state.get_data()
-    user_manager = UserManager()
 
     if not all(key in user_data for key in ['role', 'full_name', 'phone']):
         await message.answer("Произошла ошибка при регистрации. Попробуйте снова: /start")
         await state.clear()
         return
 
-    user = user_manager.create_user(
+    user = await user_manager.create_user(
         telegram_id=message.from_user.id,
         full_name=user_data['full_name'],
         phone=user_data['phone'],
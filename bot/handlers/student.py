@@ -1,21 +1,12 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
-from services.grades_manager import GradesManager
-from services.attendance_manager import AttendanceManager
-from services.assignment_manager import AssignmentManager
-from services.user_manager import UserManager
-from services.schedule_manager import ScheduleManager
+from services.async_db import AsyncService
 
 router = Router()
 
-@router.message(F.text == "Расписание")
-async def student_schedule(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'student' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
+@router.message(F.text == "Расписание", flags={"role": "student"})
+async def student_schedule(message: Message, user: dict, user_manager: AsyncService,
+                           schedule_manager: AsyncService):
     if not user.get('group_id'):
         await message.answer(
             "У вас нет назначенной группы.\n\n"
@@ -23,10 +14,9 @@ async def student_schedule(message: Message):
         )
         return
 
-    schedule_manager = ScheduleManager()
-    schedule = schedule_manager.get_group_schedule(user['group_id'])
+    schedule = await schedule_manager.get_group_schedule(user['group_id'])
 
-    group = user_manager.get_group(user['group_id'])
+    group = await user_manager.get_group(user['group_id'])
     group_name = group['name'] if group else "Неизвестная группа"
 
     schedule_text = f"Расписание группы {group_name}:\n\n"
@@ -61,14 +51,8 @@ async def student_schedule(message: Message):
 
     await message.answer(schedule_text)
 
-@router.message(F.text == "Мои задания")
-async def student_assignments(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'student' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
+@router.message(F.text == "Мои задания", flags={"role": "student"})
+async def student_assignments(message: Message, user: dict, assignment_manager: AsyncService):
     if not user.get('group_id'):
         await message.answer(
             "У вас нет назначенной группы.\n\n"
@@ -76,8 +60,7 @@ async def student_assignments(message: Message):
         )
         return
 
-    assignment_manager = AssignmentManager()
-    assignments = assignment_manager.get_assignments_for_student(user['id'])
+    assignments = await assignment_manager.get_assignments_for_student(user['id'])
 
     if not assignments:
         await message.answer(
@@ -110,55 +93,34 @@ async def student_assignments(message: Message):
 
     await message.answer(assignments_text)
 
-@router.message(F.text == "Мои результаты")
-async def student_results(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'student' or user['status'] != 'active':
-        return await message.answer("Доступ запрещен")
-
+@router.message(F.text == "Мои результаты", flags={"role": "student"})
+async def student_results(message: Message, user: dict, student_dashboard: AsyncService):
     if not user.get('group_id'):
         await message.answer("У вас нет группы для отображения результатов")
         return
 
-    grades_manager = GradesManager()
-    attendance_manager = AttendanceManager()
-
     try:
-        average_grade = grades_manager.get_average_grade(user['id'])
-        attendance_stats = attendance_manager.get_student_attendance_stats(user['id'], user['group_id'])
-
-        recent_grades = grades_manager.get_student_grades(user['id'])[:5]
-
-        all_grades = grades_manager.get_student_grades(user['id'])
-        subjects_grades = {}
-
-        for grade in all_grades:
-            subject = grade['subject']
-            if subject not in subjects_grades:
-                subjects_grades[subject] = []
-            subjects_grades[subject].append(grade['grade'])
+        dashboard = await student_dashboard.get_dashboard(user['id'], user['group_id'])
+        attendance_stats = dashboard['attendance']
 
         results_text = f"Ваши результаты, {user['full_name']}:\n\n"
 
-        results_text += f"Посещаемость: {attendance_stats.get('attendance_rate', 0)}%\n"
-        results_text += f"Всего занятий: {attendance_stats.get('total_classes', 0)}\n"
-        results_text += f"Присутствовал: {attendance_stats.get('present', 0)}\n\n"
+        results_text += f"Посещаемость: {attendance_stats['attendance_rate']}%\n"
+        results_text += f"Всего занятий: {attendance_stats['total_classes']}\n"
+        results_text += f"Присутствовал: {attendance_stats['present']}\n\n"
 
-        results_text += f"Средний балл: {average_grade:.1f}\n"
-        results_text += f"Всего оценок: {len(all_grades)}\n\n"
+        results_text += f"Средний балл: {dashboard['average_grade']:.1f}\n"
+        results_text += f"Всего оценок: {dashboard['total_grades']}\n\n"
 
-        if subjects_grades:
+        if dashboard['subjects']:
             results_text += "Оценки по предметам:\n"
-            for subject, grades in subjects_grades.items():
-                subject_avg = sum(grades) / len(grades)
-                results_text += f"   {subject}: {subject_avg:.1f} ({len(grades)} оценок)\n"
+            for subject in dashboard['subjects']:
+                results_text += f"   {subject['subject']}: {subject['average']:.1f} ({subject['count']} оценок)\n"
             results_text += "\n"
 
-        if recent_grades:
+        if dashboard['recent_grades']:
             results_text += "Последние оценки:\n"
-            for grade in recent_grades:
+            for grade in dashboard['recent_grades']:
                 results_text += f"   {grade['subject']}: {grade['grade']} ({grade['date']})\n"
 
         await message.answer(results_text)
@@ -169,25 +131,16 @@ async def student_results(message: Message):
             "Попробуйте позже или обратитесь к администратору."
         )
 
-@router.message(F.text == "Мой профиль")
-async def student_profile(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    if not user or user['role'] != 'student':
-        return await message.answer("Доступ запрещен")
-
+@router.message(F.text == "Мой профиль", flags={"role": "student", "active": False})
+async def student_profile(message: Message, user: dict, user_manager: AsyncService,
+                          student_dashboard: AsyncService):
     group_name = "Не назначена"
     if user.get('group_id'):
-        group = user_manager.get_group(user['group_id'])
+        group = await user_manager.get_group(user['group_id'])
         if group:
             group_name = group['name']
 
-    grades_manager = GradesManager()
-    attendance_manager = AttendanceManager()
-
-    average_grade = grades_manager.get_average_grade(user['id'])
-    attendance_stats = attendance_manager.get_student_attendance_stats(user['id'], user.get('group_id'))
+    dashboard = await student_dashboard.get_dashboard(user['id'], user.get('group_id'), 0)
 
     profile_text = (
         f"Ваш профиль:\n\n"
@@ -197,8 +150,8 @@ async def student_profile(message: Message):
         f"Дата регистрации: {user['created_at']}\n\n"
 
         f"Статистика:\n"
-        f"Средний балл: {average_grade:.1f}\n"
-        f"Посещаемость: {attendance_stats.get('attendance_rate', 0)}%\n"
+        f"Средний балл: {dashboard['average_grade']:.1f}\n"
+        f"Посещаемость: {dashboard['attendance']['attendance_rate']}%\n"
         f"Статус: {user['status']}"
     )
     await message.answer(profile_text)
\ No newline at end of file
@@ -7,42 +7,22 @@ import logging
 from bot.keyboards.teacher import (
     get_teacher_keyboard,
     get_groups_keyboard,
-    get_attendance_keyboard,
+    get_roll_call_keyboard,
+    ATTENDANCE_LABELS,
     get_subjects_keyboard,
-    get_grades_keyboard
+    get_grades_keyboard,
+    get_bulk_grades_keyboard,
+    get_performance_keyboard
 )
-from services.user_manager import UserManager
-from services.attendance_manager import AttendanceManager
-from services.assignment_manager import AssignmentManager
-from services.grades_manager import GradesManager
-from services.subjects_manager import SubjectsManager
+from services.async_db import AsyncService
 from states.teacher import TeacherStates
 
 router = Router()
 logger = logging.getLogger(__name__)
 
-async def check_teacher_access(user) -> tuple[bool, str]:
-    if not user:
-        return False, "Пользователь не найден в системе"
-
-    if user['role'] != 'teacher':
-        return False, f"Ваша роль: {user['role']}. Эта функция только для учителей"
-
-    if user['status'] != 'active':
-        return False, f"Ваш статус: {user['status']}. Ожидайте подтверждения администратора"
-
-    return True, ""
-
-@router.message(F.text == "Мои группы")
-async def teacher_groups(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    has_access, reason = await check_teacher_access(user)
-    if not has_access:
-        return await message.answer(reason)
-
-    groups = user_manager.get_teacher_groups(user['id'])
+@router.message(F.text == "Мои группы", flags={"role": "teacher"})
+async def teacher_groups(message: Message, user: dict, user_manager: AsyncService):
+    groups = await user_manager.get_teacher_groups(user['id'])
 
     if not groups:
         await message.answer("У вас пока нет групп")
@@ -50,7 +30,7 @@ async def teacher_groups(message: Message):
 
     groups_text = "Ваши группы:\n\n"
     for group in groups:
-        group_details = user_manager.get_group_with_details(group['id'])
+        group_details = await user_manager.get_group_with_details(group['id'])
         students_count = group_details['students_count'] if group_details else 0
 
         groups_text += f"{group['name']}\n"
@@ -59,40 +39,29 @@ async def teacher_groups(message: Message):
 
     await message.answer(groups_text)
 
-@router.message(F.text == "Посещаемость")
-async def teacher_attendance(message: Message, state: FSMContext):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    has_access, reason = await check_teacher_access(user)
-    if not has_access:
-        return await message.answer(reason)
-
-    groups = user_manager.get_teacher_groups(user['id'])
+@router.message(F.text == "Посещаемость", flags={"role": "teacher"})
+async def teacher_attendance(message: Message, user: dict, state: FSMContext, user_manager: AsyncService):
+    groups = await user_manager.get_teacher_groups(user['id'])
 
     if not groups:
         await message.answer("У вас нет групп для отметки посещаемости")
         return
 
     await state.set_state(TeacherStates.choosing_group_for_attendance)
-    await state.update_data(teacher=user)
     await message.answer(
         "Выберите группу для отметки посещаемости:",
         reply_markup=get_groups_keyboard(groups)
     )
 
-@router.message(TeacherStates.choosing_group_for_attendance)
-async def process_group_selection(message: Message, state: FSMContext):
+@router.message(TeacherStates.choosing_group_for_attendance, flags={"role": "teacher"})
+async def process_group_selection(message: Message, user: dict, state: FSMContext, user_manager: AsyncService,
+                                  attendance_manager: AsyncService):
     if message.text == "Назад":
         await state.clear()
         await message.answer("Возврат в меню", reply_markup=get_teacher_keyboard())
         return
 
-    user_manager = UserManager()
-    data = await state.get_data()
-    teacher = data['teacher']
-
-    groups = user_manager.get_teacher_groups(teacher['id'])
+    groups = await user_manager.get_teacher_groups(user['id'])
     group_names = [group['name'] for group in groups]
 
     if message.text not in group_names:
@@ -105,122 +74,138 @@ async def process_group_selection(message: Message, state: FSMContext):
         await message.answer("Группа не найдена")
         return
 
-    students = user_manager.get_group_students(selected_group['id'])
+    students = await user_manager.get_group_students(selected_group['id'])
 
     if not students:
         await message.answer("В этой группе нет учеников")
         await state.clear()
         return
 
-    await state.update_data(
-        selected_group=selected_group,
-        students=students,
-        current_student_index=0
-    )
+    date = datetime.now().date().isoformat()
+    marked = await attendance_manager.get_group_statuses(selected_group['id'], date)
+    statuses = {str(student['id']): marked.get(student['id'], 'present') for student in students}
+
+    await state.update_data(group_id=selected_group['id'], statuses=statuses, date=date)
     await state.set_state(TeacherStates.marking_attendance)
 
-    await show_next_student(message, state)
+    await message.answer(f"Группа {selected_group['name']}", reply_markup=get_teacher_keyboard())
+    await message.answer(
+        format_roll_call(selected_group, date, statuses),
+        reply_markup=get_roll_call_keyboard(students, statuses)
+    )
 
-async def show_next_student(message: Message, state: FSMContext):
-    data = await state.get_data()
-    students = data['students']
-    current_index = data['current_student_index']
-    group = data['selected_group']
+def format_roll_call(group: dict, date: str, statuses: dict) -> str:
+    counts = {status: 0 for status in ATTENDANCE_LABELS}
+    for status in statuses.values():
+        counts[status] += 1
 
-    if current_index >= len(students):
-        await message.answer(
-            f"Посещаемость для группы {group['name']} отмечена!",
-            reply_markup=get_teacher_keyboard()
-        )
-        await state.clear()
-        return
+    return (
+        f"Посещаемость: {group['name']} ({datetime.fromisoformat(date).strftime('%d.%m.%Y')})\n"
+        f"Присутствуют: {counts['present']}, отсутствуют: {counts['absent']}, опоздали: {counts['late']}\n\n"
+        "Нажмите на ученика, чтобы изменить отметку."
+    )
 
-    student = students[current_index]
-    await message.answer(
-        f"Отметьте посещаемость для:\n"
-        f"{student['full_name']}\n"
-        f"Телефон: {student.get('phone', 'Не указан')}",
-        reply_markup=get_attendance_keyboard()
+async def update_roll_call(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService, statuses: dict):
+    data = await state.update_data(statuses=statuses)
+    group = await user_manager.get_group(data['group_id'])
+    students = await user_manager.get_users_by_ids([int(student_id) for student_id in statuses])
+
+    await callback.message.edit_text(
+        format_roll_call(group, data['date'], statuses),
+        reply_markup=get_roll_call_keyboard(students, statuses)
     )
+    await callback.answer()
 
-@router.message(TeacherStates.marking_attendance)
-async def process_attendance(message: Message, state: FSMContext):
-    if message.text == "Назад":
-        await state.clear()
-        await message.answer("Возврат в меню", reply_markup=get_teacher_keyboard())
+@router.callback_query(TeacherStates.marking_attendance, F.data == "roll_all", flags={"role": "teacher"})
+async def roll_call_all_present(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService):
+    data = await state.get_data()
+    statuses = {student_id: 'present' for student_id in data['statuses']}
+
+    if statuses == data['statuses']:
+        await callback.answer()
         return
 
-    attendance_statuses = {
-        "Присутствовал": "present",
-        "Отсутствовал": "absent",
-        "Опоздал": "late"
-    }
+    await update_roll_call(callback, state, user_manager, statuses)
 
-    if message.text not in attendance_statuses:
-        await message.answer("Пожалуйста, используйте кнопки для отметки:")
-        return
+@router.callback_query(TeacherStates.marking_attendance, F.data == "roll_cancel", flags={"role": "teacher"})
+async def roll_call_cancel(callback: CallbackQuery, state: FSMContext):
+    await state.clear()
+    await callback.message.edit_text("Отметка посещаемости отменена")
+    await callback.answer()
 
+@router.callback_query(TeacherStates.marking_attendance, F.data == "roll_save", flags={"role": "teacher"})
+async def roll_call_save(callback: CallbackQuery, user: dict, state: FSMContext, user_manager: AsyncService,
+                         attendance_manager: AsyncService):
     data = await state.get_data()
-    students = data['students']
-    current_index = data['current_student_index']
-    group = data['selected_group']
-    teacher = data['teacher']
-
-    student = students[current_index]
-    status = attendance_statuses[message.text]
+    statuses = data['statuses']
 
-    attendance_manager = AttendanceManager()
-    success = attendance_manager.mark_attendance(
-        student_id=student['id'],
-        group_id=group['id'],
-        date=datetime.now().date(),
-        status=status,
-        marked_by=teacher['id']
+    success = await attendance_manager.mark_attendance_bulk(
+        data['group_id'],
+        data['date'],
+        {int(student_id): status for student_id, status in statuses.items()},
+        user['id']
     )
 
-    if success:
-        await message.answer(f"{student['full_name']} - {message.text}")
-    else:
-        await message.answer(f"Ошибка при сохранении посещаемости для {student['full_name']}")
+    if not success:
+        await callback.answer("Ошибка при сохранении посещаемости", show_alert=True)
+        return
 
-    await state.update_data(current_student_index=current_index + 1)
-    await show_next_student(message, state)
+    await state.clear()
 
-@router.message(F.text == "Создать задание")
-async def teacher_create_assignment(message: Message, state: FSMContext):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
+    group = await user_manager.get_group(data['group_id'])
+    absent_ids = [int(student_id) for student_id, status in statuses.items() if status != 'present']
+    missing = [
+        f"{student['full_name']} - {ATTENDANCE_LABELS[statuses[str(student['id'])]]}"
+        for student in await user_manager.get_users_by_ids(absent_ids)
+    ]
+    result_text = f"Посещаемость для группы {group['name']} отмечена!"
+    if missing:
+        result_text += "\n\n" + "\n".join(missing)
+
+    await callback.message.edit_text(result_text)
+    await callback.answer()
+
+@router.callback_query(TeacherStates.marking_attendance, F.data.regexp(r"^roll_\d+$"), flags={"role": "teacher"})
+async def roll_call_toggle(callback: CallbackQuery, state: FSMContext, user_manager: AsyncService):
+    student_id = callback.data.split("_")[1]
+    data = await state.get_data()
+    statuses = dict(data['statuses'])
+
+    if student_id not in statuses:
+        await callback.answer("Ученик не найден")
+        return
 
-    has_access, reason = await check_teacher_access(user)
-    if not has_access:
-        return await message.answer(reason)
+    order = list(ATTENDANCE_LABELS)
+    statuses[student_id] = order[(order.index(statuses[student_id]) + 1) % len(order)]
+    await update_roll_call(callback, state, user_manager, statuses)
 
-    groups = user_manager.get_teacher_groups(user['id'])
+@router.callback_query(F.data.startswith("roll_"))
+async def roll_call_expired(callback: CallbackQuery):
+    await callback.answer("Отметка посещаемости уже завершена")
+
+@router.message(F.text == "Создать задание", flags={"role": "teacher"})
+async def teacher_create_assignment(message: Message, user: dict, state: FSMContext, user_manager: AsyncService):
+    groups = await user_manager.get_teacher_groups(user['id'])
 
     if not groups:
         await message.answer("У вас нет групп для создания заданий")
         return
 
     await state.set_state(TeacherStates.choosing_group_for_assignment)
-    await state.update_data(teacher=user)
 
     await message.answer(
         "Выберите группу для задания:",
         reply_markup=get_groups_keyboard(groups)
     )
 
-@router.message(TeacherStates.choosing_group_for_assignment)
-async def process_assignment_group(message: Message, state: FSMContext):
+@router.message(TeacherStates.choosing_group_for_assignment, flags={"role": "teacher"})
+async def process_assignment_group(message: Message, user: dict, state: FSMContext, user_manager: AsyncService):
     if message.text == "Назад":
         await state.clear()
         await message.answer("Возврат в меню", reply_markup=get_teacher_keyboard())
         return
 
-    data = await state.get_data()
-    teacher = data['teacher']
-
-    user_manager = UserManager()
-    groups = user_manager.get_teacher_groups(teacher['id'])
+    groups = await user_manager.get_teacher_groups(user['id'])
     group_names = [group['name'] for group in groups]
 
     if message.text not in group_names:
@@ -229,7 +214,7 @@ async def process_assignment_group(message: Message, state: FSMContext):
 
     selected_group = next((g for g in groups if g['name'] == message.text), None)
 
-    await state.update_data(selected_group=selected_group)
+    await state.update_data(group_id=selected_group['id'])
     await state.set_state(TeacherStates.creating_assignment_title)
 
     await message.answer(
@@ -257,8 +242,9 @@ async def process_assignment_description(message: Message, state: FSMContext):
         "Например: 25.12.2024"
     )
 
-@router.message(TeacherStates.creating_assignment_deadline)
-async def process_assignment_deadline(message: Message, state: FSMContext):
+@router.message(TeacherStates.creating_assignment_deadline, flags={"role": "teacher"})
+async def process_assignment_deadline(message: Message, user: dict, state: FSMContext, user_manager: AsyncService,
+                                      assignment_manager: AsyncService):
     try:
         deadline = datetime.strptime(message.text.strip(), "%d.%m.%Y").date()
 
@@ -272,19 +258,19 @@ async def process_assignment_deadline(message: Message, state: FSMContext):
 
     data = await state.get_data()
 
-    assignment_manager = AssignmentManager()
-    assignment_id = assignment_manager.create_assignment(
+    assignment_id = await assignment_manager.create_assignment(
         title=data['title'],
         description=data['description'],
-        group_id=data['selected_group']['id'],
-        teacher_id=data['teacher']['id'],
+        group_id=data['group_id'],
+        teacher_id=user['id'],
         deadline=deadline
     )
 
     if assignment_id:
+        group = await user_manager.get_group(data['group_id'])
         await message.answer(
             f"Задание создано!\n\n"
-            f"Группа: {data['selected_group']['name']}\n"
+            f"Группа: {group['name']}\n"
             f"Название: {data['title']}\n"
             f"Описание: {data['description']}\n"
             f"Срок: {deadline.strftime('%d.%m.%Y')}",
@@ -298,40 +284,29 @@ async def process_assignment_deadline(message: Message, state: FSMContext):
 
     await state.clear()
 
-@router.message(F.text == "Выставить оценки")
-async def teacher_set_grades(message: Message, state: FSMContext):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
-    has_access, reason = await check_teacher_access(user)
-    if not has_access:
-        return await message.answer(reason)
-
-    groups = user_manager.get_teacher_groups(user['id'])
+@router.message(F.text == "Выставить оценки", flags={"role": "teacher"})
+async def teacher_set_grades(message: Message, user: dict, state: FSMContext, user_manager: AsyncService):
+    groups = await user_manager.get_teacher_groups(user['id'])
 
     if not groups:
         await message.answer("У вас нет групп для выставления оценок")
         return
 
     await state.set_state(TeacherStates.choosing_group_for_grades)
-    await state.update_data(teacher=user)
     await message.answer(
         "Выберите группу для выставления оценок:",
         reply_markup=get_groups_keyboard(groups)
     )
 
-@router.message(TeacherStates.choosing_group_for_grades)
-async def process_grades_group_selection(message: Message, state: FSMContext):
+@router.message(TeacherStates.choosing_group_for_grades, flags={"role": "teacher"})
+async def process_grades_group_selection(message: Message, user: dict, state: FSMContext,
+                                         user_manager: AsyncService, subjects_manager: AsyncService):
     if message.text == "Назад":
         await state.clear()
         await message.answer("Возврат в меню", reply_markup=get_teacher_keyboard())
         return
 
-    user_manager = UserManager()
-    data = await state.get_data()
-    teacher = data['teacher']
-
-    groups = user_manager.get_teacher_groups(teacher['id'])
+    groups = await user_manager.get_teacher_groups(user['id'])
     group_names = [group['name'] for group in groups]
 
     if message.text not in group_names:
@@ -344,7 +319,7 @@ async def process_grades_group_selection(message: Message, state: FSMContext):
         await message.answer("Группа не найдена")
         return
 
-    students = user_manager.get_group_students(selected_group['id'])
+    students = await user_manager.get_group_students(selected_group['id'])
 
     if not students:
         await message.answer("В этой группе нет учеников")
@@ -352,45 +327,173 @@ async def process_grades_group_selection(message: Message, state: FSMContext):
         return
 
     await state.update_data(
-        selected_group=selected_group,
-        students=students,
+        group_id=selected_group['id'],
+        student_ids=[student['id'] for student in students],
         current_student_index=0
     )
     await state.set_state(TeacherStates.choosing_subject_for_grades)
 
     await message.answer(
         "Выберите предмет:",
-        reply_markup=get_subjects_keyboard()
+        reply_markup=get_subjects_keyboard(await subjects_manager.get_all_subjects())
     )
 
-@router.message(TeacherStates.choosing_subject_for_grades)
-async def process_grades_subject_selection(message: Message, state: FSMContext):
+@router.message(TeacherStates.choosing_subject_for_grades, flags={"role": "teacher"})
+async def process_grades_subject_selection(message: Message, state: FSMContext, user_manager: AsyncService,
+                                           subjects_manager: AsyncService, grades_manager: AsyncService):
     if message.text == "Назад":
         await state.clear()
         await message.answer("Возврат в меню", reply_markup=get_teacher_keyboard())
         return
 
-    subjects_manager = SubjectsManager()
-    subjects = subjects_manager.get_all_subjects()
+    subjects = await subjects_manager.get_all_subjects()
     subject_names = [subject['name'] for subject in subjects]
 
     if message.text not in subject_names:
         await message.answer("Пожалуйста, выберите предмет из списка:")
         return
 
+    data = await state.get_data()
+    group = await user_manager.get_group(data['group_id'])
+    students = await user_manager.get_users_by_ids(data['student_ids'])
+    recent = await grades_manager.get_group_recent_grades(data['group_id'], message.text)
+
     await state.update_data(subject=message.text)
-    await state.set_state(TeacherStates.setting_grades)
+    await state.set_state(TeacherStates.entering_bulk_grades)
+
+    roster_text = f"Оценки по предмету '{message.text}', группа {group['name']}:\n\n"
+    for number, student in enumerate(students, 1):
+        roster_text += f"{number}. {student['full_name']}"
+        if student['id'] in recent:
+            roster_text += f" (последние: {', '.join(map(str, recent[student['id']]))})"
+        roster_text += "\n"
+
+    roster_text += (
+        "\nОтправьте оценки одной строкой в порядке списка, например: 5 4 - 3\n"
+        "(- означает без оценки)\n"
+        "или построчно в формате 'Имя: оценка'.\n\n"
+        "Чтобы выставлять оценки по одному ученику, нажмите 'По одному'."
+    )
+
+    await message.answer(roster_text, reply_markup=get_bulk_grades_keyboard())
+
+def find_student(name: str, students: list):
+    if name.isdigit():
+        number = int(name)
+        return students[number - 1] if 1 <= number <= len(students) else None
+
+    key = name.casefold()
+    exact = [student for student in students if student['full_name'].casefold() == key]
+    if exact:
+        return exact[0] if len(exact) == 1 else exact
+
+    matches = [
+        student for student in students
+        if any(word.startswith(key) for word in student['full_name'].casefold().split())
+    ]
+    if not matches:
+        return None
+    return matches[0] if len(matches) == 1 else matches
+
+def parse_bulk_grades(text: str, students: list) -> tuple[dict, list]:
+    pairs = []
+    errors = []
+
+    if ":" in text:
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+
+            name, _, value = line.partition(":")
+            student = find_student(name.strip(), students)
+            if student is None:
+                errors.append(f"Ученик '{name.strip()}' не найден")
+            elif isinstance(student, list):
+                errors.append(f"'{name.strip()}' подходит нескольким ученикам, уточните имя")
+            else:
+                pairs.append((student, value.strip()))
+    else:
+        values = text.replace(",", " ").split()
+        if len(values) != len(students):
+            return {}, [f"Ожидалось оценок: {len(students)}, получено: {len(values)}"]
+        pairs = list(zip(students, values))
+
+    grades = {}
+    seen = set()
+    for student, value in pairs:
+        if student['id'] in seen:
+            errors.append(f"{student['full_name']}: указан несколько раз")
+            continue
+        seen.add(student['id'])
+
+        if value == "-":
+            continue
+        if value not in ("1", "2", "3", "4", "5"):
+            errors.append(f"{student['full_name']}: неверная оценка '{value}'")
+            continue
+        grades[student['id']] = int(value)
+
+    return grades, errors
+
+@router.message(TeacherStates.entering_bulk_grades, flags={"role": "teacher"})
+async def process_bulk_grades(message: Message, user: dict, state: FSMContext, user_manager: AsyncService,
+                              grades_manager: AsyncService):
+    if message.text == "Назад":
+        await state.clear()
+        await message.answer("Возврат в меню", reply_markup=get_teacher_keyboard())
+        return
+
+    if message.text == "По одному":
+        await state.update_data(current_student_index=0)
+        await state.set_state(TeacherStates.setting_grades)
+        await show_next_student_for_grades(message, state, user_manager, grades_manager)
+        return
+
+    if not message.text:
+        await message.answer("Отправьте оценки текстом:")
+        return
+
+    data = await state.get_data()
+    students = await user_manager.get_users_by_ids(data['student_ids'])
+    subject = data['subject']
+
+    grades, errors = parse_bulk_grades(message.text, students)
+
+    if errors:
+        await message.answer("Оценки не сохранены:\n" + "\n".join(errors) + "\n\nИсправьте и отправьте снова:")
+        return
+
+    if not grades:
+        await message.answer("Нет оценок для сохранения. Отправьте оценки или нажмите 'Назад':")
+        return
+
+    success = await grades_manager.add_grades_bulk(data['group_id'], subject, grades, user['id'])
+
+    if not success:
+        await message.answer("Ошибка при сохранении оценок. Попробуйте еще раз:")
+        return
 
-    await show_next_student_for_grades(message, state)
+    await state.clear()
+
+    group = await user_manager.get_group(data['group_id'])
+    result_text = f"Оценки по предмету '{subject}' для группы {group['name']} выставлены!\n\n"
+    result_text += "\n".join(
+        f"{student['full_name']} - {grades[student['id']]}" for student in students if student['id'] in grades
+    )
+    if len(grades) < len(students):
+        result_text += f"\n\nБез оценки: {len(students) - len(grades)}"
 
-async def show_next_student_for_grades(message: Message, state: FSMContext):
+    await message.answer(result_text, reply_markup=get_teacher_keyboard())
+
+async def show_next_student_for_grades(message: Message, state: FSMContext, user_manager: AsyncService,
+                                       grades_manager: AsyncService):
     data = await state.get_data()
-    students = data['students']
+    student_ids = data['student_ids']
     current_index = data['current_student_index']
-    group = data['selected_group']
     subject = data['subject']
 
-    if current_index >= len(students):
+    if current_index >= len(student_ids):
+        group = await user_manager.get_group(data['group_id'])
         await message.answer(
             f"Оценки по предмету '{subject}' для группы {group['name']} выставлены!",
             reply_markup=get_teacher_keyboard()
@@ -398,15 +501,18 @@ async def show_next_student_for_grades(message: Message, state: FSMContext):
         await state.clear()
         return
 
-    student = students[current_index]
+    student = await user_manager.get_user_by_id(student_ids[current_index])
+    if not student:
+        await state.update_data(current_student_index=current_index + 1)
+        await show_next_student_for_grades(message, state, user_manager, grades_manager)
+        return
 
-    grades_manager = GradesManager()
-    recent_grades = grades_manager.get_student_grades(student['id'], subject)[:3]
+    recent_grades = await grades_manager.get_student_recent_grades(student['id'], subject)
 
     grades_text = ""
     if recent_grades:
         grades_text = "\nПоследние оценки: "
-        grades_text += ", ".join([str(grade['grade']) for grade in recent_grades])
+        grades_text += ", ".join([str(grade) for grade in recent_grades])
 
     await message.answer(
         f"Выставьте оценку по предмету '{subject}' для:\n"
@@ -414,8 +520,9 @@ async def show_next_student_for_grades(message: Message, state: FSMContext):
         reply_markup=get_grades_keyboard()
     )
 
-@router.message(TeacherStates.setting_grades)
-async def process_grade_setting(message: Message, state: FSMContext):
+@router.message(TeacherStates.setting_grades, flags={"role": "teacher"})
+async def process_grade_setting(message: Message, user: dict, state: FSMContext, user_manager: AsyncService,
+                                grades_manager: AsyncService):
     if message.text == "Назад":
         await state.clear()
         await message.answer("Возврат в меню", reply_markup=get_teacher_keyboard())
@@ -427,22 +534,18 @@ async def process_grade_setting(message: Message, state: FSMContext):
         return
 
     data = await state.get_data()
-    students = data['students']
     current_index = data['current_student_index']
-    group = data['selected_group']
     subject = data['subject']
-    teacher = data['teacher']
 
-    student = students[current_index]
+    student = await user_manager.get_user_by_id(data['student_ids'][current_index])
     grade = int(message.text)
 
-    grades_manager = GradesManager()
-    success = grades_manager.add_grade(
+    success = await grades_manager.add_grade(
         student_id=student['id'],
-        group_id=group['id'],
+        group_id=data['group_id'],
         subject=subject,
         grade=grade,
-        teacher_id=teacher['id']
+        teacher_id=user['id']
     )
 
     if success:
@@ -451,63 +554,58 @@ async def process_grade_setting(message: Message, state: FSMContext):
         await message.answer(f"Ошибка при сохранении оценки для {student['full_name']}")
 
     await state.update_data(current_student_index=current_index + 1)
-    await show_next_student_for_grades(message, state)
-
-@router.message(F.text == "Успеваемость")
-async def teacher_performance(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
+    await show_next_student_for_grades(message, state, user_manager, grades_manager)
 
-    has_access, reason = await check_teacher_access(user)
-    if not has_access:
-        return await message.answer(reason)
+@router.message(F.text == "Успеваемость", flags={"role": "teacher"})
+async def teacher_performance(message: Message, user: dict, group_analytics: AsyncService):
+    report = await group_analytics.get_teacher_report(user['id'])
 
-    groups = user_manager.get_teacher_groups(user['id'])
-
-    if not groups:
+    if not report:
         await message.answer("У вас пока нет групп")
         return
 
-    performance_text = "Успеваемость ваших групп:\n\n"
-    grades_manager = GradesManager()
-    attendance_manager = AttendanceManager()
+    await message.answer(format_performance(report), reply_markup=get_performance_keyboard())
 
-    for group in groups:
-        group_details = user_manager.get_group_with_details(group['id'])
-        students_count = group_details['students_count'] if group_details else 0
+@router.callback_query(F.data.startswith("performance_"), flags={"role": "teacher"})
+async def teacher_performance_period(callback: CallbackQuery, user: dict, group_analytics: AsyncService):
+    period = callback.data.split("_")[1]
+    date_from = None
+    if period != "all":
+        date_from = datetime.now().date() - timedelta(days=int(period) - 1)
 
-        grade_stats = grades_manager.get_grade_statistics(group['id'])
-        attendance_stats = get_real_attendance_stats(attendance_manager, group['id'])
+    report = await group_analytics.get_teacher_report(user['id'], date_from)
 
-        performance_text += f"{group['name']}\n"
-        performance_text += f"Учеников: {students_count}\n"
-        performance_text += f"Посещаемость: {attendance_stats['attendance_rate']}%\n"
-        performance_text += f"Средний балл: {grade_stats['average_grade']}\n"
-        performance_text += f"Всего оценок: {grade_stats['total_grades']}\n"
+    if not report:
+        await callback.answer("У вас пока нет групп")
+        return
 
-        if grade_stats['grade_distribution']:
+    performance_text = format_performance(report, date_from)
+    if performance_text != callback.message.text:
+        await callback.message.edit_text(performance_text, reply_markup=get_performance_keyboard())
+    await callback.answer()
+
+def format_performance(report: list, date_from=None) -> str:
+    performance_text = "Успеваемость ваших групп"
+    if date_from:
+        performance_text += f" с {date_from.strftime('%d.%m.%Y')}"
+    performance_text += ":\n\n"
+
+    for group in report:
+        performance_text += f"{group['name']}\n"
+        performance_text += f"Учеников: {group['students_count']}\n"
+        performance_text += f"Посещаемость: {group['attendance_rate']}%\n"
+        if group['late'] or group['absent']:
+            performance_text += f"Опозданий: {group['late']}, пропусков: {group['absent']}\n"
+        performance_text += f"Средний балл: {group['average_grade']}\n"
+        performance_text += f"Всего оценок: {group['total_grades']}\n"
+
+        if group['grade_distribution']:
             performance_text += "Распределение оценок: "
             grade_items = []
-            for grade_val, count in sorted(grade_stats['grade_distribution'].items()):
+            for grade_val, count in sorted(group['grade_distribution'].items()):
                 grade_items.append(f"{grade_val} - {count}")
             performance_text += ", ".join(grade_items)
 
         performance_text += "\n\n"
 
-    await message.answer(performance_text)
-
-def get_real_attendance_stats(attendance_manager, group_id: int) -> dict:
-    try:
-        total_possible = 20
-        present_count = 18
-
-        attendance_rate = round((present_count / total_possible) * 100, 1) if total_possible > 0 else 0
-
-        return {
-            'attendance_rate': attendance_rate,
-            'total_classes': total_possible,
-            'present_count': present_count
-        }
-    except Exception as e:
-        logger.error(f"Ошибка при получении статистики посещаемости: {e}")
-        return {'attendance_rate': 0, 'total_classes': 0, 'present_count': 0}
\ No newline at end of file
+    return performance_text.rstrip()
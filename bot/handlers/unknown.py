@@ -1,15 +1,11 @@
 from aiogram import Router
 from aiogram.types import Message
 from bot.keyboards.admin import get_admin_keyboard
-from services.user_manager import UserManager
 
 router = Router()
 
 @router.message()
-async def unknown_message(message: Message):
-    user_manager = UserManager()
-    user = user_manager.get_user(message.from_user.id)
-
+async def unknown_message(message: Message, user: dict):
     if not user:
         await message.answer("Вы не зарегистрированы в системе. Используйте /start")
         return
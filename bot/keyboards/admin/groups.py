@@ -1,41 +1,23 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from typing import List, Dict
-from services.user_manager import UserManager
 
-def get_groups_selection_keyboard(action: str, user_id: int = None):
-    user_manager = UserManager()
-    groups = user_manager.get_all_groups()
-
-    keyboard = []
-    for group in groups:
-        if user_id:
-            callback_data = f"{action}_{user_id}_{group['id']}"
-        else:
-            callback_data = f"{action}_{group['id']}"
-
-        keyboard.append([
-            InlineKeyboardButton(
-                text=group['name'],
-                callback_data=callback_data
-            )
-        ])
+from bot.keyboards.pagination import get_paginated_keyboard
 
+def get_groups_selection_keyboard(page: Dict, action: str, user_id: int = None):
     if user_id:
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Создать новую группу",
-                callback_data=f"new_group_{user_id}"
-            )
-        ])
+        footer = [[InlineKeyboardButton(text="Создать новую группу", callback_data=f"new_group_{user_id}")]]
     else:
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Создать новую группу",
-                callback_data="create_group"
-            )
-        ])
-
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+        footer = [[InlineKeyboardButton(text="Создать новую группу", callback_data="create_group")]]
+
+    return get_paginated_keyboard(
+        page,
+        lambda group: InlineKeyboardButton(
+            text=group['name'],
+            callback_data=f"{action}_{user_id}_{group['id']}" if user_id else f"{action}_{group['id']}"
+        ),
+        f"groups:{action}:{user_id or 0}",
+        footer
+    )
 
 def get_group_management_keyboard(group_id: int):
     return InlineKeyboardMarkup(
@@ -71,72 +53,61 @@ def get_group_members_management_keyboard(group_id: int):
         ]
     )
 
-def get_students_management_keyboard(group_id: int, students: List[Dict]):
-    keyboard = []
-
-    for student in students:
-        keyboard.append([
-            InlineKeyboardButton(
-                text=f"Удалить {student['full_name']}",
-                callback_data=f"remove_student_{group_id}_{student['id']}"
-            )
-        ])
-
-    keyboard.append([
-        InlineKeyboardButton(text="Добавить учеников", callback_data=f"add_students_{group_id}"),
-        InlineKeyboardButton(text="Назад", callback_data=f"group_members_{group_id}")
-    ])
-
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
-
-def get_teachers_selection_keyboard(group_id: int):
-    user_manager = UserManager()
-    teachers = user_manager.get_available_teachers()
-
-    keyboard = []
-    for teacher in teachers:
-        keyboard.append([
-            InlineKeyboardButton(
-                text=teacher['full_name'],
-                callback_data=f"select_teacher_{group_id}_{teacher['id']}"
-            )
-        ])
+def get_students_management_keyboard(group_id: int, page: Dict):
+    return get_paginated_keyboard(
+        page,
+        lambda student: InlineKeyboardButton(
+            text=f"Удалить {student['full_name']}",
+            callback_data=f"remove_student_{group_id}_{student['id']}"
+        ),
+        f"members:{group_id}",
+        [[
+            InlineKeyboardButton(text="Добавить учеников", callback_data=f"add_students_{group_id}"),
+            InlineKeyboardButton(text="Назад", callback_data=f"group_members_{group_id}")
+        ]]
+    )
 
-    current_group = user_manager.get_group(group_id)
-    if current_group and current_group.get('teacher_id'):
-        keyboard.append([
+def get_teachers_selection_keyboard(group_id: int, page: Dict, has_teacher: bool = False):
+    footer = []
+    if has_teacher:
+        footer.append([
             InlineKeyboardButton(text="Удалить текущего учителя", callback_data=f"remove_teacher_{group_id}")
         ])
 
-    keyboard.append([
+    footer.append([
         InlineKeyboardButton(text="Назад", callback_data=f"group_info_{group_id}")
     ])
 
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
-
-def get_students_selection_keyboard(group_id: int):
-    user_manager = UserManager()
-    students = user_manager.get_students_without_groups()
-
-    keyboard = []
-    for student in students:
-        keyboard.append([
-            InlineKeyboardButton(
-                text=student['full_name'],
-                callback_data=f"select_student_{group_id}_{student['id']}"
-            )
-        ])
+    return get_paginated_keyboard(
+        page,
+        lambda teacher: InlineKeyboardButton(
+            text=teacher['full_name'],
+            callback_data=f"select_teacher_{group_id}_{teacher['id']}"
+        ),
+        f"teachers:{group_id}",
+        footer
+    )
 
-    if not students:
-        keyboard.append([
+def get_students_selection_keyboard(group_id: int, page: Dict):
+    footer = []
+    if not page['items']:
+        footer.append([
             InlineKeyboardButton(text="Нет доступных учеников", callback_data="no_action")
         ])
 
-    keyboard.append([
+    footer.append([
         InlineKeyboardButton(text="Назад", callback_data=f"group_members_{group_id}")
     ])
 
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+    return get_paginated_keyboard(
+        page,
+        lambda student: InlineKeyboardButton(
+            text=student['full_name'],
+            callback_data=f"select_student_{group_id}_{student['id']}"
+        ),
+        f"students:{group_id}",
+        footer
+    )
 
 def get_confirmation_keyboard(action: str, item_id: int):
     return InlineKeyboardMarkup(
@@ -0,0 +1,26 @@
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from typing import Callable, Dict, List, Tuple
+
+def get_page_navigation(page: Dict, nav: str) -> List[InlineKeyboardButton]:
+    row = []
+    if page['items'] and page['has_prev']:
+        row.append(InlineKeyboardButton(text="Предыдущие", callback_data=f"pg:{nav}:prev:{page['items'][0]['id']}"))
+    if page['items'] and page['has_next']:
+        row.append(InlineKeyboardButton(text="Следующие", callback_data=f"pg:{nav}:next:{page['items'][-1]['id']}"))
+    return row
+
+def get_paginated_keyboard(page: Dict, button: Callable[[Dict], InlineKeyboardButton], nav: str,
+                           footer: List[List[InlineKeyboardButton]] = None) -> InlineKeyboardMarkup:
+    keyboard = [[button(item)] for item in page['items']]
+
+    navigation = get_page_navigation(page, nav)
+    if navigation:
+        keyboard.append(navigation)
+
+    keyboard.extend(footer or [])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+def parse_page_callback(data: str) -> Tuple[str, str, str, int]:
+    nav, direction, cursor = data[len("pg:"):].rsplit(":", 2)
+    list_name, _, scope = nav.partition(":")
+    return list_name, scope, direction, int(cursor)
@@ -1,6 +1,5 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 from typing import List, Dict
-from services.subjects_manager import SubjectsManager
 
 def get_teacher_keyboard():
     return ReplyKeyboardMarkup(
@@ -19,19 +18,29 @@ def get_groups_keyboard(groups: List[Dict]):
     keyboard.append([KeyboardButton(text="Назад")])
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
-def get_attendance_keyboard():
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="Присутствовал"), KeyboardButton(text="Отсутствовал")],
-            [KeyboardButton(text="Опоздал"), KeyboardButton(text="Назад")]
-        ],
-        resize_keyboard=True
-    )
+ATTENDANCE_LABELS = {
+    'present': "Присутствует",
+    'absent': "Отсутствует",
+    'late': "Опоздал"
+}
+
+def get_roll_call_keyboard(students: List[Dict], statuses: Dict[str, str]):
+    keyboard = []
+    for student in students:
+        status = statuses[str(student['id'])]
+        keyboard.append([InlineKeyboardButton(
+            text=f"{student['full_name']} - {ATTENDANCE_LABELS[status]}",
+            callback_data=f"roll_{student['id']}"
+        )])
 
-def get_subjects_keyboard():
-    subjects_manager = SubjectsManager()
-    subjects = subjects_manager.get_all_subjects()
+    keyboard.append([InlineKeyboardButton(text="Все присутствуют", callback_data="roll_all")])
+    keyboard.append([
+        InlineKeyboardButton(text="Сохранить", callback_data="roll_save"),
+        InlineKeyboardButton(text="Отмена", callback_data="roll_cancel")
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+def get_subjects_keyboard(subjects: List[Dict]):
     keyboard = []
 
     if not subjects:
@@ -57,6 +66,25 @@ def get_grades_keyboard():
         resize_keyboard=True
     )
 
+def get_bulk_grades_keyboard():
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text="По одному"), KeyboardButton(text="Назад")]
+        ],
+        resize_keyboard=True
+    )
+
+def get_performance_keyboard():
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="За неделю", callback_data="performance_7"),
+                InlineKeyboardButton(text="За месяц", callback_data="performance_30"),
+                InlineKeyboardButton(text="За все время", callback_data="performance_all")
+            ]
+        ]
+    )
+
 def get_confirmation_keyboard():
     return ReplyKeyboardMarkup(
         keyboard=[
@@ -1,10 +1,20 @@
 import asyncio
 import logging
+import time
+
+STARTED_AT = time.monotonic()
+
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
-
-from config.config import BOT_TOKEN
+from aiogram.fsm.storage.base import BaseStorage
+
+from config.config import BOT_TOKEN, DB_WORKERS, BOT_MODE
+from services.database import Database
+from services.registry import ServiceRegistry
+from services.async_db import DatabaseExecutor
+from services.jobs import JobRunner
+from bot.middlewares import UserMiddleware, RoleMiddleware, StartupMetricsMiddleware
+from bot.storage import SQLiteStorage
 from bot.handlers import common, student, teacher
 
 from bot.handlers.admin_main import router as admin_main_router
@@ -28,12 +38,51 @@ logging.getLogger('google').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+def create_dispatcher(services: ServiceRegistry, db_executor: DatabaseExecutor, job_runner: JobRunner,
+                      auto_sync, storage: BaseStorage) -> Dispatcher:
+    dp = Dispatcher(storage=storage)
+    dp.workflow_data.update(services.dependencies(db_executor))
+    dp.workflow_data['job_runner'] = job_runner
+    dp.workflow_data['auto_sync'] = auto_sync
+
+    dp.update.outer_middleware(UserMiddleware(services.user_cache, dp.workflow_data['user_manager']))
+    dp.message.middleware(RoleMiddleware())
+    dp.callback_query.middleware(RoleMiddleware())
+
+    dp.include_router(common.router)
+    dp.include_router(student.router)
+    dp.include_router(teacher.router)
+
+    dp.include_router(admin_main_router)
+    dp.include_router(admin_users_router)
+    dp.include_router(admin_groups_router)
+    dp.include_router(admin_sync_router)
+    dp.include_router(admin_creation_router)
+    dp.include_router(admin_subjects_router)
+    dp.include_router(admin_schedule_router)
+    return dp
+
+def log_bootstrap_result(task: asyncio.Task):
+    if task.cancelled():
+        return
+    if task.exception():
+        logger.error(f"Ошибка инициализации Google Sheets: {task.exception()}")
+
 async def main():
     logger.info("Запуск бота KULUN School...")
 
+    db_executor = DatabaseExecutor(DB_WORKERS)
+    job_runner = JobRunner()
+    auto_sync = None
+    storage = None
+    sheets_bootstrap = None
+
     try:
-        from utils.auto_sync import initialize_system
-        initialize_system()
+        services = ServiceRegistry()
+        services.init_storage()
+
+        from utils.auto_sync import initialize_system, AutoSyncScheduler
+        auto_sync = AutoSyncScheduler(job_runner, db_executor, services.db)
 
         bot = Bot(
             token=BOT_TOKEN,
@@ -43,29 +92,36 @@ async def main():
             )
         )
 
-        dp = Dispatcher(storage=MemoryStorage())
-
-        dp.include_router(common.router)
-        dp.include_router(student.router)
-        dp.include_router(teacher.router)
-
-        dp.include_router(admin_main_router)
-        dp.include_router(admin_users_router)
-        dp.include_router(admin_groups_router)
-        dp.include_router(admin_sync_router)
-        dp.include_router(admin_creation_router)
-        dp.include_router(admin_subjects_router)
-        dp.include_router(admin_schedule_router)
+        storage = SQLiteStorage(services.db, db_executor)
+        dp = create_dispatcher(services, db_executor, job_runner, auto_sync, storage)
+        dp.update.outer_middleware(StartupMetricsMiddleware(STARTED_AT))
 
-        logger.info("Бот готов к работе")
+        logger.info(f"Бот готов к работе за {time.monotonic() - STARTED_AT:.2f} сек.")
 
-        await bot.delete_webhook(drop_pending_updates=True)
+        sheets_bootstrap = asyncio.create_task(asyncio.to_thread(initialize_system))
+        sheets_bootstrap.add_done_callback(log_bootstrap_result)
+        auto_sync.start()
 
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            from bot.webhook import run_webhook
+            await run_webhook(dp, bot)
+        else:
+            await bot.delete_webhook(drop_pending_updates=True)
+            await dp.start_polling(bot)
 
     except Exception as e:
         logger.error(f"Критическая ошибка: {e}")
         raise
+    finally:
+        if sheets_bootstrap:
+            await asyncio.gather(sheets_bootstrap, return_exceptions=True)
+        if auto_sync:
+            await auto_sync.stop()
+        if storage:
+            await storage.close()
+        job_runner.shutdown()
+        db_executor.shutdown()
+        Database.close_all()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,9 @@
+from .auth import UserMiddleware, RoleMiddleware, access_denial
+from .metrics import StartupMetricsMiddleware
+
+__all__ = [
+    'UserMiddleware',
+    'RoleMiddleware',
+    'access_denial',
+    'StartupMetricsMiddleware'
+]
@@ -0,0 +1,62 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject
+
+from services.async_db import AsyncService
+from services.user_cache import UserCache
+
+def teacher_denial(user: Optional[Dict]) -> str:
+    if not user:
+        return "Пользователь не найден в системе"
+
+    if user['role'] != 'teacher':
+        return f"Ваша роль: {user['role']}. Эта функция только для учителей"
+
+    return f"Ваш статус: {user['status']}. Ожидайте подтверждения администратора"
+
+def access_denial(user: Optional[Dict], role: str, active: bool = True) -> Optional[str]:
+    if user and user['role'] == role and (not active or user['status'] == 'active'):
+        return None
+
+    if role == 'teacher':
+        return teacher_denial(user)
+    return "Доступ запрещен"
+
+class UserMiddleware(BaseMiddleware):
+    def __init__(self, user_cache: UserCache, user_manager: AsyncService):
+        self.user_cache = user_cache
+        self.user_manager = user_manager
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        from_user = data.get('event_from_user')
+        if from_user:
+            found, user = self.user_cache.get(from_user.id)
+            if not found:
+                user = await self.user_manager.get_user(from_user.id)
+            data['user'] = user
+        return await handler(event, data)
+
+class RoleMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        role = get_flag(data, "role")
+        if not role:
+            return await handler(event, data)
+
+        reason = access_denial(data.get('user'), role, get_flag(data, "active", default=True))
+        if reason:
+            await event.answer(reason)
+            return None
+
+        return await handler(event, data)
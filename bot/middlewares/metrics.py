@@ -0,0 +1,26 @@
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+logger = logging.getLogger(__name__)
+
+class StartupMetricsMiddleware(BaseMiddleware):
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.time_to_first_update: Optional[float] = None
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        try:
+            return await handler(event, data)
+        finally:
+            if self.time_to_first_update is None:
+                self.time_to_first_update = time.monotonic() - self.started_at
+                logger.info(f"Time to first update: {self.time_to_first_update:.2f} sec.")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+from config.config import FSM_FLUSH_INTERVAL
+from services.async_db import DatabaseExecutor
+from services.database import Database
+
+logger = logging.getLogger(__name__)
+
+STATE_UPSERT = """
+    INSERT INTO fsm_storage (key, state) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET state = excluded.state, updated_at = CURRENT_TIMESTAMP
+"""
+
+DATA_UPSERT = """
+    INSERT INTO fsm_storage (key, data) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET data = excluded.data, updated_at = CURRENT_TIMESTAMP
+"""
+
+STATE_SELECT = "SELECT state, data FROM fsm_storage WHERE key = ?"
+
+EMPTY_DELETE = "DELETE FROM fsm_storage WHERE key = ? AND state IS NULL AND data = '{}'"
+
+class SQLiteStorage(BaseStorage):
+    def __init__(self, db: Database, executor: DatabaseExecutor, flush_interval: float = FSM_FLUSH_INTERVAL,
+                 key_builder: KeyBuilder = None):
+        self.db = db
+        self.executor = executor
+        self.flush_interval = flush_interval
+        self.key_builder = key_builder or DefaultKeyBuilder(with_destiny=True)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flushing: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        self._write(key, 'state', state.state if isinstance(state, State) else state)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await self._read(key, 'state')
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        self._write(key, 'data', json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return json.loads(await self._read(key, 'data'))
+
+    def _write(self, key: StorageKey, field: str, value: Optional[str]):
+        self._pending.setdefault(self.key_builder.build(key), {})[field] = value
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _read(self, key: StorageKey, field: str) -> Optional[str]:
+        storage_key = self.key_builder.build(key)
+        for entries in (self._pending, self._flushing):
+            entry = entries.get(storage_key)
+            if entry and field in entry:
+                return entry[field]
+
+        row = await self.executor.run(
+            self.db.fetch_one, STATE_SELECT, (storage_key,)
+        )
+        if row:
+            return row[field]
+        return None if field == 'state' else '{}'
+
+    async def _flush_later(self):
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]):
+        with self.db.transaction(immediate=True):
+            self.db.executemany(
+                STATE_UPSERT, [(key, entry['state']) for key, entry in entries.items() if 'state' in entry]
+            )
+            self.db.executemany(
+                DATA_UPSERT, [(key, entry['data']) for key, entry in entries.items() if 'data' in entry]
+            )
+            self.db.executemany(EMPTY_DELETE, [(key,) for key in entries])
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            entries, self._pending = self._pending, {}
+            self._flushing = entries
+            try:
+                await self.executor.run(self._save, entries)
+            except Exception as e:
+                logger.error(f"Error flushing {len(entries)} FSM record(s): {e}")
+                for key, entry in entries.items():
+                    self._pending[key] = {**entry, **self._pending.get(key, {})}
+            finally:
+                self._flushing = {}
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
@@ -0,0 +1,127 @@
+import asyncio
+import hmac
+import logging
+import signal
+from typing import Any, Dict, Set
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from config.config import (
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_SECRET,
+    WEBHOOK_MAX_CONCURRENCY, WEBHOOK_DRAIN_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+class WebhookServer:
+    def __init__(self, dp: Dispatcher, bot: Bot, path: str = WEBHOOK_PATH, secret_token: str = WEBHOOK_SECRET,
+                 max_concurrency: int = WEBHOOK_MAX_CONCURRENCY, drain_timeout: float = WEBHOOK_DRAIN_TIMEOUT):
+        self.dp = dp
+        self.bot = bot
+        self.path = path
+        self.secret_token = secret_token
+        self.max_concurrency = max_concurrency
+        self.drain_timeout = drain_timeout
+        self.processed = 0
+        self.failed = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._draining = False
+
+        self.app = web.Application()
+        self.app.router.add_post(path, self.handle)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret_token and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret_token):
+            logger.warning(f"Rejected webhook request from {request.remote}: invalid secret token")
+            return web.Response(status=401)
+
+        if self._draining:
+            return web.Response(status=503)
+
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        await self._semaphore.acquire()
+        if self._draining:
+            self._semaphore.release()
+            return web.Response(status=503)
+
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response()
+
+    async def _process(self, update: Dict[str, Any]):
+        try:
+            await self.dp.feed_raw_update(self.bot, update)
+            self.processed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error processing update {update.get('update_id')}: {e}")
+        finally:
+            self._semaphore.release()
+
+    async def drain(self):
+        self._draining = True
+        if not self._tasks:
+            return
+
+        logger.info(f"Waiting for {len(self._tasks)} update(s) in flight")
+        _, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+            logger.warning(f"Cancelled {len(pending)} update(s) after {self.drain_timeout} sec. drain timeout")
+
+    async def serve(self, host: str, port: int, stop: asyncio.Event):
+        runner = web.AppRunner(self.app)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        logger.info(f"Webhook server listening on {host}:{port}{self.path}")
+
+        try:
+            await stop.wait()
+        finally:
+            await self.drain()
+            await runner.cleanup()
+            logger.info(f"Webhook server stopped: {self.processed} update(s) processed, {self.failed} failed")
+
+async def run_webhook(dp: Dispatcher, bot: Bot, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT):
+    server = WebhookServer(dp, bot)
+    if not server.secret_token:
+        logger.warning("WEBHOOK_SECRET is not set, webhook requests are not authenticated")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    if WEBHOOK_URL:
+        await bot.set_webhook(
+            WEBHOOK_URL.rstrip("/") + server.path,
+            secret_token=server.secret_token or None,
+            allowed_updates=dp.resolve_used_update_types(),
+            max_connections=min(server.max_concurrency, 100)
+        )
+        logger.info(f"Webhook registered at {WEBHOOK_URL}")
+
+    await dp.emit_startup(bot=bot, **dp.workflow_data)
+    try:
+        await server.serve(host, port, stop)
+    finally:
+        await dp.emit_shutdown(bot=bot, **dp.workflow_data)
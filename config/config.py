@@ -8,6 +8,31 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 SPREADSHEET_ID = os.getenv("SPREADSHEET_ID")
 CREDENTIALS_FILE = "credentials.json"
 
+DB_WORKERS = int(os.getenv("DB_WORKERS", "4"))
+
+SHEETS_CHUNK_SIZE = int(os.getenv("SHEETS_CHUNK_SIZE", "2000"))
+
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+KEYBOARD_PAGE_SIZE = int(os.getenv("KEYBOARD_PAGE_SIZE", "10"))
+
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", "1"))
+
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "32"))
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30"))
+
+AUTO_SYNC_INTERVAL = int(os.getenv("AUTO_SYNC_INTERVAL", "900"))
+AUTO_SYNC_QUIET_HOURS = os.getenv("AUTO_SYNC_QUIET_HOURS", "")
+AUTO_SYNC_JITTER = int(os.getenv("AUTO_SYNC_JITTER", "60"))
+AUTO_SYNC_MAX_BACKOFF = int(os.getenv("AUTO_SYNC_MAX_BACKOFF", "3600"))
+
 SHEET_NAMES = {
     "users": "Users",
     "groups": "Groups",
@@ -6,6 +6,9 @@ from .attendance_manager import AttendanceManager
 from .assignment_manager import AssignmentManager
 from .grades_manager import GradesManager
 from .subjects_manager import SubjectsManager
+from .student_dashboard import StudentDashboard
+from .group_analytics import GroupAnalytics
+from .registry import ServiceRegistry
 
 __all__ = [
     'Database',
@@ -15,5 +18,8 @@ __all__ = [
     'AttendanceManager',
     'AssignmentManager',
     'GradesManager',
-    'SubjectsManager'
+    'SubjectsManager',
+    'StudentDashboard',
+    'GroupAnalytics',
+    'ServiceRegistry'
 ]
\ No newline at end of file
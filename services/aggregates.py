@@ -0,0 +1,46 @@
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_SOURCES = {
+    'student_grade_summary': """
+        SELECT student_id, subject, COUNT(*), SUM(grade)
+        FROM grades
+        GROUP BY student_id, subject
+    """,
+    'group_grade_summary': """
+        SELECT group_id, subject, grade, COUNT(*)
+        FROM grades
+        GROUP BY group_id, subject, grade
+    """,
+    'attendance_summary': """
+        SELECT student_id, group_id, COUNT(*),
+               SUM(status = 'present'), SUM(status = 'late'), SUM(status = 'absent')
+        FROM attendance
+        GROUP BY student_id, group_id
+    """
+}
+
+def rebuild_aggregates(db) -> Dict[str, int]:
+    counts = {}
+    with db.transaction(immediate=True):
+        for table, source in AGGREGATE_SOURCES.items():
+            db.execute(f"DELETE FROM {table}")
+            db.execute(f"INSERT INTO {table} {source}")
+            counts[table] = db.fetch_one(f"SELECT COUNT(*) as count FROM {table}")['count']
+    logger.info(f"Aggregates rebuilt: {counts}")
+    return counts
+
+def verify_aggregates(db) -> List[str]:
+    mismatched = []
+    for table, source in AGGREGATE_SOURCES.items():
+        diff = db.fetch_one(
+            f"""SELECT
+                   (SELECT COUNT(*) FROM (SELECT * FROM {table} EXCEPT {source})) +
+                   (SELECT COUNT(*) FROM ({source} EXCEPT SELECT * FROM {table})) as count"""
+        )
+        if diff['count']:
+            logger.error(f"Aggregate table {table} differs from raw data in {diff['count']} row(s)")
+            mismatched.append(table)
+    return mismatched
@@ -1,13 +1,12 @@
 import logging
 from datetime import datetime
-from . import UserManager
 from .database import Database
 
 logger = logging.getLogger(__name__)
 
 class AssignmentManager:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
 
     def create_assignment(self, title: str, description: str, group_id: int, teacher_id: int, deadline: datetime.date) -> int:
         try:
@@ -62,20 +61,14 @@ class AssignmentManager:
 
     def get_assignments_for_student(self, student_id: int) -> list:
         try:
-            user_manager = UserManager()
-            student = user_manager.get_user_by_id(student_id)
-
-            if not student or not student.get('group_id'):
-                return []
-
             return self.db.fetch_all(
                 """SELECT a.*, u.full_name as teacher_name, g.name as group_name
                    FROM assignments a
                    JOIN users u ON a.teacher_id = u.id
                    JOIN groups g ON a.group_id = g.id
-                   WHERE a.group_id = ?
+                   WHERE a.group_id = (SELECT group_id FROM users WHERE id = ?)
                    ORDER BY a.deadline ASC""",
-                (student['group_id'],)
+                (student_id,)
             )
         except Exception as e:
             logger.error(f"Error getting student assignments: {e}")
@@ -0,0 +1,43 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+class DatabaseExecutor:
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        logger.info("Database executor stopped")
+
+class AsyncService:
+    def __init__(self, service, executor: DatabaseExecutor):
+        self._service = service
+        self._executor = executor
+
+    @property
+    def service(self):
+        return self._service
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._executor.run(attr, *args, **kwargs)
+
+        setattr(self, name, call)
+        return call
@@ -1,36 +1,55 @@
 import logging
 from datetime import datetime
+from typing import Dict
 from .database import Database
 
 logger = logging.getLogger(__name__)
 
+ATTENDANCE_UPSERT = """
+    INSERT INTO attendance (date, group_id, student_id, status, marked_by)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(student_id, group_id, date) DO UPDATE SET
+        status = excluded.status,
+        marked_by = excluded.marked_by,
+        marked_at = CURRENT_TIMESTAMP
+"""
+
 class AttendanceManager:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
 
     def mark_attendance(self, student_id: int, group_id: int, date: datetime.date, status: str, marked_by: int) -> bool:
         try:
-            existing = self.db.fetch_one(
-                "SELECT id FROM attendance WHERE student_id = ? AND date = ? AND group_id = ?",
-                (student_id, date, group_id)
-            )
+            self.db.execute(ATTENDANCE_UPSERT, (date, group_id, student_id, status, marked_by))
+            return True
+        except Exception as e:
+            logger.error(f"Error marking attendance: {e}")
+            return False
 
-            if existing:
-                self.db.execute(
-                    "UPDATE attendance SET status = ?, marked_by = ?, marked_at = CURRENT_TIMESTAMP WHERE id = ?",
-                    (status, marked_by, existing['id'])
-                )
-            else:
-                self.db.execute(
-                    """INSERT INTO attendance (date, group_id, student_id, status, marked_by)
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (date, group_id, student_id, status, marked_by)
+    def mark_attendance_bulk(self, group_id: int, date: datetime.date, statuses: Dict[int, str], marked_by: int) -> bool:
+        try:
+            with self.db.transaction():
+                self.db.executemany(
+                    ATTENDANCE_UPSERT,
+                    [(date, group_id, student_id, status, marked_by) for student_id, status in statuses.items()]
                 )
+            logger.info(f"Attendance for group {group_id} on {date} marked: {len(statuses)} students")
             return True
         except Exception as e:
-            logger.error(f"Error marking attendance: {e}")
+            logger.error(f"Error marking attendance for group {group_id}: {e}")
             return False
 
+    def get_group_statuses(self, group_id: int, date: datetime.date) -> Dict[int, str]:
+        try:
+            rows = self.db.fetch_all(
+                "SELECT student_id, status FROM attendance WHERE group_id = ? AND date = ?",
+                (group_id, date)
+            )
+            return {row['student_id']: row['status'] for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting attendance statuses: {e}")
+            return {}
+
     def get_group_attendance(self, group_id: int, date: datetime.date) -> list:
         try:
             return self.db.fetch_all(
@@ -46,17 +65,12 @@ class AttendanceManager:
 
     def get_student_attendance_stats(self, student_id: int, group_id: int) -> dict:
         try:
-            total = self.db.fetch_one(
-                "SELECT COUNT(*) as total FROM attendance WHERE student_id = ? AND group_id = ?",
-                (student_id, group_id)
-            )
-            total = total['total'] if total else 0
-
-            present = self.db.fetch_one(
-                "SELECT COUNT(*) as present FROM attendance WHERE student_id = ? AND group_id = ? AND status = 'present'",
+            summary = self.db.fetch_one(
+                "SELECT total, present FROM attendance_summary WHERE student_id = ? AND group_id = ?",
                 (student_id, group_id)
             )
-            present = present['present'] if present else 0
+            total = summary['total'] if summary else 0
+            present = summary['present'] if summary else 0
 
             return {
                 'total_classes': total,
@@ -1,130 +1,186 @@
 import sqlite3
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Dict, Optional, Iterable, Iterator
+from .migrations import apply_migrations
 
 logger = logging.getLogger(__name__)
 
+query_counter: ContextVar[Optional[List[int]]] = ContextVar('query_counter', default=None)
+
+@contextmanager
+def count_queries():
+    counter = [0]
+    token = query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        query_counter.reset(token)
+
+class ConnectionManager:
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        return conn
+
+    def _prune_dead_threads(self):
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            try:
+                self._connections.pop(ident).close()
+            except Exception as e:
+                logger.warning(f"Error closing connection of finished thread: {e}")
+
+    def get_connection(self) -> sqlite3.Connection:
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None and local.generation == self._generation:
+            return conn
+
+        conn = self._connect()
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.get_ident()] = conn
+            local.generation = self._generation
+        local.conn = conn
+        local.depth = 0
+        return conn
+
+    @property
+    def transaction_depth(self) -> int:
+        return getattr(self._local, 'depth', 0)
+
+    @transaction_depth.setter
+    def transaction_depth(self, value: int):
+        self._local.depth = value
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        self._local.conn = None
+        self._local.depth = 0
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._generation += 1
+
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Error closing connection: {e}")
+
+        if connections:
+            logger.info(f"Closed {len(connections)} database connection(s) for {self.db_path}")
+
 class Database:
+    _managers: Dict[str, ConnectionManager] = {}
+    _managers_lock = threading.Lock()
+
     def __init__(self, db_path="kulun_school.db"):
         self.db_path = db_path
-        self.init_db()
+        self.connections = self._get_manager(db_path)
 
-    def init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users
-                (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    telegram_id INTEGER UNIQUE NOT NULL,
-                    full_name TEXT NOT NULL,
-                    phone TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    group_id INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (group_id) REFERENCES groups (id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS groups
-                (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    teacher_id INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (teacher_id) REFERENCES users (id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS assignments
-                (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    group_id INTEGER NOT NULL,
-                    teacher_id INTEGER NOT NULL,
-                    deadline TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (group_id) REFERENCES groups (id),
-                    FOREIGN KEY (teacher_id) REFERENCES users (id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS attendance
-                (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
-                    group_id INTEGER NOT NULL,
-                    student_id INTEGER NOT NULL,
-                    status TEXT NOT NULL,
-                    marked_by INTEGER NOT NULL,
-                    marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (group_id) REFERENCES groups (id),
-                    FOREIGN KEY (student_id) REFERENCES users (id),
-                    FOREIGN KEY (marked_by) REFERENCES users (id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS grades
-                (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id INTEGER NOT NULL,
-                    group_id INTEGER NOT NULL,
-                    subject TEXT NOT NULL,
-                    grade INTEGER NOT NULL,
-                    date DATE NOT NULL,
-                    teacher_id INTEGER NOT NULL,
-                    comment TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(student_id) REFERENCES users(id),
-                    FOREIGN KEY(group_id) REFERENCES groups(id),
-                    FOREIGN KEY (teacher_id) REFERENCES users(id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS subjects
-                (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS schedule
-                (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    group_id INTEGER NOT NULL,
-                    day_of_week TEXT NOT NULL,
-                    start_time TEXT NOT NULL,
-                    end_time TEXT NOT NULL,
-                    subject TEXT NOT NULL,
-                    teacher_id INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(group_id) REFERENCES groups(id),
-                    FOREIGN KEY(teacher_id) REFERENCES users(id)
-                )
-            ''')
+    @classmethod
+    def _get_manager(cls, db_path: str) -> ConnectionManager:
+        with cls._managers_lock:
+            manager = cls._managers.get(db_path)
+            if manager is None:
+                manager = ConnectionManager(db_path)
+                cls._managers[db_path] = manager
+            return manager
+
+    @classmethod
+    def close_all(cls):
+        with cls._managers_lock:
+            managers = list(cls._managers.values())
 
+        for manager in managers:
+            manager.close_all()
+
+    def init_db(self):
+        version = apply_migrations(self)
+        logger.info(f"Database initialized (schema version {version})")
+
+    def connection(self) -> sqlite3.Connection:
+        return self.connections.get_connection()
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        conn = self.connections.get_connection()
+        depth = self.connections.transaction_depth
+
+        if depth:
+            self.connections.transaction_depth = depth + 1
+            try:
+                yield conn
+            finally:
+                self.connections.transaction_depth = depth
+            return
+
+        if conn.in_transaction:
             conn.commit()
-            logger.info("Database initialized")
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self.connections.transaction_depth = 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.connections.transaction_depth = 0
+
+    def close(self):
+        self.connections.close()
+
+    def shutdown(self):
+        self.connections.close_all()
 
     def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
+        counter = query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+        conn = self.connections.get_connection()
+        try:
+            cursor = conn.execute(query, params)
+        except Exception:
+            if not self.connections.transaction_depth and conn.in_transaction:
+                conn.rollback()
+            raise
+
+        if not self.connections.transaction_depth:
+            conn.commit()
         return cursor
 
+    def executemany(self, query: str, seq_of_params: Iterable[tuple]) -> sqlite3.Cursor:
+        counter = query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+        with self.transaction() as conn:
+            return conn.executemany(query, seq_of_params)
+
     def fetch_one(self, query: str, params: tuple = ()) -> Optional[Dict]:
         cursor = self.execute(query, params)
         columns = [col[0] for col in cursor.description]
@@ -138,6 +194,29 @@ class Database:
         columns = [col[0] for col in cursor.description]
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    def iterate(self, query: str, params: tuple = (), batch_size: int = 1000) -> Iterator[tuple]:
+        cursor = self.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def fetch_page(self, query: str, params: tuple = (), after_id: int = None, before_id: int = None,
+                   limit: int = 10) -> Dict:
+        if before_id is not None:
+            rows = self.fetch_all(
+                query.format(keyset="id < ?") + " ORDER BY id DESC LIMIT ?",
+                tuple(params) + (before_id, limit + 1)
+            )
+            return {'items': rows[:limit][::-1], 'has_prev': len(rows) > limit, 'has_next': True}
+
+        rows = self.fetch_all(
+            query.format(keyset="id > ?") + " ORDER BY id LIMIT ?",
+            tuple(params) + (after_id or 0, limit + 1)
+        )
+        return {'items': rows[:limit], 'has_prev': after_id is not None, 'has_next': len(rows) > limit}
+
     def user_exists(self, telegram_id: int) -> bool:
         user = self.fetch_one("SELECT id FROM users WHERE telegram_id = ?", (telegram_id,))
         return user is not None
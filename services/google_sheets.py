@@ -1,95 +1,288 @@
-import gspread
-from google.oauth2.service_account import Credentials
-from config.config import SPREADSHEET_ID, CREDENTIALS_FILE
+from config.config import SPREADSHEET_ID, CREDENTIALS_FILE, SHEETS_CHUNK_SIZE
+from typing import Callable, Dict, Iterable, List, Optional
+import itertools
 import logging
+import random
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+SHEET_HEADERS = {
+    "Users": [
+        "ID", "Telegram ID", "Full Name", "Phone", "Role",
+        "Status", "Group ID", "Group Name", "Created At"
+    ],
+    "Groups": [
+        "ID", "Name", "Teacher ID", "Teacher Name",
+        "Students Count", "Created At"
+    ],
+    "Assignments": [
+        "ID", "Title", "Description", "Group ID", "Group Name",
+        "Teacher ID", "Teacher Name", "Deadline", "Created At"
+    ],
+    "Attendance": [
+        "ID", "Date", "Group ID", "Group Name", "Student ID",
+        "Student Name", "Status", "Marked By", "Marked At"
+    ]
+}
+
+SHEETS_MAX_RETRIES = 3
+QUOTA_BACKOFF_BASE = 5
+QUOTA_BACKOFF_MAX = 60
+
+STALE_SHEET_ERRORS = ("unable to parse range", "no grid with id", "exceeds grid limits")
+
+def is_quota_error(error: Exception) -> bool:
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    message = str(error).lower()
+    return 'quota' in message or 'rate_limit' in message
+
+def is_stale_sheet_error(error: Exception) -> bool:
+    if type(error).__name__ == "WorksheetNotFound":
+        return True
+    message = str(error).lower()
+    return any(text in message for text in STALE_SHEET_ERRORS)
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    if is_quota_error(error):
+        return min(QUOTA_BACKOFF_BASE * 2 ** attempt, QUOTA_BACKOFF_MAX) + random.uniform(0, 1)
+    return 1
+
+def to_sheet_row(row: Iterable) -> list:
+    return ["" if value is None else value for value in row]
+
 class GoogleSheetsManager:
     def __init__(self):
         self.scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        try:
-            self.creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=self.scope)
-            self.client = gspread.authorize(self.creds)
-            self.sheet = self.client.open_by_key(SPREADSHEET_ID)
-            logger.info("Google Sheets connected")
-        except Exception as e:
-            logger.error(f"Error connecting to Google Sheets: {e}")
-            self.client = None
+        self.creds = None
+        self.client = None
+        self.sheet = None
+        self.worksheets: Optional[Dict] = None
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.RLock()
+
+    def connect(self) -> bool:
+        with self._lock:
+            if self.sheet:
+                return True
+
+            try:
+                import gspread
+                from google.oauth2.service_account import Credentials
+
+                self.creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=self.scope)
+                self.client = gspread.authorize(self.creds)
+                self.sheet = self.client.open_by_key(SPREADSHEET_ID)
+                logger.info("Google Sheets connected")
+                return True
+            except Exception as e:
+                logger.error(f"Error connecting to Google Sheets: {e}")
+                self.last_error = e
+                self.client = None
+                self.sheet = None
+                return False
+
+    def invalidate(self, sheet_name: str = None):
+        with self._lock:
+            if sheet_name is None:
+                self.worksheets = None
+            elif self.worksheets is not None:
+                self.worksheets.pop(sheet_name, None)
+
+    def invalidate_if_stale(self, worksheet, error: Exception) -> bool:
+        if not is_stale_sheet_error(error):
+            return False
+
+        logger.warning(f"Sheet {worksheet.title} changed outside the bot, cached handle dropped")
+        self.invalidate(worksheet.title)
+        return True
 
     def get_worksheet(self, sheet_name):
-        if not self.client:
+        if not self.connect():
             return None
 
-        try:
-            return self.sheet.worksheet(sheet_name)
-        except gspread.WorksheetNotFound:
+        with self._lock:
+            try:
+                if self.worksheets is None or sheet_name not in self.worksheets:
+                    self.worksheets = {worksheet.title: worksheet for worksheet in self.sheet.worksheets()}
+
+                worksheet = self.worksheets.get(sheet_name)
+                if worksheet:
+                    return worksheet
+            except Exception as e:
+                logger.error(f"Error accessing sheet {sheet_name}: {e}")
+                self.last_error = e
+                return None
+
             try:
                 worksheet = self.sheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
 
-                if sheet_name == "Users":
-                    worksheet.append_row([
-                        "ID", "Telegram ID", "Full Name", "Phone", "Role",
-                        "Status", "Group ID", "Group Name", "Created At"
-                    ])
-                elif sheet_name == "Groups":
-                    worksheet.append_row([
-                        "ID", "Name", "Teacher ID", "Teacher Name",
-                        "Students Count", "Created At"
-                    ])
-                elif sheet_name == "Assignments":
-                    worksheet.append_row([
-                        "ID", "Title", "Description", "Group ID", "Group Name",
-                        "Teacher ID", "Teacher Name", "Deadline", "Created At"
-                    ])
-                elif sheet_name == "Attendance":
-                    worksheet.append_row([
-                        "ID", "Date", "Group ID", "Group Name", "Student ID",
-                        "Student Name", "Status", "Marked By", "Marked At"
-                    ])
+                if sheet_name in SHEET_HEADERS:
+                    worksheet.append_row(SHEET_HEADERS[sheet_name])
 
+                self.worksheets[sheet_name] = worksheet
                 logger.info(f"New sheet created: {sheet_name}")
                 return worksheet
             except Exception as e:
                 logger.error(f"Error creating sheet {sheet_name}: {e}")
+                self.last_error = e
                 return None
-        except Exception as e:
-            logger.error(f"Error accessing sheet {sheet_name}: {e}")
-            return None
 
-    def safe_append_row(self, worksheet, row_data):
+    def _with_retries(self, worksheet, call: Callable[[], object], description: str) -> bool:
         if not worksheet:
             return False
 
-        max_retries = 3
-        for attempt in range(max_retries):
+        for attempt in range(SHEETS_MAX_RETRIES):
             try:
-                worksheet.append_row(row_data)
+                call()
                 return True
             except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(1)
+                if attempt < SHEETS_MAX_RETRIES - 1 and not self.invalidate_if_stale(worksheet, e):
+                    time.sleep(retry_delay(attempt, e))
                     continue
-                logger.error(f"Error adding row after {max_retries} attempts: {e}")
+                logger.error(f"Error {description} after {attempt + 1} attempt(s): {e}")
+                self.last_error = e
                 return False
 
-    def safe_update_cell(self, worksheet, row, col, value):
+    def safe_append_row(self, worksheet, row_data):
+        return self._with_retries(worksheet, lambda: worksheet.append_row(row_data), "adding row")
+
+    def safe_update_range(self, worksheet, range_name: str, values: List[list]) -> bool:
+        return self._with_retries(
+            worksheet, lambda: worksheet.update(range_name, values, value_input_option='RAW'),
+            f"updating range {range_name}"
+        )
+
+    def write_table(self, worksheet, header: list, rows: Iterable[Iterable], chunk_size: int = None,
+                    total_rows: int = None, progress: Optional[Callable[[int, int], None]] = None) -> bool:
         if not worksheet:
             return False
 
-        max_retries = 3
-        for attempt in range(max_retries):
+        chunk_size = chunk_size or SHEETS_CHUNK_SIZE
+
+        if not self.clear_worksheet(worksheet):
+            return False
+
+        if total_rows is not None and worksheet.row_count < total_rows + 1:
+            worksheet.resize(rows=total_rows + 1)
+
+        values = itertools.chain([header], (to_sheet_row(row) for row in rows))
+        start_row = 1
+        written = 0
+        while True:
+            chunk = list(itertools.islice(values, chunk_size))
+            if not chunk:
+                break
+
+            end_row = start_row + len(chunk) - 1
+            if worksheet.row_count < end_row:
+                worksheet.resize(rows=end_row)
+
+            if not self.safe_update_range(worksheet, f"A{start_row}", chunk):
+                return False
+
+            written = end_row - 1
+            start_row = end_row + 1
+            if progress:
+                progress(written, total_rows if total_rows is not None else written)
+            if total_rows is not None and total_rows > chunk_size:
+                logger.info(f"{worksheet.title}: {written}/{total_rows} rows written")
+
+        return True
+
+    def safe_batch_update(self, worksheet, data: List[dict]) -> bool:
+        return self._with_retries(
+            worksheet, lambda: worksheet.batch_update(data, value_input_option='RAW'),
+            f"updating {len(data)} ranges"
+        )
+
+    def safe_append_rows(self, worksheet, rows: List[list]) -> bool:
+        return self._with_retries(
+            worksheet, lambda: worksheet.append_rows(rows, value_input_option='RAW'), f"appending {len(rows)} rows"
+        )
+
+    def get_row_positions(self, worksheet, header: list):
+        try:
+            ids = worksheet.col_values(1)
+        except Exception as e:
+            self.invalidate_if_stale(worksheet, e)
+            logger.error(f"Error reading ID column of {worksheet.title}: {e}")
+            self.last_error = e
+            return None
+
+        if not ids or ids[0] != header[0]:
+            return None
+
+        positions = {}
+        for row_number, value in enumerate(ids[1:], 2):
+            if value == "":
+                continue
             try:
-                worksheet.update_cell(row, col, value)
-                return True
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(1)
-                    continue
-                logger.error(f"Error updating cell after {max_retries} attempts: {e}")
+                row_id = int(value)
+            except ValueError:
+                return None
+            if row_id in positions:
+                return None
+            positions[row_id] = row_number
+
+        return positions
+
+    def write_row_changes(self, worksheet, header: list, rows: Dict[int, list], deleted_ids: Iterable[int],
+                          expected_total: int, chunk_size: int = None) -> bool:
+        if not worksheet:
+            return False
+
+        positions = self.get_row_positions(worksheet, header)
+        if positions is None:
+            logger.warning(f"{worksheet.title}: unexpected sheet layout, incremental update skipped")
+            return False
+
+        deleted = [row_id for row_id in deleted_ids if row_id in positions]
+        appended = [row_id for row_id in rows if row_id not in positions]
+        if len(positions) - len(deleted) + len(appended) != expected_total:
+            logger.warning(f"{worksheet.title}: sheet is out of sync with the database, incremental update skipped")
+            return False
+
+        deleted_rows = {positions.pop(row_id) for row_id in deleted}
+        free_rows = sorted(deleted_rows, reverse=True)
+
+        data = []
+        new_rows = []
+        for row_id, row in rows.items():
+            if row_id in positions:
+                row_number = positions[row_id]
+            elif free_rows:
+                row_number = free_rows.pop()
+            else:
+                new_rows.append(to_sheet_row(row))
+                continue
+            data.append({'range': f"A{row_number}", 'values': [to_sheet_row(row)]})
+
+        for row_number in free_rows:
+            if row_number in deleted_rows:
+                data.append({'range': f"A{row_number}", 'values': [[""] * len(header)]})
+
+        chunk_size = chunk_size or SHEETS_CHUNK_SIZE
+        for start in range(0, len(data), chunk_size):
+            if not self.safe_batch_update(worksheet, data[start:start + chunk_size]):
+                return False
+
+        for start in range(0, len(new_rows), chunk_size):
+            if not self.safe_append_rows(worksheet, new_rows[start:start + chunk_size]):
                 return False
 
+        logger.info(
+            f"{worksheet.title}: {len(rows)} rows written incrementally "
+            f"({len(new_rows)} appended, {len(deleted)} removed)"
+        )
+        return True
+
+    def safe_update_cell(self, worksheet, row, col, value):
+        return self._with_retries(worksheet, lambda: worksheet.update_cell(row, col, value), "updating cell")
+
     def clear_worksheet(self, worksheet):
         if not worksheet:
             return False
@@ -98,7 +291,9 @@ class GoogleSheetsManager:
             worksheet.clear()
             return True
         except Exception as e:
+            self.invalidate_if_stale(worksheet, e)
             logger.error(f"Error clearing sheet: {e}")
+            self.last_error = e
             return False
 
     def get_all_records_safe(self, worksheet):
@@ -108,5 +303,17 @@ class GoogleSheetsManager:
         try:
             return worksheet.get_all_records()
         except Exception as e:
+            self.invalidate_if_stale(worksheet, e)
             logger.error(f"Error getting records: {e}")
-            return []
\ No newline at end of file
+            self.last_error = e
+            return []
+
+_shared_manager: Optional[GoogleSheetsManager] = None
+_shared_lock = threading.Lock()
+
+def get_sheets_manager() -> GoogleSheetsManager:
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is None:
+            _shared_manager = GoogleSheetsManager()
+        return _shared_manager
\ No newline at end of file
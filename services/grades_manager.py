@@ -6,8 +6,8 @@ from .database import Database
 logger = logging.getLogger(__name__)
 
 class GradesManager:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
 
     def add_grade(self, student_id: int, group_id: int, subject: str, grade: int,
                   teacher_id: int, date: datetime.date = None, comment: str = None) -> bool:
@@ -30,6 +30,29 @@ class GradesManager:
             logger.error(f"Error adding grade: {e}")
             return False
 
+    def add_grades_bulk(self, group_id: int, subject: str, grades: Dict[int, int],
+                        teacher_id: int, date: datetime.date = None) -> bool:
+        try:
+            if date is None:
+                date = datetime.now().date()
+
+            invalid = [grade for grade in grades.values() if grade < 1 or grade > 5]
+            if invalid:
+                logger.error(f"Invalid grades: {invalid}")
+                return False
+
+            with self.db.transaction():
+                self.db.executemany(
+                    """INSERT INTO grades (student_id, group_id, subject, grade, date, teacher_id)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    [(student_id, group_id, subject, grade, date, teacher_id) for student_id, grade in grades.items()]
+                )
+            logger.info(f"{len(grades)} grades added for group {group_id} ({subject})")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding grades for group {group_id}: {e}")
+            return False
+
     def get_student_grades(self, student_id: int, subject: str = None) -> List[Dict]:
         try:
             if subject:
@@ -74,12 +97,14 @@ class GradesManager:
         try:
             if subject:
                 result = self.db.fetch_one(
-                    "SELECT AVG(grade) as average FROM grades WHERE student_id = ? AND subject = ?",
+                    """SELECT SUM(grade_sum) * 1.0 / SUM(grade_count) as average
+                       FROM student_grade_summary WHERE student_id = ? AND subject = ?""",
                     (student_id, subject)
                 )
             else:
                 result = self.db.fetch_one(
-                    "SELECT AVG(grade) as average FROM grades WHERE student_id = ?",
+                    """SELECT SUM(grade_sum) * 1.0 / SUM(grade_count) as average
+                       FROM student_grade_summary WHERE student_id = ?""",
                     (student_id,)
                 )
 
@@ -92,12 +117,14 @@ class GradesManager:
         try:
             if subject:
                 result = self.db.fetch_one(
-                    "SELECT AVG(grade) as average FROM grades WHERE group_id = ? AND subject = ?",
+                    """SELECT SUM(grade * grade_count) * 1.0 / SUM(grade_count) as average
+                       FROM group_grade_summary WHERE group_id = ? AND subject = ?""",
                     (group_id, subject)
                 )
             else:
                 result = self.db.fetch_one(
-                    "SELECT AVG(grade) as average FROM grades WHERE group_id = ?",
+                    """SELECT SUM(grade * grade_count) * 1.0 / SUM(grade_count) as average
+                       FROM group_grade_summary WHERE group_id = ?""",
                     (group_id,)
                 )
 
@@ -120,23 +147,58 @@ class GradesManager:
             logger.error(f"Error getting recent grades: {e}")
             return []
 
-    def get_grade_statistics(self, group_id: int) -> Dict:
+    def get_group_recent_grades(self, group_id: int, subject: str, limit: int = 3) -> Dict[int, List[int]]:
         try:
-            total_grades = self.db.fetch_one(
-                "SELECT COUNT(*) as count FROM grades WHERE group_id = ?",
-                (group_id,)
-            )['count']
+            rows = self.db.fetch_all(
+                """SELECT student_id, grade
+                   FROM (
+                       SELECT student_id, grade,
+                              ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY date DESC, id DESC) as position
+                       FROM grades
+                       WHERE subject = ? AND student_id IN (
+                           SELECT id FROM users WHERE group_id = ? AND role = 'student' AND status = 'active'
+                       )
+                   )
+                   WHERE position <= ?
+                   ORDER BY student_id, position""",
+                (subject, group_id, limit)
+            )
+
+            recent = {}
+            for row in rows:
+                recent.setdefault(row['student_id'], []).append(row['grade'])
+            return recent
+        except Exception as e:
+            logger.error(f"Error getting recent grades for group {group_id}: {e}")
+            return {}
 
+    def get_student_recent_grades(self, student_id: int, subject: str, limit: int = 3) -> List[int]:
+        try:
+            rows = self.db.fetch_all(
+                "SELECT grade FROM grades WHERE student_id = ? AND subject = ? ORDER BY date DESC, id DESC LIMIT ?",
+                (student_id, subject, limit)
+            )
+            return [row['grade'] for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting recent grades for student {student_id}: {e}")
+            return []
+
+    def get_grade_statistics(self, group_id: int) -> Dict:
+        try:
             grade_distribution = self.db.fetch_all(
-                "SELECT grade, COUNT(*) as count FROM grades WHERE group_id = ? GROUP BY grade ORDER BY grade",
+                """SELECT grade, SUM(grade_count) as count
+                   FROM group_grade_summary
+                   WHERE group_id = ?
+                   GROUP BY grade ORDER BY grade""",
                 (group_id,)
             )
 
-            average_grade = self.get_group_average_grade(group_id)
+            total_grades = sum(item['count'] for item in grade_distribution)
+            grade_sum = sum(item['grade'] * item['count'] for item in grade_distribution)
 
             return {
                 'total_grades': total_grades,
-                'average_grade': average_grade,
+                'average_grade': round(grade_sum / total_grades, 2) if total_grades else 0.0,
                 'grade_distribution': {item['grade']: item['count'] for item in grade_distribution}
             }
         except Exception as e:
@@ -0,0 +1,140 @@
+import logging
+from datetime import datetime
+from typing import List, Dict, Tuple
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+TEACHER_REPORT_QUERY = """
+    WITH teacher_groups AS (
+        SELECT id, name FROM groups WHERE teacher_id = ?
+    ),
+    student_counts AS (
+        SELECT group_id, COUNT(*) as students_count
+        FROM users
+        WHERE group_id IN (SELECT id FROM teacher_groups) AND role = 'student' AND status = 'active'
+        GROUP BY group_id
+    ),
+    attendance_totals AS ({attendance_totals}),
+    grade_totals AS ({grade_totals})
+    SELECT g.id, g.name,
+           COALESCE(s.students_count, 0) as students_count,
+           COALESCE(a.total_marks, 0) as total_marks,
+           COALESCE(a.present, 0) as present,
+           COALESCE(a.late, 0) as late,
+           COALESCE(a.absent, 0) as absent,
+           COALESCE(gr.total_grades, 0) as total_grades,
+           gr.average_grade,
+           gr.grade_1, gr.grade_2, gr.grade_3, gr.grade_4, gr.grade_5
+    FROM teacher_groups g
+    LEFT JOIN student_counts s ON s.group_id = g.id
+    LEFT JOIN attendance_totals a ON a.group_id = g.id
+    LEFT JOIN grade_totals gr ON gr.group_id = g.id
+    ORDER BY g.id
+"""
+
+ATTENDANCE_TOTALS = """
+        SELECT group_id,
+               COUNT(*) as total_marks,
+               SUM(status = 'present') as present,
+               SUM(status = 'late') as late,
+               SUM(status = 'absent') as absent
+        FROM attendance
+        WHERE group_id IN (SELECT id FROM teacher_groups){dates}
+        GROUP BY group_id
+    """
+
+ATTENDANCE_SUMMARY_TOTALS = """
+        SELECT group_id,
+               SUM(total) as total_marks,
+               SUM(present) as present,
+               SUM(late) as late,
+               SUM(absent) as absent
+        FROM attendance_summary
+        WHERE group_id IN (SELECT id FROM teacher_groups)
+        GROUP BY group_id
+    """
+
+GRADE_TOTALS = """
+        SELECT group_id,
+               COUNT(*) as total_grades,
+               AVG(grade) as average_grade,
+               SUM(grade = 1) as grade_1,
+               SUM(grade = 2) as grade_2,
+               SUM(grade = 3) as grade_3,
+               SUM(grade = 4) as grade_4,
+               SUM(grade = 5) as grade_5
+        FROM grades
+        WHERE group_id IN (SELECT id FROM teacher_groups){dates}
+        GROUP BY group_id
+    """
+
+GRADE_SUMMARY_TOTALS = """
+        SELECT group_id,
+               SUM(grade_count) as total_grades,
+               SUM(grade * grade_count) * 1.0 / SUM(grade_count) as average_grade,
+               SUM(CASE WHEN grade = 1 THEN grade_count ELSE 0 END) as grade_1,
+               SUM(CASE WHEN grade = 2 THEN grade_count ELSE 0 END) as grade_2,
+               SUM(CASE WHEN grade = 3 THEN grade_count ELSE 0 END) as grade_3,
+               SUM(CASE WHEN grade = 4 THEN grade_count ELSE 0 END) as grade_4,
+               SUM(CASE WHEN grade = 5 THEN grade_count ELSE 0 END) as grade_5
+        FROM group_grade_summary
+        WHERE group_id IN (SELECT id FROM teacher_groups)
+        GROUP BY group_id
+    """
+
+def teacher_report_query(dates: str) -> str:
+    if not dates:
+        return TEACHER_REPORT_QUERY.format(
+            attendance_totals=ATTENDANCE_SUMMARY_TOTALS, grade_totals=GRADE_SUMMARY_TOTALS
+        )
+    return TEACHER_REPORT_QUERY.format(
+        attendance_totals=ATTENDANCE_TOTALS.format(dates=dates), grade_totals=GRADE_TOTALS.format(dates=dates)
+    )
+
+def date_filter(date_from: datetime.date, date_to: datetime.date) -> Tuple[str, tuple]:
+    clause = ""
+    params = ()
+    if date_from:
+        clause += " AND date >= ?"
+        params += (date_from,)
+    if date_to:
+        clause += " AND date <= ?"
+        params += (date_to,)
+    return clause, params
+
+class GroupAnalytics:
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
+
+    def get_teacher_report(self, teacher_id: int, date_from: datetime.date = None,
+                           date_to: datetime.date = None) -> List[Dict]:
+        try:
+            dates, date_params = date_filter(date_from, date_to)
+            rows = self.db.fetch_all(
+                teacher_report_query(dates),
+                (teacher_id,) + date_params + date_params
+            )
+
+            report = []
+            for row in rows:
+                total_marks = row['total_marks']
+                report.append({
+                    'id': row['id'],
+                    'name': row['name'],
+                    'students_count': row['students_count'],
+                    'total_marks': total_marks,
+                    'present': row['present'],
+                    'late': row['late'],
+                    'absent': row['absent'],
+                    'attendance_rate': round((row['present'] / total_marks) * 100, 1) if total_marks > 0 else 0,
+                    'total_grades': row['total_grades'],
+                    'average_grade': round(row['average_grade'], 2) if row['average_grade'] is not None else 0.0,
+                    'grade_distribution': {
+                        grade: row[f'grade_{grade}'] for grade in range(1, 6) if row[f'grade_{grade}']
+                    }
+                })
+            return report
+        except Exception as e:
+            logger.error(f"Error building report for teacher {teacher_id}: {e}")
+            return []
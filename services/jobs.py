@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, int, int], None]
+Notify = Callable[[str], Awaitable]
+JobFunc = Callable[[ProgressCallback], Union[bool, str]]
+
+STATUS_TITLES = {
+    'running': "выполняется",
+    'done': "завершено",
+    'failed': "завершено с ошибкой. Проверьте логи."
+}
+
+class Job:
+    def __init__(self, job_id: int, title: str, user_id: int):
+        self.id = job_id
+        self.title = title
+        self.user_id = user_id
+        self.status = 'running'
+        self.stage = None
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self.cause: Optional[Exception] = None
+        self.details = None
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._task = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.status == 'running'
+
+    def report(self, stage: str, done: int, total: int):
+        with self._lock:
+            self.stage = stage
+            self.done = done
+            self.total = total
+
+    async def wait(self):
+        if self._task:
+            await self._task
+
+    def finish(self, success: bool, error: str = None, details: str = None, cause: Exception = None):
+        with self._lock:
+            self.status = 'done' if success else 'failed'
+            self.error = error
+            self.cause = cause
+            self.details = details
+            self.finished_at = datetime.now()
+
+    def describe(self) -> str:
+        with self._lock:
+            lines = [f"{self.title}: {STATUS_TITLES[self.status]}"]
+            if self.stage:
+                lines.append(f"{self.stage}: {self.done}/{self.total}")
+            lines.append(f"Начато: {self.started_at.strftime('%d.%m.%Y %H:%M:%S')}")
+            if self.finished_at:
+                duration = (self.finished_at - self.started_at).total_seconds()
+                lines.append(f"Длительность: {duration:.1f} сек.")
+            if self.error:
+                lines.append(f"Ошибка: {self.error}")
+            if self.details:
+                lines.append(f"\n{self.details}")
+        return "\n".join(lines)
+
+class JobRunner:
+    def __init__(self, progress_interval: float = 3.0):
+        self.progress_interval = progress_interval
+        self.current: Optional[Job] = None
+        self._last_id = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job")
+
+    def running_job(self) -> Optional[Job]:
+        if self.current and self.current.is_running:
+            return self.current
+        return None
+
+    def start(self, title: str, func: JobFunc, user_id: int,
+              notify: Notify = None) -> Optional[Job]:
+        if self.running_job():
+            return None
+
+        self._last_id += 1
+        job = Job(self._last_id, title, user_id)
+        self.current = job
+        job._task = asyncio.create_task(self._run(job, func, notify))
+        logger.info(f"Job {job.id} ({title}) started by {user_id or 'scheduler'}")
+        return job
+
+    async def _run(self, job: Job, func: JobFunc, notify: Notify):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._execute, job, func)
+
+        last_text = None
+        while not future.done():
+            await asyncio.wait({future}, timeout=self.progress_interval)
+            text = job.describe()
+            if notify and text != last_text:
+                await self._notify(notify, text)
+                last_text = text
+
+        logger.info(f"Job {job.id} ({job.title}) {job.status}")
+
+    def _execute(self, job: Job, func: JobFunc):
+        try:
+            result = func(job.report)
+            if isinstance(result, str):
+                job.finish(True, details=result)
+            else:
+                job.finish(bool(result))
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.title}) failed: {e}")
+            job.finish(False, str(e), cause=e)
+
+    async def _notify(self, notify: Notify, text: str):
+        try:
+            await notify(text)
+        except Exception as e:
+            logger.warning(f"Error reporting job progress: {e}")
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        logger.info("Job runner stopped")
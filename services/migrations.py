@@ -0,0 +1,461 @@
+import logging
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "initial schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS users
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            telegram_id INTEGER UNIQUE NOT NULL,
+            full_name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            role TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            group_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (group_id) REFERENCES groups (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS groups
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            teacher_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (teacher_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS assignments
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            group_id INTEGER NOT NULL,
+            teacher_id INTEGER NOT NULL,
+            deadline TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (group_id) REFERENCES groups (id),
+            FOREIGN KEY (teacher_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS attendance
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE NOT NULL,
+            group_id INTEGER NOT NULL,
+            student_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            marked_by INTEGER NOT NULL,
+            marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (group_id) REFERENCES groups (id),
+            FOREIGN KEY (student_id) REFERENCES users (id),
+            FOREIGN KEY (marked_by) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS grades
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            group_id INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            grade INTEGER NOT NULL,
+            date DATE NOT NULL,
+            teacher_id INTEGER NOT NULL,
+            comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(student_id) REFERENCES users(id),
+            FOREIGN KEY(group_id) REFERENCES groups(id),
+            FOREIGN KEY (teacher_id) REFERENCES users(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS subjects
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS schedule
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_id INTEGER NOT NULL,
+            day_of_week TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            teacher_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(group_id) REFERENCES groups(id),
+            FOREIGN KEY(teacher_id) REFERENCES users(id)
+        )
+        '''
+    ]),
+    (2, "secondary indexes for hot queries", [
+        "CREATE INDEX IF NOT EXISTS idx_users_group_role_status ON users (group_id, role, status)",
+        "CREATE INDEX IF NOT EXISTS idx_users_role_status ON users (role, status)",
+        "CREATE INDEX IF NOT EXISTS idx_users_status ON users (status)",
+        "CREATE INDEX IF NOT EXISTS idx_groups_teacher ON groups (teacher_id)",
+        "CREATE INDEX IF NOT EXISTS idx_attendance_student_group_date ON attendance (student_id, group_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_attendance_group_date ON attendance (group_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_grades_student_subject_date ON grades (student_id, subject, date)",
+        "CREATE INDEX IF NOT EXISTS idx_grades_student_date ON grades (student_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_grades_group_subject_date ON grades (group_id, subject, date)",
+        "CREATE INDEX IF NOT EXISTS idx_grades_group_created ON grades (group_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_assignments_group_deadline ON assignments (group_id, deadline)",
+        "CREATE INDEX IF NOT EXISTS idx_assignments_teacher_deadline ON assignments (teacher_id, deadline)",
+        "CREATE INDEX IF NOT EXISTS idx_schedule_group_day ON schedule (group_id, day_of_week, start_time)"
+    ]),
+    (3, "change log for incremental sheet sync", [
+        '''
+        CREATE TABLE IF NOT EXISTS change_log
+        (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS sync_state
+        (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_insert_log AFTER INSERT ON users
+        BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('users', NEW.id);
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'groups', NEW.group_id WHERE NEW.group_id IS NOT NULL;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_update_log AFTER UPDATE ON users
+        WHEN OLD.telegram_id IS NOT NEW.telegram_id OR OLD.full_name IS NOT NEW.full_name
+            OR OLD.phone IS NOT NEW.phone OR OLD.role IS NOT NEW.role OR OLD.status IS NOT NEW.status
+            OR OLD.group_id IS NOT NEW.group_id OR OLD.created_at IS NOT NEW.created_at
+        BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('users', NEW.id);
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'groups', OLD.group_id
+                WHERE OLD.group_id IS NOT NULL AND (OLD.group_id IS NOT NEW.group_id
+                    OR OLD.role IS NOT NEW.role OR OLD.status IS NOT NEW.status);
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'groups', NEW.group_id
+                WHERE NEW.group_id IS NOT NULL AND (OLD.group_id IS NOT NEW.group_id
+                    OR OLD.role IS NOT NEW.role OR OLD.status IS NOT NEW.status);
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'groups', id FROM groups
+                WHERE teacher_id = NEW.id AND OLD.full_name IS NOT NEW.full_name;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_delete_log AFTER DELETE ON users
+        BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('users', OLD.id);
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'groups', OLD.group_id WHERE OLD.group_id IS NOT NULL;
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'groups', id FROM groups WHERE teacher_id = OLD.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_groups_insert_log AFTER INSERT ON groups
+        BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('groups', NEW.id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_groups_update_log AFTER UPDATE ON groups
+        WHEN OLD.name IS NOT NEW.name OR OLD.teacher_id IS NOT NEW.teacher_id
+            OR OLD.created_at IS NOT NEW.created_at
+        BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('groups', NEW.id);
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'users', id FROM users
+                WHERE group_id = NEW.id AND OLD.name IS NOT NEW.name;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_groups_delete_log AFTER DELETE ON groups
+        BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('groups', OLD.id);
+            INSERT INTO change_log (table_name, row_id)
+                SELECT 'users', id FROM users WHERE group_id = OLD.id;
+        END
+        '''
+    ]),
+    (4, "one attendance mark per student and day", [
+        '''
+        DELETE FROM attendance
+        WHERE id NOT IN (SELECT MAX(id) FROM attendance GROUP BY student_id, group_id, date)
+        ''',
+        "DROP INDEX IF EXISTS idx_attendance_student_group_date",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_student_group_date_unique ON attendance (student_id, group_id, date)"
+    ]),
+    (5, "materialized grade and attendance aggregates", [
+        '''
+        CREATE TABLE IF NOT EXISTS student_grade_summary
+        (
+            student_id INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            grade_count INTEGER NOT NULL,
+            grade_sum INTEGER NOT NULL,
+            PRIMARY KEY (student_id, subject)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS group_grade_summary
+        (
+            group_id INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            grade INTEGER NOT NULL,
+            grade_count INTEGER NOT NULL,
+            PRIMARY KEY (group_id, subject, grade)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS attendance_summary
+        (
+            student_id INTEGER NOT NULL,
+            group_id INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            present INTEGER NOT NULL,
+            late INTEGER NOT NULL,
+            absent INTEGER NOT NULL,
+            PRIMARY KEY (student_id, group_id)
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_insert_summary AFTER INSERT ON grades
+        BEGIN
+            INSERT INTO student_grade_summary (student_id, subject, grade_count, grade_sum)
+            VALUES (NEW.student_id, NEW.subject, 1, NEW.grade)
+            ON CONFLICT(student_id, subject) DO UPDATE SET
+                grade_count = grade_count + 1,
+                grade_sum = grade_sum + excluded.grade_sum;
+            INSERT INTO group_grade_summary (group_id, subject, grade, grade_count)
+            VALUES (NEW.group_id, NEW.subject, NEW.grade, 1)
+            ON CONFLICT(group_id, subject, grade) DO UPDATE SET grade_count = grade_count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_delete_summary AFTER DELETE ON grades
+        BEGIN
+            UPDATE student_grade_summary SET grade_count = grade_count - 1, grade_sum = grade_sum - OLD.grade
+            WHERE student_id = OLD.student_id AND subject = OLD.subject;
+            DELETE FROM student_grade_summary
+            WHERE student_id = OLD.student_id AND subject = OLD.subject AND grade_count = 0;
+            UPDATE group_grade_summary SET grade_count = grade_count - 1
+            WHERE group_id = OLD.group_id AND subject = OLD.subject AND grade = OLD.grade;
+            DELETE FROM group_grade_summary
+            WHERE group_id = OLD.group_id AND subject = OLD.subject AND grade = OLD.grade AND grade_count = 0;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_update_summary AFTER UPDATE ON grades
+        WHEN OLD.student_id IS NOT NEW.student_id OR OLD.group_id IS NOT NEW.group_id
+            OR OLD.subject IS NOT NEW.subject OR OLD.grade IS NOT NEW.grade
+        BEGIN
+            UPDATE student_grade_summary SET grade_count = grade_count - 1, grade_sum = grade_sum - OLD.grade
+            WHERE student_id = OLD.student_id AND subject = OLD.subject;
+            DELETE FROM student_grade_summary
+            WHERE student_id = OLD.student_id AND subject = OLD.subject AND grade_count = 0;
+            UPDATE group_grade_summary SET grade_count = grade_count - 1
+            WHERE group_id = OLD.group_id AND subject = OLD.subject AND grade = OLD.grade;
+            DELETE FROM group_grade_summary
+            WHERE group_id = OLD.group_id AND subject = OLD.subject AND grade = OLD.grade AND grade_count = 0;
+            INSERT INTO student_grade_summary (student_id, subject, grade_count, grade_sum)
+            VALUES (NEW.student_id, NEW.subject, 1, NEW.grade)
+            ON CONFLICT(student_id, subject) DO UPDATE SET
+                grade_count = grade_count + 1,
+                grade_sum = grade_sum + excluded.grade_sum;
+            INSERT INTO group_grade_summary (group_id, subject, grade, grade_count)
+            VALUES (NEW.group_id, NEW.subject, NEW.grade, 1)
+            ON CONFLICT(group_id, subject, grade) DO UPDATE SET grade_count = grade_count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_insert_summary AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_summary (student_id, group_id, total, present, late, absent)
+            VALUES (NEW.student_id, NEW.group_id, 1,
+                    NEW.status = 'present', NEW.status = 'late', NEW.status = 'absent')
+            ON CONFLICT(student_id, group_id) DO UPDATE SET
+                total = total + 1,
+                present = present + excluded.present,
+                late = late + excluded.late,
+                absent = absent + excluded.absent;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_delete_summary AFTER DELETE ON attendance
+        BEGIN
+            UPDATE attendance_summary SET
+                total = total - 1,
+                present = present - (OLD.status = 'present'),
+                late = late - (OLD.status = 'late'),
+                absent = absent - (OLD.status = 'absent')
+            WHERE student_id = OLD.student_id AND group_id = OLD.group_id;
+            DELETE FROM attendance_summary
+            WHERE student_id = OLD.student_id AND group_id = OLD.group_id AND total = 0;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_update_summary AFTER UPDATE ON attendance
+        WHEN OLD.student_id IS NOT NEW.student_id OR OLD.group_id IS NOT NEW.group_id
+            OR OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE attendance_summary SET
+                total = total - 1,
+                present = present - (OLD.status = 'present'),
+                late = late - (OLD.status = 'late'),
+                absent = absent - (OLD.status = 'absent')
+            WHERE student_id = OLD.student_id AND group_id = OLD.group_id;
+            DELETE FROM attendance_summary
+            WHERE student_id = OLD.student_id AND group_id = OLD.group_id AND total = 0;
+            INSERT INTO attendance_summary (student_id, group_id, total, present, late, absent)
+            VALUES (NEW.student_id, NEW.group_id, 1,
+                    NEW.status = 'present', NEW.status = 'late', NEW.status = 'absent')
+            ON CONFLICT(student_id, group_id) DO UPDATE SET
+                total = total + 1,
+                present = present + excluded.present,
+                late = late + excluded.late,
+                absent = absent + excluded.absent;
+        END
+        ''',
+        '''
+        INSERT INTO student_grade_summary (student_id, subject, grade_count, grade_sum)
+        SELECT student_id, subject, COUNT(*), SUM(grade)
+        FROM grades
+        GROUP BY student_id, subject
+        ''',
+        '''
+        INSERT INTO group_grade_summary (group_id, subject, grade, grade_count)
+        SELECT group_id, subject, grade, COUNT(*)
+        FROM grades
+        GROUP BY group_id, subject, grade
+        ''',
+        '''
+        INSERT INTO attendance_summary (student_id, group_id, total, present, late, absent)
+        SELECT student_id, group_id, COUNT(*),
+               SUM(status = 'present'), SUM(status = 'late'), SUM(status = 'absent')
+        FROM attendance
+        GROUP BY student_id, group_id
+        '''
+    ]),
+    (6, "table version counters", [
+        '''
+        CREATE TABLE IF NOT EXISTS table_versions
+        (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        "INSERT OR IGNORE INTO table_versions (table_name) VALUES ('users'), ('groups')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_insert_version AFTER INSERT ON users
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = 'users';
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_update_version AFTER UPDATE ON users
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = 'users';
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_delete_version AFTER DELETE ON users
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = 'users';
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_groups_insert_version AFTER INSERT ON groups
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = 'groups';
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_groups_update_version AFTER UPDATE ON groups
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = 'groups';
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_groups_delete_version AFTER DELETE ON groups
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = 'groups';
+        END
+        '''
+    ]),
+    (7, "persistent fsm storage", [
+        '''
+        CREATE TABLE IF NOT EXISTS fsm_storage
+        (
+            key TEXT PRIMARY KEY,
+            state TEXT,
+            data TEXT NOT NULL DEFAULT '{}',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        '''
+    ]),
+    (8, "attendance summary by group", [
+        "CREATE INDEX IF NOT EXISTS idx_attendance_summary_group ON attendance_summary (group_id)"
+    ]),
+]
+
+def ensure_version_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version
+        (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def apply_migrations(db) -> int:
+    with db.transaction(immediate=True) as conn:
+        current = get_schema_version(conn)
+
+    pending = [migration for migration in sorted(MIGRATIONS) if migration[0] > current]
+    for version, name, steps in pending:
+        with db.transaction(immediate=True) as conn:
+            if get_schema_version(conn) >= version:
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+        logger.info(f"Migration {version} applied: {name}")
+
+    latest = max(version for version, _, _ in MIGRATIONS)
+    if pending:
+        logger.info(f"Database schema migrated from version {current} to {latest}")
+    return latest
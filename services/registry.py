@@ -0,0 +1,55 @@
+import logging
+from typing import Dict
+from .database import Database
+from .async_db import DatabaseExecutor, AsyncService
+from .user_cache import UserCache
+from .user_manager import UserManager
+from .attendance_manager import AttendanceManager
+from .assignment_manager import AssignmentManager
+from .grades_manager import GradesManager
+from .schedule_manager import ScheduleManager
+from .subjects_manager import SubjectsManager
+from .student_dashboard import StudentDashboard
+from .group_analytics import GroupAnalytics
+
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry:
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
+        self.user_cache = UserCache()
+        self.user_manager = UserManager(self.db, self.user_cache)
+        self.attendance_manager = AttendanceManager(self.db)
+        self.assignment_manager = AssignmentManager(self.db)
+        self.grades_manager = GradesManager(self.db)
+        self.schedule_manager = ScheduleManager(self.db)
+        self.subjects_manager = SubjectsManager(self.db)
+        self.student_dashboard = StudentDashboard(self.db)
+        self.group_analytics = GroupAnalytics(self.db)
+
+    def init_storage(self):
+        self.db.init_db()
+        self.user_manager.ensure_admin_exists()
+        logger.info("Services initialized")
+
+    def managers(self) -> Dict[str, object]:
+        return {
+            'user_manager': self.user_manager,
+            'attendance_manager': self.attendance_manager,
+            'assignment_manager': self.assignment_manager,
+            'grades_manager': self.grades_manager,
+            'schedule_manager': self.schedule_manager,
+            'subjects_manager': self.subjects_manager,
+            'student_dashboard': self.student_dashboard,
+            'group_analytics': self.group_analytics
+        }
+
+    def dependencies(self, executor: DatabaseExecutor) -> Dict[str, object]:
+        dependencies = {
+            name: AsyncService(manager, executor)
+            for name, manager in self.managers().items()
+        }
+        dependencies['db'] = self.db
+        dependencies['user_cache'] = self.user_cache
+        dependencies['db_executor'] = executor
+        return dependencies
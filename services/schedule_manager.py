@@ -5,8 +5,8 @@ from .database import Database
 logger = logging.getLogger(__name__)
 
 class ScheduleManager:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
 
     def add_schedule_item(self, group_id: int, day_of_week: str, start_time: str,
                           end_time: str, subject: str, teacher_id: int = None) -> bool:
@@ -0,0 +1,76 @@
+import logging
+from typing import Dict
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_SUBJECTS_QUERY = """
+    SELECT subject, grade_count, grade_sum
+    FROM student_grade_summary
+    WHERE student_id = ?
+    ORDER BY subject
+"""
+
+DASHBOARD_ATTENDANCE_QUERY = """
+    SELECT total, present, late, absent
+    FROM attendance_summary
+    WHERE student_id = ? AND group_id = ?
+"""
+
+DASHBOARD_RECENT_QUERY = """
+    SELECT subject, grade, date
+    FROM grades
+    WHERE student_id = ?
+    ORDER BY date DESC, id DESC
+    LIMIT ?
+"""
+
+class StudentDashboard:
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
+
+    def get_dashboard(self, student_id: int, group_id: int = None, recent_limit: int = 5) -> Dict:
+        try:
+            subjects = self.db.fetch_all(DASHBOARD_SUBJECTS_QUERY, (student_id,))
+            attendance = self.db.fetch_one(DASHBOARD_ATTENDANCE_QUERY, (student_id, group_id))
+            recent = self.db.fetch_all(DASHBOARD_RECENT_QUERY, (student_id, recent_limit))
+
+            total_grades = sum(subject['grade_count'] for subject in subjects)
+            grade_sum = sum(subject['grade_sum'] for subject in subjects)
+            total_classes = attendance['total'] if attendance else 0
+            present = attendance['present'] if attendance else 0
+
+            dashboard = {
+                'average_grade': round(grade_sum / total_grades, 2) if total_grades > 0 else 0.0,
+                'total_grades': total_grades,
+                'subjects': [
+                    {
+                        'subject': subject['subject'],
+                        'average': round(subject['grade_sum'] / subject['grade_count'], 2),
+                        'count': subject['grade_count']
+                    }
+                    for subject in subjects
+                ],
+                'recent_grades': [
+                    {'subject': grade['subject'], 'grade': grade['grade'], 'date': grade['date']}
+                    for grade in recent
+                ],
+                'attendance': {
+                    'total_classes': total_classes,
+                    'present': present,
+                    'late': attendance['late'] if attendance else 0,
+                    'absent': attendance['absent'] if attendance else 0,
+                    'attendance_rate': round((present / total_classes) * 100, 2) if total_classes > 0 else 0
+                }
+            }
+
+            return dashboard
+        except Exception as e:
+            logger.error(f"Error getting dashboard for student {student_id}: {e}")
+            return {
+                'average_grade': 0.0,
+                'total_grades': 0,
+                'subjects': [],
+                'recent_grades': [],
+                'attendance': {'total_classes': 0, 'present': 0, 'late': 0, 'absent': 0, 'attendance_rate': 0}
+            }
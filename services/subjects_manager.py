@@ -5,8 +5,8 @@ from .database import Database
 logger = logging.getLogger(__name__)
 
 class SubjectsManager:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
 
     def add_subject(self, name: str, description: str = None) -> bool:
         try:
@@ -1,172 +1,346 @@
 import logging
-from typing import List, Dict
+from functools import partial
+from typing import Callable, Dict, List, Optional
 from .database import Database
-from .google_sheets import GoogleSheetsManager
+from .google_sheets import GoogleSheetsManager, SHEET_HEADERS, get_sheets_manager
+from .user_cache import UserCache
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-class SyncManager:
+USERS_EXPORT_QUERY = """
+    SELECT u.id, u.telegram_id, u.full_name, u.phone, u.role,
+           u.status, u.group_id, g.name, u.created_at
+    FROM users u
+    LEFT JOIN groups g ON u.group_id = g.id
+    {where}
+    ORDER BY u.id
+"""
+
+GROUPS_EXPORT_QUERY = """
+    SELECT g.id, g.name, g.teacher_id, t.full_name,
+           COUNT(s.id), g.created_at
+    FROM groups g
+    LEFT JOIN users t ON g.teacher_id = t.id
+    LEFT JOIN users s ON s.group_id = g.id AND s.role = 'student' AND s.status = 'active'
+    {where}
+    GROUP BY g.id
+    ORDER BY g.id
+"""
+
+EXPORT_SOURCES = {
+    "Users": ("users", "u.id", USERS_EXPORT_QUERY),
+    "Groups": ("groups", "g.id", GROUPS_EXPORT_QUERY)
+}
+
+EXPORT_WATERMARK = "sheets_export"
+FULL_EXPORT_RATIO = 0.5
+ID_BATCH_SIZE = 500
+
+USER_IMPORT_FIELDS = ('full_name', 'phone', 'role', 'status', 'group_id')
+
+def to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def get_export_watermark(db: Database) -> Optional[int]:
+    row = db.fetch_one("SELECT value FROM sync_state WHERE name = ?", (EXPORT_WATERMARK,))
+    return row['value'] if row else None
+
+def has_pending_changes(db: Database) -> bool:
+    watermark = get_export_watermark(db)
+    if watermark is None:
+        return True
+    return db.fetch_one("SELECT seq FROM change_log WHERE seq > ? LIMIT 1", (watermark,)) is not None
+
+class ImportPlan:
     def __init__(self):
-        self.db = Database()
-        self.sheets = GoogleSheetsManager()
+        self.group_inserts: List[Dict] = []
+        self.group_updates: Dict[int, tuple] = {}
+        self.user_inserts: Dict[int, Dict] = {}
+        self.user_updates: Dict[int, tuple] = {}
 
-    def sync_users_to_sheets(self):
+    @property
+    def is_empty(self) -> bool:
+        return not (self.group_inserts or self.group_updates or self.user_inserts or self.user_updates)
+
+class SyncManager:
+    def __init__(self, db: Database = None, sheets: GoogleSheetsManager = None, user_cache: UserCache = None):
+        self.db = db or Database()
+        self.sheets = sheets or get_sheets_manager()
+        self.user_cache = user_cache
+        self.last_error: Optional[Exception] = None
+
+    def get_watermark(self) -> Optional[int]:
+        return get_export_watermark(self.db)
+
+    def set_watermark(self, seq: int):
+        with self.db.transaction():
+            self.db.execute(
+                """INSERT INTO sync_state (name, value) VALUES (?, ?)
+                   ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP""",
+                (EXPORT_WATERMARK, seq)
+            )
+            self.db.execute("DELETE FROM change_log WHERE seq <= ?", (seq,))
+
+    def reset_watermark(self):
+        self.db.execute("DELETE FROM sync_state WHERE name = ?", (EXPORT_WATERMARK,))
+
+    def latest_change(self) -> int:
+        return self.db.fetch_one("SELECT COALESCE(MAX(seq), 0) as seq FROM change_log")['seq']
+
+    def export_sheet(self, sheet_name: str, progress: Optional[Callable[[int, int], None]] = None):
         try:
-            users = self.db.fetch_all("SELECT * FROM users")
-            worksheet = self.sheets.get_worksheet("Users")
+            worksheet = self.sheets.get_worksheet(sheet_name)
 
             if not worksheet:
-                logger.error("Cannot get Users worksheet")
+                logger.error(f"Cannot get {sheet_name} worksheet")
                 return False
 
-            worksheet.clear()
-            worksheet.append_row([
-                "ID", "Telegram ID", "Full Name", "Phone", "Role",
-                "Status", "Group ID", "Group Name", "Created At"
-            ])
-
-            for user in users:
-                group_name = ""
-                if user.get('group_id'):
-                    group = self.db.fetch_one("SELECT name FROM groups WHERE id = ?", (user['group_id'],))
-                    group_name = group['name'] if group else ""
-
-                self.sheets.safe_append_row(worksheet, [
-                    user['id'],
-                    user['telegram_id'],
-                    user['full_name'],
-                    user['phone'],
-                    user['role'],
-                    user['status'],
-                    user.get('group_id', ''),
-                    group_name,
-                    user['created_at']
-                ])
-
-            logger.info("Users synced to Google Sheets")
+            table, _, query = EXPORT_SOURCES[sheet_name]
+            total = self.db.fetch_one(f"SELECT COUNT(*) as count FROM {table}")['count']
+            rows = self.db.iterate(query.format(where=""))
+
+            if not self.sheets.write_table(worksheet, SHEET_HEADERS[sheet_name], rows,
+                                           total_rows=total, progress=progress):
+                logger.error(f"Error writing {sheet_name} worksheet")
+                return False
+
+            logger.info(f"{sheet_name} synced to Google Sheets ({total} rows)")
             return True
         except Exception as e:
-            logger.error(f"Error syncing users: {e}")
+            logger.error(f"Error syncing {sheet_name}: {e}")
+            self.last_error = e
             return False
 
-    def sync_groups_to_sheets(self):
+    def export_sheet_changes(self, sheet_name: str, since: int, until: int,
+                             progress: Optional[Callable[[int, int], None]] = None):
         try:
-            groups = self.db.fetch_all("""
-                SELECT g.*, u.full_name as teacher_name
-                FROM groups g
-                LEFT JOIN users u ON g.teacher_id = u.id
-            """)
-            worksheet = self.sheets.get_worksheet("Groups")
+            table, id_column, query = EXPORT_SOURCES[sheet_name]
+            changed_ids = [
+                row['row_id'] for row in self.db.fetch_all(
+                    "SELECT DISTINCT row_id FROM change_log WHERE seq > ? AND seq <= ? AND table_name = ?",
+                    (since, until, table)
+                )
+            ]
+
+            if not changed_ids:
+                return True
+
+            total = self.db.fetch_one(f"SELECT COUNT(*) as count FROM {table}")['count']
+            if len(changed_ids) > total * FULL_EXPORT_RATIO:
+                logger.info(f"{sheet_name}: {len(changed_ids)} of {total} rows changed, running full export")
+                return self.export_sheet(sheet_name, progress)
+
+            worksheet = self.sheets.get_worksheet(sheet_name)
 
             if not worksheet:
-                logger.error("Cannot get Groups worksheet")
+                logger.error(f"Cannot get {sheet_name} worksheet")
                 return False
 
-            worksheet.clear()
-            worksheet.append_row([
-                "ID", "Name", "Teacher ID", "Teacher Name",
-                "Students Count", "Created At"
-            ])
+            rows = {}
+            for start in range(0, len(changed_ids), ID_BATCH_SIZE):
+                batch = changed_ids[start:start + ID_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                for row in self.db.iterate(query.format(where=f"WHERE {id_column} IN ({placeholders})"), tuple(batch)):
+                    rows[row[0]] = row
 
-            for group in groups:
-                students_count = self.db.fetch_one(
-                    "SELECT COUNT(*) as count FROM users WHERE group_id = ? AND role = 'student' AND status = 'active'",
-                    (group['id'],)
-                )
-                students_count = students_count['count'] if students_count else 0
-
-                self.sheets.safe_append_row(worksheet, [
-                    group['id'],
-                    group['name'],
-                    group.get('teacher_id', ''),
-                    group.get('teacher_name', ''),
-                    students_count,
-                    group['created_at']
-                ])
-
-            logger.info("Groups synced to Google Sheets")
+            deleted_ids = [row_id for row_id in changed_ids if row_id not in rows]
+
+            if not self.sheets.write_row_changes(worksheet, SHEET_HEADERS[sheet_name], rows, deleted_ids, total):
+                logger.info(f"{sheet_name}: incremental update failed, running full export")
+                return self.export_sheet(sheet_name, progress)
+
+            if progress:
+                progress(len(changed_ids), len(changed_ids))
             return True
         except Exception as e:
-            logger.error(f"Error syncing groups: {e}")
+            logger.error(f"Error syncing {sheet_name} changes: {e}")
+            self.last_error = e
             return False
 
-    def sync_from_sheets(self):
-        try:
-            groups_worksheet = self.sheets.get_worksheet("Groups")
-            if groups_worksheet:
-                groups_data = groups_worksheet.get_all_records()
-
-                for group_row in groups_data:
-                    if group_row.get('ID') and group_row.get('Name'):
-                        existing_group = self.db.fetch_one(
-                            "SELECT * FROM groups WHERE id = ? OR name = ?",
-                            (group_row['ID'], group_row['Name'])
-                        )
+    def sync_users_to_sheets(self, progress: Optional[Callable[[int, int], None]] = None):
+        return self.export_sheet("Users", progress)
+
+    def sync_groups_to_sheets(self, progress: Optional[Callable[[int, int], None]] = None):
+        return self.export_sheet("Groups", progress)
+
+    def plan_import(self, progress: Optional[Callable[[str, int, int], None]] = None) -> ImportPlan:
+        plan = ImportPlan()
+
+        groups = self.db.fetch_all("SELECT id, name, teacher_id FROM groups")
+        groups_by_id = {group['id']: group for group in groups}
+        groups_by_name = {group['name']: group for group in groups}
+        new_groups = {}
+
+        groups_worksheet = self.sheets.get_worksheet("Groups")
+        if groups_worksheet:
+            groups_data = groups_worksheet.get_all_records(numericise_ignore=['all'])
+
+            for group_row in groups_data:
+                group_id = to_int(group_row.get('ID'))
+                name = group_row.get('Name')
 
-                        if existing_group:
-                            self.db.execute(
-                                "UPDATE groups SET name = ?, teacher_id = ? WHERE id = ?",
-                                (group_row['Name'], group_row.get('Teacher ID'), existing_group['id'])
-                            )
-                        else:
-                            self.db.execute(
-                                "INSERT INTO groups (name, teacher_id) VALUES (?, ?)",
-                                (group_row['Name'], group_row.get('Teacher ID'))
-                            )
-
-            users_worksheet = self.sheets.get_worksheet("Users")
-            if users_worksheet:
-                users_data = users_worksheet.get_all_records()
-
-                for user_row in users_data:
-                    if user_row.get('Telegram ID') and user_row.get('Full Name'):
-                        existing_user = self.db.fetch_one(
-                            "SELECT * FROM users WHERE telegram_id = ?",
-                            (user_row['Telegram ID'],)
+                if not group_id or not name:
+                    continue
+
+                teacher_id = to_int(group_row.get('Teacher ID'))
+                existing_group = groups_by_id.get(group_id) or groups_by_name.get(name)
+
+                if existing_group:
+                    if existing_group['name'] != name or existing_group['teacher_id'] != teacher_id:
+                        before = dict(existing_group)
+                        groups_by_name.pop(existing_group['name'], None)
+                        existing_group.update(name=name, teacher_id=teacher_id)
+                        groups_by_name[name] = existing_group
+                        plan.group_updates[existing_group['id']] = (before, dict(existing_group))
+                else:
+                    new_groups[name] = {'name': name, 'teacher_id': teacher_id}
+
+            plan.group_inserts = list(new_groups.values())
+            if progress:
+                progress("Groups", len(groups_data), len(groups_data))
+
+        users_worksheet = self.sheets.get_worksheet("Users")
+        if users_worksheet:
+            users_data = users_worksheet.get_all_records(numericise_ignore=['all'])
+            users = {
+                user['telegram_id']: user for user in self.db.fetch_all(
+                    "SELECT telegram_id, full_name, phone, role, status, group_id FROM users"
+                )
+            }
+
+            for user_row in users_data:
+                telegram_id = to_int(user_row.get('Telegram ID'))
+
+                if not telegram_id or not user_row.get('Full Name'):
+                    continue
+
+                group_id = None
+                new_group = None
+                if user_row.get('Group ID'):
+                    group_id = to_int(user_row['Group ID'])
+                elif user_row.get('Group Name'):
+                    group = groups_by_name.get(user_row['Group Name'])
+                    if group:
+                        group_id = group['id']
+                    elif user_row['Group Name'] in new_groups:
+                        new_group = user_row['Group Name']
+
+                user = {
+                    'telegram_id': telegram_id,
+                    'full_name': user_row['Full Name'],
+                    'phone': user_row['Phone'],
+                    'role': user_row['Role'],
+                    'status': user_row.get('Status', 'pending'),
+                    'group_id': group_id,
+                    'new_group': new_group
+                }
+                existing_user = users.get(telegram_id)
+
+                if not existing_user:
+                    plan.user_inserts[telegram_id] = user
+                elif new_group or any(existing_user[field] != user[field] for field in USER_IMPORT_FIELDS):
+                    plan.user_updates[telegram_id] = (existing_user, user)
+
+            if progress:
+                progress("Users", len(users_data), len(users_data))
+
+        return plan
+
+    def apply_import(self, plan: ImportPlan):
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with self.db.transaction(immediate=True):
+            if plan.group_updates:
+                self.db.executemany(
+                    "UPDATE groups SET name = ?, teacher_id = ? WHERE id = ?",
+                    [(after['name'], after['teacher_id'], group_id)
+                     for group_id, (_, after) in plan.group_updates.items()]
+                )
+
+            group_ids = {}
+            if plan.group_inserts:
+                self.db.executemany(
+                    "INSERT INTO groups (name, teacher_id) VALUES (?, ?)",
+                    [(group['name'], group['teacher_id']) for group in plan.group_inserts]
+                )
+                group_ids = {group['name']: group['id'] for group in self.db.fetch_all("SELECT id, name FROM groups")}
+
+            users = list(plan.user_inserts.values()) + [after for _, after in plan.user_updates.values()]
+            if users:
+                self.db.executemany(
+                    """INSERT INTO users (telegram_id, full_name, phone, role, status, group_id, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(telegram_id) DO UPDATE
+                       SET full_name = excluded.full_name, phone = excluded.phone, role = excluded.role,
+                           status = excluded.status, group_id = excluded.group_id""",
+                    [
+                        (
+                            user['telegram_id'], user['full_name'], user['phone'], user['role'], user['status'],
+                            group_ids[user['new_group']] if user['new_group'] else user['group_id'], created_at
                         )
+                        for user in users
+                    ]
+                )
+
+            if plan.group_inserts or plan.user_inserts:
+                self.reset_watermark()
+
+        if self.user_cache:
+            self.user_cache.invalidate(*plan.user_inserts, *plan.user_updates)
+
+    def preview_import(self, progress: Optional[Callable[[str, int, int], None]] = None) -> Optional[ImportPlan]:
+        try:
+            return self.plan_import(progress)
+        except Exception as e:
+            logger.error(f"Error previewing import from Google Sheets: {e}")
+            return None
+
+    def sync_from_sheets(self, progress: Optional[Callable[[str, int, int], None]] = None):
+        try:
+            plan = self.plan_import(progress)
+            self.apply_import(plan)
 
-                        group_id = None
-                        if user_row.get('Group ID'):
-                            group_id = user_row['Group ID']
-                        elif user_row.get('Group Name'):
-                            group = self.db.fetch_one("SELECT id FROM groups WHERE name = ?", (user_row['Group Name'],))
-                            group_id = group['id'] if group else None
-
-                        if existing_user:
-                            self.db.execute(
-                                """UPDATE users
-                                   SET full_name = ?, phone = ?, role = ?, status = ?, group_id = ?
-                                   WHERE telegram_id = ?""",
-                                (
-                                    user_row['Full Name'], user_row['Phone'], user_row['Role'],
-                                    user_row.get('Status', 'pending'), group_id, user_row['Telegram ID']
-                                )
-                            )
-                        else:
-                            self.db.execute(
-                                """INSERT INTO users (telegram_id, full_name, phone, role, status, group_id, created_at)
-                                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                                (
-                                    user_row['Telegram ID'], user_row['Full Name'], user_row['Phone'],
-                                    user_row['Role'], user_row.get('Status', 'pending'), group_id,
-                                    datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                )
-                            )
-
-            logger.info("Data synced from Google Sheets")
+            logger.info(
+                f"Data synced from Google Sheets (groups: {len(plan.group_inserts)} added, "
+                f"{len(plan.group_updates)} updated; users: {len(plan.user_inserts)} added, "
+                f"{len(plan.user_updates)} updated)"
+            )
             return True
         except Exception as e:
             logger.error(f"Error syncing from Google Sheets: {e}")
             return False
 
-    def full_sync(self):
-        logger.info("Starting full sync...")
+    def export_to_sheets(self, progress: Optional[Callable[[str, int, int], None]] = None, full: bool = False):
+        self.last_error = None
+        self.sheets.last_error = None
+        until = self.latest_change()
+        since = None if full else self.get_watermark()
+
+        results = []
+        for sheet_name in EXPORT_SOURCES:
+            sheet_progress = partial(progress, sheet_name) if progress else None
+            if since is None:
+                results.append(self.export_sheet(sheet_name, sheet_progress))
+            else:
+                results.append(self.export_sheet_changes(sheet_name, since, until, sheet_progress))
+
+        if not all(results):
+            return False
+
+        self.set_watermark(until)
+        return True
 
-        users_success = self.sync_users_to_sheets()
-        groups_success = self.sync_groups_to_sheets()
+    def failure_cause(self) -> Optional[Exception]:
+        return self.last_error or self.sheets.last_error
+
+    def full_sync(self, progress: Optional[Callable[[str, int, int], None]] = None):
+        logger.info("Starting full sync...")
 
-        if users_success and groups_success:
+        if self.export_to_sheets(progress):
             logger.info("Full sync completed")
             return True
         else:
@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config.config import USER_CACHE_TTL, USER_CACHE_SIZE
+
+class UserCache:
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_size: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Tuple[float, Optional[Dict]]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, telegram_id: int) -> Tuple[bool, Optional[Dict]]:
+        with self._lock:
+            entry = self._entries.get(telegram_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[telegram_id]
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(telegram_id)
+            self.hits += 1
+            user = entry[1]
+            return True, dict(user) if user else None
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(self, telegram_id: int, user: Optional[Dict], generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            self._entries[telegram_id] = (time.monotonic() + self.ttl, dict(user) if user else None)
+            self._entries.move_to_end(telegram_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *telegram_ids: int):
+        with self._lock:
+            self._generation += 1
+            for telegram_id in telegram_ids:
+                self._entries.pop(telegram_id, None)
+
+    def invalidate_user_id(self, user_id: int):
+        with self._lock:
+            self._generation += 1
+            for telegram_id, (_, user) in list(self._entries.items()):
+                if user and user['id'] == user_id:
+                    del self._entries[telegram_id]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
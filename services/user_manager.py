@@ -2,15 +2,36 @@ import sqlite3
 import logging
 from typing import List, Dict, Optional
 from .database import Database
+from .user_cache import UserCache
+from config.config import KEYBOARD_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
-class UserManager:
-    def __init__(self):
-        self.db = Database()
-        self._ensure_admin_exists()
+SYSTEM_STATS_QUERY = """
+    SELECT COUNT(*) as total_users,
+           COALESCE(SUM(status = 'active'), 0) as active_users,
+           COALESCE(SUM(status = 'pending'), 0) as pending_users,
+           COALESCE(SUM(role = 'student' AND status = 'active'), 0) as students_count,
+           COALESCE(SUM(role = 'teacher' AND status = 'active'), 0) as teachers_count,
+           (SELECT COUNT(*) FROM groups) as groups_count
+    FROM users
+"""
 
-    def _ensure_admin_exists(self):
+class UserManager:
+    def __init__(self, db: Database = None, cache: UserCache = None):
+        self.db = db or Database()
+        self.cache = cache
+        self._stats_cache = None
+
+    def invalidate_user(self, telegram_id: int = None, user_id: int = None):
+        if not self.cache:
+            return
+        if telegram_id is not None:
+            self.cache.invalidate(telegram_id)
+        if user_id is not None:
+            self.cache.invalidate_user_id(user_id)
+
+    def ensure_admin_exists(self):
         admin_id = 1952805890
 
         admin = self.get_user(admin_id)
@@ -24,12 +45,14 @@ class UserManager:
             )
             if success:
                 self.db.execute("UPDATE users SET status = 'active' WHERE telegram_id = ?", (admin_id,))
+                self.invalidate_user(admin_id)
                 logger.info("Admin created")
             else:
                 logger.error("Error creating admin")
         else:
             if admin['status'] != 'active':
                 self.db.execute("UPDATE users SET status = 'active' WHERE telegram_id = ?", (admin_id,))
+                self.invalidate_user(admin_id)
                 logger.info("Admin activated")
 
     def create_user(self, telegram_id: int, full_name: str, phone: str, role: str) -> bool:
@@ -38,6 +61,7 @@ class UserManager:
                 "INSERT INTO users (telegram_id, full_name, phone, role) VALUES (?, ?, ?, ?)",
                 (telegram_id, full_name, phone, role)
             )
+            self.invalidate_user(telegram_id)
             logger.info(f"User {full_name} created")
             return True
         except sqlite3.IntegrityError:
@@ -48,14 +72,36 @@ class UserManager:
             return False
 
     def get_user(self, telegram_id: int) -> Optional[Dict]:
-        return self.db.fetch_one("SELECT * FROM users WHERE telegram_id = ?", (telegram_id,))
+        if not self.cache:
+            return self.db.fetch_one("SELECT * FROM users WHERE telegram_id = ?", (telegram_id,))
+
+        found, user = self.cache.get(telegram_id)
+        if found:
+            return user
+
+        generation = self.cache.generation()
+        user = self.db.fetch_one("SELECT * FROM users WHERE telegram_id = ?", (telegram_id,))
+        self.cache.set(telegram_id, user, generation)
+        return user
 
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         return self.db.fetch_one("SELECT * FROM users WHERE id = ?", (user_id,))
 
+    def get_users_by_ids(self, user_ids: List[int]) -> List[Dict]:
+        if not user_ids:
+            return []
+
+        rows = self.db.fetch_all(
+            f"SELECT id, full_name FROM users WHERE id IN ({', '.join('?' * len(user_ids))})",
+            tuple(user_ids)
+        )
+        users = {row['id']: row for row in rows}
+        return [users[user_id] for user_id in user_ids if user_id in users]
+
     def approve_user(self, telegram_id: int) -> bool:
         try:
             self.db.execute("UPDATE users SET status = 'active' WHERE telegram_id = ?", (telegram_id,))
+            self.invalidate_user(telegram_id)
             logger.info(f"User {telegram_id} approved")
             return True
         except Exception as e:
@@ -70,6 +116,7 @@ class UserManager:
                 return False
 
             self.db.execute("UPDATE users SET group_id = ? WHERE id = ?", (group_id, user_id))
+            self.invalidate_user(user['telegram_id'])
             logger.info(f"User {user['full_name']} assigned to group {group_id}")
             return True
         except Exception as e:
@@ -119,6 +166,7 @@ class UserManager:
     def reject_user(self, telegram_id: int) -> bool:
         try:
             self.db.execute("UPDATE users SET status = 'rejected' WHERE telegram_id = ?", (telegram_id,))
+            self.invalidate_user(telegram_id)
             logger.info(f"User {telegram_id} rejected")
             return True
         except Exception as e:
@@ -140,6 +188,9 @@ class UserManager:
     def get_all_groups(self) -> List[Dict]:
         return self.db.fetch_all("SELECT * FROM groups")
 
+    def get_groups_page(self, after_id: int = None, before_id: int = None, limit: int = KEYBOARD_PAGE_SIZE) -> Dict:
+        return self.db.fetch_page("SELECT * FROM groups WHERE {keyset}", (), after_id, before_id, limit)
+
     def get_group(self, group_id: int) -> Optional[Dict]:
         return self.db.fetch_one("SELECT * FROM groups WHERE id = ?", (group_id,))
 
@@ -167,20 +218,43 @@ class UserManager:
             (group_id,)
         )
 
+    def get_group_students_page(self, group_id: int, after_id: int = None, before_id: int = None,
+                                limit: int = KEYBOARD_PAGE_SIZE) -> Dict:
+        return self.db.fetch_page(
+            "SELECT * FROM users WHERE group_id = ? AND role = 'student' AND status = 'active' AND {keyset}",
+            (group_id,), after_id, before_id, limit
+        )
+
     def get_students_without_groups(self) -> List[Dict]:
         return self.db.fetch_all(
             "SELECT * FROM users WHERE role = 'student' AND status = 'active' AND (group_id IS NULL OR group_id = '')"
         )
 
+    def get_students_without_groups_page(self, after_id: int = None, before_id: int = None,
+                                         limit: int = KEYBOARD_PAGE_SIZE) -> Dict:
+        return self.db.fetch_page(
+            "SELECT * FROM users WHERE role = 'student' AND status = 'active' "
+            "AND (group_id IS NULL OR group_id = '') AND {keyset}",
+            (), after_id, before_id, limit
+        )
+
     def get_available_teachers(self) -> List[Dict]:
         return self.db.fetch_all("SELECT * FROM users WHERE role = 'teacher' AND status = 'active'")
 
+    def get_available_teachers_page(self, after_id: int = None, before_id: int = None,
+                                    limit: int = KEYBOARD_PAGE_SIZE) -> Dict:
+        return self.db.fetch_page(
+            "SELECT * FROM users WHERE role = 'teacher' AND status = 'active' AND {keyset}",
+            (), after_id, before_id, limit
+        )
+
     def get_active_students(self) -> List[Dict]:
         return self.db.fetch_all("SELECT * FROM users WHERE role = 'student' AND status = 'active'")
 
     def remove_student_from_group(self, student_id: int) -> bool:
         try:
             self.db.execute("UPDATE users SET group_id = NULL WHERE id = ?", (student_id,))
+            self.invalidate_user(user_id=student_id)
             logger.info(f"Student {student_id} removed from group")
             return True
         except Exception as e:
@@ -191,6 +265,8 @@ class UserManager:
         try:
             self.db.execute("UPDATE users SET group_id = NULL WHERE group_id = ?", (group_id,))
             self.db.execute("DELETE FROM groups WHERE id = ?", (group_id,))
+            if self.cache:
+                self.cache.clear()
             logger.info(f"Group {group_id} deleted")
             return True
         except Exception as e:
@@ -206,22 +282,23 @@ class UserManager:
             logger.error(f"Error updating group name: {e}")
             return False
 
-    def get_system_stats(self) -> Dict:
-        total_users = self.db.fetch_one("SELECT COUNT(*) as count FROM users")['count']
-        active_users = self.db.fetch_one("SELECT COUNT(*) as count FROM users WHERE status = 'active'")['count']
-        pending_users = self.db.fetch_one("SELECT COUNT(*) as count FROM users WHERE status = 'pending'")['count']
-        students_count = self.db.fetch_one("SELECT COUNT(*) as count FROM users WHERE role = 'student' AND status = 'active'")['count']
-        teachers_count = self.db.fetch_one("SELECT COUNT(*) as count FROM users WHERE role = 'teacher' AND status = 'active'")['count']
-        groups_count = self.db.fetch_one("SELECT COUNT(*) as count FROM groups")['count']
+    def get_table_versions(self, *tables: str) -> tuple:
+        rows = self.db.fetch_all(
+            f"SELECT table_name, version FROM table_versions WHERE table_name IN ({', '.join('?' * len(tables))})",
+            tables
+        )
+        versions = {row['table_name']: row['version'] for row in rows}
+        return tuple(versions.get(table) for table in tables)
 
-        return {
-            'total_users': total_users,
-            'active_users': active_users,
-            'pending_users': pending_users,
-            'students_count': students_count,
-            'teachers_count': teachers_count,
-            'groups_count': groups_count
-        }
+    def get_system_stats(self) -> Dict:
+        versions = self.get_table_versions('users', 'groups')
+        cached = self._stats_cache
+        if cached and cached[0] == versions:
+            return dict(cached[1])
+
+        stats = self.db.fetch_one(SYSTEM_STATS_QUERY)
+        self._stats_cache = (versions, stats)
+        return dict(stats)
 
     def get_teacher_groups(self, teacher_id: int) -> List[Dict]:
         return self.db.fetch_all("SELECT * FROM groups WHERE teacher_id = ?", (teacher_id,))
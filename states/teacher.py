@@ -9,5 +9,6 @@ class TeacherStates(StatesGroup):
     creating_assignment_deadline = State()
     choosing_group_for_grades = State()
     choosing_subject_for_grades = State()
+    entering_bulk_grades = State()
     setting_grades = State()
     viewing_group_performance = State()
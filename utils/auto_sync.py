@@ -1,16 +1,152 @@
+import asyncio
 import logging
-from services.google_sheets import GoogleSheetsManager
+import random
+from functools import partial
+from datetime import datetime, time, timedelta
+from typing import Optional, Tuple
+
+from config.config import AUTO_SYNC_INTERVAL, AUTO_SYNC_QUIET_HOURS, AUTO_SYNC_JITTER, AUTO_SYNC_MAX_BACKOFF
+from services.async_db import DatabaseExecutor
+from services.database import Database
+from services.google_sheets import get_sheets_manager, is_quota_error
+from services.jobs import JobRunner
+from services.sync_manager import SyncManager, has_pending_changes
 
 logger = logging.getLogger(__name__)
 
 def initialize_system():
     logger.info("Initializing system...")
 
-    sheets_manager = GoogleSheetsManager()
+    sheets_manager = get_sheets_manager()
 
     sheets_manager.get_worksheet("Users")
     sheets_manager.get_worksheet("Groups")
     sheets_manager.get_worksheet("Assignments")
     sheets_manager.get_worksheet("Attendance")
 
-    logger.info("System initialized (sheets ready, sync disabled)")
\ No newline at end of file
+    logger.info("System initialized (sheets ready)")
+
+def parse_quiet_hours(value: str) -> Optional[Tuple[time, time]]:
+    if not value:
+        return None
+
+    try:
+        start, end = value.split("-")
+        return (
+            datetime.strptime(start.strip(), "%H:%M").time(),
+            datetime.strptime(end.strip(), "%H:%M").time()
+        )
+    except ValueError:
+        logger.error(f"Invalid quiet hours '{value}', expected HH:MM-HH:MM")
+        return None
+
+def run_auto_sync(db: Database, progress):
+    sync = SyncManager(db)
+    if sync.export_to_sheets(progress):
+        return True
+
+    cause = sync.failure_cause()
+    if cause:
+        raise cause
+    return False
+
+class AutoSyncScheduler:
+    def __init__(self, job_runner: JobRunner, db_executor: DatabaseExecutor, db: Database,
+                 interval: int = AUTO_SYNC_INTERVAL, quiet_hours: str = AUTO_SYNC_QUIET_HOURS,
+                 jitter: int = AUTO_SYNC_JITTER, max_backoff: int = AUTO_SYNC_MAX_BACKOFF):
+        self.job_runner = job_runner
+        self.db_executor = db_executor
+        self.db = db
+        self.interval = interval
+        self.quiet_hours = parse_quiet_hours(quiet_hours)
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.next_run_at: Optional[datetime] = None
+        self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self):
+        if not self.enabled:
+            logger.info("Auto-sync disabled")
+            return
+
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Auto-sync every {self.interval} sec.")
+
+    async def stop(self):
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def in_quiet_hours(self, now: datetime) -> bool:
+        if not self.quiet_hours:
+            return False
+
+        start, end = self.quiet_hours
+        if start <= end:
+            return start <= now.time() < end
+        return now.time() >= start or now.time() < end
+
+    def quiet_hours_left(self, now: datetime) -> float:
+        end = datetime.combine(now.date(), self.quiet_hours[1])
+        if end <= now:
+            end += timedelta(days=1)
+        return (end - now).total_seconds()
+
+    def with_jitter(self, delay: float) -> float:
+        return delay + random.uniform(0, self.jitter)
+
+    def backoff(self) -> float:
+        return min(self.interval * 2 ** self.failures, self.max_backoff)
+
+    async def _loop(self):
+        delay = self.with_jitter(self.interval)
+        while True:
+            self.next_run_at = datetime.now() + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+            try:
+                delay = await self.run_once()
+            except Exception as e:
+                logger.error(f"Auto-sync error: {e}")
+                delay = self.with_jitter(self.interval)
+
+    async def run_once(self) -> float:
+        now = datetime.now()
+        if self.in_quiet_hours(now):
+            logger.info("Auto-sync skipped: quiet hours")
+            return self.with_jitter(self.quiet_hours_left(now))
+
+        if not await self.db_executor.run(has_pending_changes, self.db):
+            logger.info("Auto-sync skipped: no changes since last sync")
+            return self.with_jitter(self.interval)
+
+        job = self.job_runner.start("Автосинхронизация", partial(run_auto_sync, self.db), None)
+        if not job:
+            logger.info("Auto-sync skipped: another sync is running")
+            return self.with_jitter(self.interval)
+
+        await job.wait()
+
+        if job.status == 'done':
+            self.failures = 0
+            return self.with_jitter(self.interval)
+
+        if job.cause is None or not is_quota_error(job.cause):
+            self.failures = 0
+            logger.warning(f"Auto-sync failed, next attempt in {self.interval} sec.")
+            return self.with_jitter(self.interval)
+
+        self.failures += 1
+        delay = self.backoff()
+        logger.warning(f"Sheets quota hit {self.failures} time(s) in a row, next auto-sync in {delay} sec.")
+        return self.with_jitter(delay)
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import random
+import logging
+import tempfile
+
+from services.database import Database
+from services.google_sheets import GoogleSheetsManager, SHEET_HEADERS
+from services.sync_manager import SyncManager
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SIZES = [1000, 10000, 100000]
+STUDENTS_PER_GROUP = 25
+
+class NullWorksheet:
+    def __init__(self, title: str):
+        self.title = title
+        self.row_count = 1000
+        self.cells_written = 0
+        self.requests = 0
+
+    def clear(self):
+        self.requests += 1
+
+    def resize(self, rows: int = None, cols: int = None):
+        self.requests += 1
+        if rows:
+            self.row_count = rows
+
+    def update(self, range_name, values, value_input_option=None):
+        self.requests += 1
+        self.cells_written += sum(len(row) for row in values)
+
+class NullSheetsManager(GoogleSheetsManager):
+    def __init__(self):
+        self.worksheets = {}
+
+    def get_worksheet(self, sheet_name: str):
+        return self.worksheets.setdefault(sheet_name, NullWorksheet(sheet_name))
+
+def populate(db: Database, user_count: int):
+    group_count = max(1, user_count // STUDENTS_PER_GROUP)
+    teacher_count = max(1, group_count // 2)
+
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO users (telegram_id, full_name, phone, role, status) VALUES (?, ?, ?, 'teacher', 'active')",
+            [(1000000 + i, f"Teacher {i}", f"+7700{i:07d}") for i in range(teacher_count)]
+        )
+        db.executemany(
+            "INSERT INTO groups (name, teacher_id) VALUES (?, ?)",
+            [(f"Group {i}", 1 + i % teacher_count) for i in range(group_count)]
+        )
+        db.executemany(
+            "INSERT INTO users (telegram_id, full_name, phone, role, status, group_id) VALUES (?, ?, ?, 'student', ?, ?)",
+            [(2000000 + i, f"Student {i}", f"+7701{i:07d}",
+              'active' if i % 10 else 'pending', 1 + random.randrange(group_count))
+             for i in range(user_count - teacher_count)]
+        )
+
+def legacy_export(db: Database):
+    users = db.fetch_all("SELECT * FROM users")
+    user_rows = []
+    for user in users:
+        group_name = ""
+        if user['group_id']:
+            group = db.fetch_one("SELECT name FROM groups WHERE id = ?", (user['group_id'],))
+            group_name = group['name'] if group else ""
+        user_rows.append([user['id'], user['telegram_id'], user['full_name'], user['phone'], user['role'],
+                          user['status'], user['group_id'] or "", group_name, user['created_at']])
+
+    groups = db.fetch_all("SELECT g.*, u.full_name as teacher_name FROM groups g LEFT JOIN users u ON g.teacher_id = u.id")
+    group_rows = []
+    for group in groups:
+        count = db.fetch_one(
+            "SELECT COUNT(*) as count FROM users WHERE group_id = ? AND role = 'student' AND status = 'active'",
+            (group['id'],)
+        )
+        group_rows.append([group['id'], group['name'], group['teacher_id'] or "", group['teacher_name'] or "",
+                           count['count'], group['created_at']])
+
+    return [SHEET_HEADERS["Users"]] + user_rows, [SHEET_HEADERS["Groups"]] + group_rows
+
+def run_export(db: Database) -> dict:
+    sheets = NullSheetsManager()
+    sync = SyncManager(db, sheets)
+    if not (sync.sync_users_to_sheets() and sync.sync_groups_to_sheets()):
+        raise RuntimeError("Export failed")
+    return {name: worksheet.requests for name, worksheet in sheets.worksheets.items()}
+
+def bench(size: int, tmp_dir: str):
+    db = Database(os.path.join(tmp_dir, f"export_{size}.db"))
+    db.init_db()
+    try:
+        populate(db, size)
+
+        start = time.perf_counter()
+        legacy_export(db)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        requests = run_export(db)
+        export_time = time.perf_counter() - start
+    finally:
+        db.shutdown()
+
+    return legacy_time, export_time, requests
+
+def main(sizes: list = None) -> int:
+    random.seed(42)
+    print(f"{'users':>8} {'n+1 queries, s':>16} {'joined export, s':>18} {'sheet requests':>16}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes or SIZES:
+            legacy_time, export_time, requests = bench(size, tmp_dir)
+            print(f"{size:>8} {legacy_time:>16.3f} {export_time:>18.3f} {sum(requests.values()):>16}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or None))
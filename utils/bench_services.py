@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import time
+import random
+import inspect
+import logging
+import argparse
+import itertools
+import statistics
+import tempfile
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from services.database import Database
+from services.registry import ServiceRegistry
+from utils.generate_school_data import generate
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BENCHMARKED_MANAGERS = [
+    'user_manager', 'grades_manager', 'attendance_manager', 'assignment_manager',
+    'schedule_manager', 'subjects_manager', 'student_dashboard', 'group_analytics'
+]
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_services_baseline.json")
+BENCH_DATE = date(2026, 9, 1)
+REGRESSION_THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.05
+
+class Sampler:
+    def __init__(self, services: ServiceRegistry, today: date, seed: int = 42):
+        db = services.db
+        self.services = services
+        self.today = today
+        self.rng = random.Random(seed)
+        self.students = db.fetch_all(
+            "SELECT id, telegram_id, group_id FROM users WHERE role = 'student' AND status = 'active' AND group_id IS NOT NULL"
+        )
+        self.teachers = db.fetch_all("SELECT id, telegram_id FROM users WHERE role = 'teacher'")
+        self.groups = db.fetch_all("SELECT id, name, teacher_id FROM groups WHERE teacher_id IS NOT NULL")
+        self.subjects = db.fetch_all("SELECT id, name, description FROM subjects")
+        self.dates = [row['date'] for row in db.fetch_all("SELECT DISTINCT date FROM attendance")]
+        self._unique = itertools.count(10 ** 12)
+
+    def unique(self) -> int:
+        return next(self._unique)
+
+    def student(self) -> Dict:
+        return self.rng.choice(self.students)
+
+    def teacher(self) -> Dict:
+        return self.rng.choice(self.teachers)
+
+    def group(self) -> Dict:
+        return self.rng.choice(self.groups)
+
+    def subject(self) -> Dict:
+        return self.rng.choice(self.subjects)
+
+    def date(self) -> str:
+        return self.rng.choice(self.dates)
+
+    def roster(self, group_id: int) -> List[int]:
+        return [student['id'] for student in self.services.user_manager.get_group_students(group_id)]
+
+    def new_user(self) -> Dict:
+        telegram_id = self.unique()
+        self.services.user_manager.create_user(telegram_id, "Bench User", "+70000000000", "student")
+        return self.services.db.fetch_one("SELECT id, telegram_id FROM users WHERE telegram_id = ?", (telegram_id,))
+
+    def new_group(self) -> int:
+        name = f"Bench {self.unique()}"
+        self.services.user_manager.create_group(name)
+        return self.services.db.fetch_one("SELECT id FROM groups WHERE name = ?", (name,))['id']
+
+    def new_schedule_item(self) -> int:
+        group = self.group()
+        self.services.schedule_manager.add_schedule_item(
+            group['id'], 'sunday', "18:00", "18:45", self.subject()['name'], group['teacher_id']
+        )
+        return self.services.db.fetch_one("SELECT MAX(id) as id FROM schedule")['id']
+
+    def new_subject(self) -> int:
+        name = f"Bench {self.unique()}"
+        self.services.subjects_manager.add_subject(name)
+        return self.services.db.fetch_one("SELECT id FROM subjects WHERE name = ?", (name,))['id']
+
+def student_in_group(s: Sampler) -> Tuple[int, int]:
+    student = s.student()
+    return student['id'], student['group_id']
+
+def grade_args(s: Sampler) -> tuple:
+    student = s.student()
+    return student['id'], student['group_id'], s.subject()['name'], s.rng.randint(1, 5), s.teacher()['id'], s.today
+
+def bulk_grade_args(s: Sampler) -> tuple:
+    group = s.group()
+    grades = {student_id: s.rng.randint(1, 5) for student_id in s.roster(group['id'])}
+    return group['id'], s.subject()['name'], grades, group['teacher_id'], s.today
+
+def bulk_attendance_args(s: Sampler) -> tuple:
+    group = s.group()
+    statuses = {student_id: s.rng.choice(['present', 'late', 'absent']) for student_id in s.roster(group['id'])}
+    return group['id'], s.date(), statuses, group['teacher_id']
+
+def assignment_args(s: Sampler) -> tuple:
+    group = s.group()
+    return "Bench", "Bench assignment", group['id'], group['teacher_id'], s.today + timedelta(days=7)
+
+def created_assignment(s: Sampler) -> tuple:
+    assignment_id = s.services.assignment_manager.create_assignment(*assignment_args(s))
+    teacher_id = s.services.db.fetch_one("SELECT teacher_id FROM assignments WHERE id = ?", (assignment_id,))
+    return assignment_id, teacher_id['teacher_id']
+
+CASES: List[Tuple[str, str, Callable[[Sampler], tuple]]] = [
+    ('user_manager', 'invalidate_user', lambda s: (s.student()['telegram_id'],)),
+    ('user_manager', 'ensure_admin_exists', lambda s: ()),
+    ('user_manager', 'create_user', lambda s: (s.unique(), "Bench User", "+70000000000", "student")),
+    ('user_manager', 'get_user', lambda s: (s.student()['telegram_id'],)),
+    ('user_manager', 'get_user_by_id', lambda s: (s.student()['id'],)),
+    ('user_manager', 'get_users_by_ids', lambda s: (s.roster(s.group()['id']),)),
+    ('user_manager', 'approve_user', lambda s: (s.new_user()['telegram_id'],)),
+    ('user_manager', 'assign_user_to_group', lambda s: student_in_group(s)),
+    ('user_manager', 'assign_teacher_to_group', lambda s: (lambda group: (group['teacher_id'], group['id']))(s.group())),
+    ('user_manager', 'update_group_teacher', lambda s: (lambda group: (group['id'], group['teacher_id']))(s.group())),
+    ('user_manager', 'reject_user', lambda s: (s.new_user()['telegram_id'],)),
+    ('user_manager', 'get_pending_users', lambda s: ()),
+    ('user_manager', 'create_group', lambda s: (f"Bench {s.unique()}",)),
+    ('user_manager', 'get_all_groups', lambda s: ()),
+    ('user_manager', 'get_groups_page', lambda s: ()),
+    ('user_manager', 'get_group', lambda s: (s.group()['id'],)),
+    ('user_manager', 'get_group_with_details', lambda s: (s.group()['id'],)),
+    ('user_manager', 'get_group_students', lambda s: (s.group()['id'],)),
+    ('user_manager', 'get_group_students_page', lambda s: (s.group()['id'],)),
+    ('user_manager', 'get_students_without_groups', lambda s: ()),
+    ('user_manager', 'get_students_without_groups_page', lambda s: ()),
+    ('user_manager', 'get_available_teachers', lambda s: ()),
+    ('user_manager', 'get_available_teachers_page', lambda s: ()),
+    ('user_manager', 'get_active_students', lambda s: ()),
+    ('user_manager', 'remove_student_from_group', lambda s: (s.new_user()['id'],)),
+    ('user_manager', 'delete_group', lambda s: (s.new_group(),)),
+    ('user_manager', 'update_group_name', lambda s: (lambda group: (group['id'], group['name']))(s.group())),
+    ('user_manager', 'get_table_versions', lambda s: ('users', 'groups')),
+    ('user_manager', 'get_system_stats', lambda s: ()),
+    ('user_manager', 'get_teacher_groups', lambda s: (s.teacher()['id'],)),
+    ('user_manager', 'get_assignments_for_student', lambda s: (s.group()['id'],)),
+    ('user_manager', 'get_students_management_keyboard_data', lambda s: (s.group()['id'],)),
+    ('grades_manager', 'add_grade', grade_args),
+    ('grades_manager', 'add_grades_bulk', bulk_grade_args),
+    ('grades_manager', 'get_student_grades', lambda s: (s.student()['id'], s.subject()['name'])),
+    ('grades_manager', 'get_group_grades', lambda s: (s.group()['id'], s.subject()['name'])),
+    ('grades_manager', 'get_average_grade', lambda s: (s.student()['id'],)),
+    ('grades_manager', 'get_group_average_grade', lambda s: (s.group()['id'],)),
+    ('grades_manager', 'get_recent_grades', lambda s: (s.group()['id'],)),
+    ('grades_manager', 'get_group_recent_grades', lambda s: (s.group()['id'], s.subject()['name'])),
+    ('grades_manager', 'get_student_recent_grades', lambda s: (s.student()['id'], s.subject()['name'])),
+    ('grades_manager', 'get_grade_statistics', lambda s: (s.group()['id'],)),
+    ('attendance_manager', 'mark_attendance',
+     lambda s: (*student_in_group(s), s.date(), s.rng.choice(['present', 'late', 'absent']), s.teacher()['id'])),
+    ('attendance_manager', 'mark_attendance_bulk', bulk_attendance_args),
+    ('attendance_manager', 'get_group_statuses', lambda s: (s.group()['id'], s.date())),
+    ('attendance_manager', 'get_group_attendance', lambda s: (s.group()['id'], s.date())),
+    ('attendance_manager', 'get_student_attendance_stats', lambda s: student_in_group(s)),
+    ('assignment_manager', 'create_assignment', assignment_args),
+    ('assignment_manager', 'get_assignments_for_group', lambda s: (s.group()['id'],)),
+    ('assignment_manager', 'get_teacher_assignments', lambda s: (s.teacher()['id'],)),
+    ('assignment_manager', 'delete_assignment', created_assignment),
+    ('assignment_manager', 'get_assignments_for_student', lambda s: (s.student()['id'],)),
+    ('schedule_manager', 'add_schedule_item',
+     lambda s: (lambda group: (group['id'], 'sunday', "18:00", "18:45", s.subject()['name'], group['teacher_id']))(s.group())),
+    ('schedule_manager', 'get_group_schedule', lambda s: (s.group()['id'],)),
+    ('schedule_manager', 'delete_schedule_item', lambda s: (s.new_schedule_item(),)),
+    ('schedule_manager', 'get_schedule_by_day', lambda s: (s.group()['id'], 'monday')),
+    ('subjects_manager', 'add_subject', lambda s: (f"Bench {s.unique()}",)),
+    ('subjects_manager', 'get_all_subjects', lambda s: ()),
+    ('subjects_manager', 'get_subject', lambda s: (s.subject()['id'],)),
+    ('subjects_manager', 'delete_subject', lambda s: (s.new_subject(),)),
+    ('subjects_manager', 'update_subject',
+     lambda s: (lambda subject: (subject['id'], subject['name'], subject['description']))(s.subject())),
+    ('student_dashboard', 'get_dashboard', lambda s: student_in_group(s)),
+    ('group_analytics', 'get_teacher_report', lambda s: (s.teacher()['id'],)),
+]
+
+def public_methods(service) -> List[str]:
+    return [
+        name for name, member in inspect.getmembers(type(service), inspect.isfunction)
+        if not name.startswith('_')
+    ]
+
+def missing_cases(services: ServiceRegistry) -> List[str]:
+    covered = {(manager, method) for manager, method, _ in CASES}
+    return [
+        f"{type(getattr(services, manager)).__name__}.{method}"
+        for manager in BENCHMARKED_MANAGERS
+        for method in public_methods(getattr(services, manager))
+        if (manager, method) not in covered
+    ]
+
+def run_case(services: ServiceRegistry, sampler: Sampler, manager: str, method: str,
+             make_args: Callable[[Sampler], tuple], iterations: int, time_budget: float) -> Dict:
+    call = getattr(getattr(services, manager), method)
+    timings = []
+    deadline = time.perf_counter() + time_budget
+    while len(timings) < iterations and (len(timings) < 5 or time.perf_counter() < deadline):
+        args = make_args(sampler)
+        start = time.perf_counter()
+        call(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        'iterations': len(timings),
+        'median_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'mean_ms': round(statistics.fmean(timings), 4)
+    }
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result['median_ms'] < NOISE_FLOOR_MS and base['median_ms'] < NOISE_FLOOR_MS:
+            continue
+        if result['median_ms'] > base['median_ms'] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark every public method of the data services")
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--students-per-group", type=int, default=25)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--today", type=date.fromisoformat, default=BENCH_DATE,
+                        help="last day of the generated history, YYYY-MM-DD")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--time-budget", type=float, default=1.0, help="seconds per method")
+    parser.add_argument("--only", default="", help="run only methods whose name contains this text")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    settings = {
+        'groups': args.groups, 'students_per_group': args.students_per_group, 'years': args.years,
+        'today': args.today.isoformat()
+    }
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get('settings') == settings:
+            baseline = saved['results']
+        else:
+            logger.warning(f"Baseline was recorded with {saved.get('settings')}, not comparing")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench_services.db"))
+        services = ServiceRegistry(db)
+        services.init_storage()
+        try:
+            counts = generate(db, groups=args.groups, students_per_group=args.students_per_group, years=args.years,
+                              today=args.today)
+            for name in missing_cases(services):
+                logger.warning(f"No benchmark case for {name}")
+
+            sampler = Sampler(services, args.today)
+            results = {}
+            print(f"{'method':<58} {'runs':>6} {'median, ms':>11} {'p95, ms':>9} {'baseline':>9} {'change':>8}")
+            for manager, method, make_args in CASES:
+                name = f"{type(getattr(services, manager)).__name__}.{method}"
+                if args.only and args.only not in name:
+                    continue
+
+                result = run_case(services, sampler, manager, method, make_args, args.iterations, args.time_budget)
+                results[name] = result
+
+                base = baseline.get(name)
+                change = f"{(result['median_ms'] / base['median_ms'] - 1) * 100:+.0f}%" if base and base['median_ms'] else ""
+                print(f"{name:<58} {result['iterations']:>6} {result['median_ms']:>11.3f} {result['p95_ms']:>9.3f} "
+                      f"{base['median_ms'] if base else '':>9} {change:>8}")
+        finally:
+            db.shutdown()
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({'settings': settings, 'dataset': counts, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
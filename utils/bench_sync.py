@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+from services.database import Database
+from services.sync_manager import SyncManager
+from utils.bench_export import populate
+from utils.fake_gspread import FakeSpreadsheet, FakeSheetsManager
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SIZES = [1000, 10000, 50000]
+CHANGED_RATIO = 0.01
+
+def measure(spreadsheet: FakeSpreadsheet, func) -> tuple:
+    spreadsheet.reset_counters()
+    start = time.perf_counter()
+    ok = func()
+    return time.perf_counter() - start, spreadsheet.total_requests, bool(ok), sum(spreadsheet.errors.values())
+
+def touch_users(db: Database, ratio: float):
+    user_ids = [row['id'] for row in db.fetch_all("SELECT id FROM users")]
+    changed = random.sample(user_ids, max(1, int(len(user_ids) * ratio)))
+    db.executemany("UPDATE users SET phone = phone || '0' WHERE id = ?", [(user_id,) for user_id in changed])
+
+def bench(size: int, tmp_dir: str, spreadsheet: FakeSpreadsheet) -> dict:
+    db = Database(os.path.join(tmp_dir, f"sync_{size}.db"))
+    target = Database(os.path.join(tmp_dir, f"sync_{size}_import.db"))
+    db.init_db()
+    target.init_db()
+    try:
+        populate(db, size)
+        sheets = FakeSheetsManager(spreadsheet)
+        sync = SyncManager(db, sheets)
+
+        results = {
+            'full_export': measure(spreadsheet, lambda: sync.export_to_sheets(full=True)),
+            'idle_export': measure(spreadsheet, sync.export_to_sheets)
+        }
+
+        touch_users(db, CHANGED_RATIO)
+        results['incremental_export'] = measure(spreadsheet, sync.export_to_sheets)
+        results['import'] = measure(spreadsheet, SyncManager(target, sheets).sync_from_sheets)
+        results['idle_import'] = measure(spreadsheet, sync.sync_from_sheets)
+    finally:
+        db.shutdown()
+        target.shutdown()
+
+    return results
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Google Sheets sync against an in-memory spreadsheet")
+    parser.add_argument("sizes", nargs="*", type=int, default=SIZES)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--quota", type=int, default=None, help="requests allowed per minute")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 429")
+    args = parser.parse_args(argv)
+
+    random.seed(42)
+    steps = ['full_export', 'incremental_export', 'idle_export', 'import', 'idle_import']
+    print(f"{'users':>8} " + " ".join(f"{step + ', s/req':>26}" for step in steps) + f" {'api errors':>11}")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            spreadsheet = FakeSpreadsheet(args.latency, args.quota, args.error_rate, seed=size)
+            results = bench(size, tmp_dir, spreadsheet)
+            columns = " ".join(
+                f"{'!' if not results[step][2] else '':>1}{results[step][0]:>19.3f}/{results[step][1]:<5}"
+                for step in steps
+            )
+            print(f"{size:>8} {columns} {sum(result[3] for result in results.values()):>11}")
+            failed = failed or not all(results[step][2] for step in steps)
+
+    if failed:
+        print("! - sync step failed")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import os
+import re
+import sys
+import logging
+import tempfile
+
+from services.database import Database
+from services.registry import ServiceRegistry
+from bot.storage import STATE_SELECT
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HOT_CALLS = [
+    ("user_manager", "get_user", (1,)),
+    ("user_manager", "get_user_by_id", (1,)),
+    ("user_manager", "get_users_by_ids", ([1, 2, 3],)),
+    ("user_manager", "get_group", (1,)),
+    ("user_manager", "get_group_students", (1,)),
+    ("user_manager", "get_students_without_groups", ()),
+    ("user_manager", "get_available_teachers", ()),
+    ("user_manager", "get_pending_users", ()),
+    ("user_manager", "get_available_teachers_page", (0,)),
+    ("user_manager", "get_group_students_page", (1, 0)),
+    ("user_manager", "get_teacher_groups", (1,)),
+    ("attendance_manager", "get_group_statuses", (1, '2024-01-01')),
+    ("attendance_manager", "get_group_attendance", (1, '2024-01-01')),
+    ("attendance_manager", "get_student_attendance_stats", (1, 1)),
+    ("grades_manager", "get_student_grades", (1, 'x')),
+    ("grades_manager", "get_student_grades", (1,)),
+    ("grades_manager", "get_group_grades", (1, 'x')),
+    ("grades_manager", "get_average_grade", (1,)),
+    ("grades_manager", "get_group_average_grade", (1,)),
+    ("grades_manager", "get_recent_grades", (1,)),
+    ("grades_manager", "get_group_recent_grades", (1, 'x')),
+    ("grades_manager", "get_student_recent_grades", (1, 'x')),
+    ("grades_manager", "get_grade_statistics", (1,)),
+    ("student_dashboard", "get_dashboard", (1, 1)),
+    ("group_analytics", "get_teacher_report", (1,)),
+    ("group_analytics", "get_teacher_report", (1, '2024-01-01')),
+    ("assignment_manager", "get_assignments_for_group", (1,)),
+    ("assignment_manager", "get_teacher_assignments", (1,)),
+    ("assignment_manager", "get_assignments_for_student", (1,)),
+    ("schedule_manager", "get_group_schedule", (1,)),
+    ("schedule_manager", "get_schedule_by_day", (1, 'monday')),
+]
+
+HOT_QUERIES = [
+    ("SQLiteStorage.get_state", STATE_SELECT, ('fsm:1:1:default',)),
+]
+
+def is_full_scan(detail: str, derived: set) -> bool:
+    if not detail.startswith("SCAN ") or " USING " in detail:
+        return False
+    source = detail.split()[1]
+    return not source.startswith("(") and source not in derived
+
+def derived_sources(query: str) -> set:
+    derived = set(re.findall(r"(\w+)\s+AS\s*\(", query, re.IGNORECASE))
+    for source, alias in re.findall(r"(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)", query, re.IGNORECASE):
+        if source in derived:
+            derived.add(alias)
+    return derived
+
+def explain(db: Database, name: str, query: str, params: tuple = ()) -> list:
+    derived = derived_sources(query)
+    plan = db.fetch_all(f"EXPLAIN QUERY PLAN {query}", params)
+    scans = [row['detail'] for row in plan if is_full_scan(row['detail'], derived)]
+    if scans:
+        logger.error(f"{name}: full table scan ({'; '.join(scans)})")
+    return scans
+
+def traced_queries(db: Database, call) -> list:
+    queries = []
+    conn = db.connections.get_connection()
+    conn.set_trace_callback(queries.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [query for query in queries if query.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+def check_query_plans(db: Database) -> list:
+    services = ServiceRegistry(db)
+    failures = []
+    for manager, method, args in HOT_CALLS:
+        service = getattr(services, manager)
+        name = f"{type(service).__name__}.{method}{args}"
+        queries = traced_queries(db, lambda: getattr(service, method)(*args))
+        if not queries:
+            failures.append((name, ["no queries executed"]))
+            logger.error(f"{name}: no queries executed")
+            continue
+
+        scans = [scan for query in queries for scan in explain(db, name, query)]
+        if scans:
+            failures.append((name, scans))
+        else:
+            logger.info(f"{name}: OK ({len(queries)} queries)")
+
+    for name, query, params in HOT_QUERIES:
+        scans = explain(db, name, query, params)
+        if scans:
+            failures.append((name, scans))
+        else:
+            logger.info(f"{name}: OK")
+    return failures
+
+def main(db_path: str = None) -> int:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(db_path or os.path.join(tmp_dir, "query_plans.db"))
+        db.init_db()
+        try:
+            failures = check_query_plans(db)
+        finally:
+            db.shutdown()
+
+    if failures:
+        logger.error(f"{len(failures)} hot calls fall back to a full table scan")
+        return 1
+
+    logger.info(f"All {len(HOT_CALLS) + len(HOT_QUERIES)} hot calls use an index")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else None))
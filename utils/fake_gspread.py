@@ -0,0 +1,222 @@
+import re
+import time
+import random
+import threading
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+from services.google_sheets import GoogleSheetsManager
+
+CELL_PATTERN = re.compile(r"^([A-Z]+)(\d+)")
+
+class WorksheetNotFound(Exception):
+    pass
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+class APIError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"APIError: [{status_code}]: {message}")
+        self.response = FakeResponse(status_code)
+
+def parse_cell(range_name: str) -> tuple:
+    match = CELL_PATTERN.match(range_name.split("!")[-1])
+    if not match:
+        raise APIError(400, f"Unable to parse range: {range_name}")
+
+    column = 0
+    for letter in match.group(1):
+        column = column * 26 + ord(letter) - ord("A") + 1
+    return int(match.group(2)), column
+
+def numericise(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+class FakeSpreadsheet:
+    def __init__(self, latency: float = 0.0, quota_per_minute: int = None, error_rate: float = 0.0,
+                 seed: int = None):
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self.errors = Counter()
+        self._worksheets: Dict[str, FakeWorksheet] = {}
+        self._recent = deque()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def reset_counters(self):
+        self.requests.clear()
+        self.errors.clear()
+
+    def request(self, method: str):
+        with self._lock:
+            now = time.monotonic()
+            self.requests[method] += 1
+
+            if self.quota_per_minute:
+                while self._recent and now - self._recent[0] >= 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.quota_per_minute:
+                    self.errors[method] += 1
+                    raise APIError(429, "Quota exceeded for quota metric 'Write requests' per minute")
+                self._recent.append(now)
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors[method] += 1
+                raise APIError(429, "RATE_LIMIT_EXCEEDED")
+
+        if self.latency:
+            time.sleep(self.latency)
+
+    def worksheets(self) -> List["FakeWorksheet"]:
+        self.request("worksheets")
+        return list(self._worksheets.values())
+
+    def worksheet(self, title: str) -> "FakeWorksheet":
+        self.request("worksheet")
+        if title not in self._worksheets:
+            raise WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def add_worksheet(self, title: str, rows: int, cols: int) -> "FakeWorksheet":
+        self.request("add_worksheet")
+        if title in self._worksheets:
+            raise APIError(400, f"A sheet with the name \"{title}\" already exists")
+        worksheet = FakeWorksheet(self, title, rows, cols)
+        self._worksheets[title] = worksheet
+        return worksheet
+
+    def del_worksheet(self, worksheet: "FakeWorksheet"):
+        self.request("del_worksheet")
+        self._worksheets.pop(worksheet.title, None)
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet: FakeSpreadsheet, title: str, rows: int, cols: int):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self.cells: List[List[str]] = []
+
+    def _check_exists(self):
+        if self.spreadsheet._worksheets.get(self.title) is not self:
+            raise APIError(400, f"Unable to parse range: '{self.title}'!A1")
+
+    def _write(self, row: int, column: int, values: List[list]):
+        end_row = row + len(values) - 1
+        end_column = column + max((len(value) for value in values), default=1) - 1
+        if end_row > self.row_count or end_column > self.col_count:
+            raise APIError(400, f"Range ('{self.title}'!R{end_row}C{end_column}) exceeds grid limits")
+
+        while len(self.cells) < end_row:
+            self.cells.append([])
+        for offset, values_row in enumerate(values):
+            cells_row = self.cells[row - 1 + offset]
+            if len(cells_row) < end_column:
+                cells_row.extend([""] * (end_column - len(cells_row)))
+            for index, value in enumerate(values_row):
+                cells_row[column - 1 + index] = "" if value is None else str(value)
+
+    def _values(self) -> List[List[str]]:
+        rows = [list(row) for row in self.cells]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    def clear(self):
+        self.spreadsheet.request("clear")
+        self._check_exists()
+        self.cells = []
+
+    def resize(self, rows: int = None, cols: int = None):
+        self.spreadsheet.request("resize")
+        self._check_exists()
+        if rows is not None:
+            self.row_count = rows
+            del self.cells[rows:]
+        if cols is not None:
+            self.col_count = cols
+            self.cells = [row[:cols] for row in self.cells]
+
+    def update(self, range_name: str, values: List[list] = None, value_input_option: str = None):
+        self.spreadsheet.request("update")
+        self._check_exists()
+        self._write(*parse_cell(range_name), values or [[]])
+
+    def batch_update(self, data: List[dict], value_input_option: str = None):
+        self.spreadsheet.request("batch_update")
+        self._check_exists()
+        for item in data:
+            self._write(*parse_cell(item['range']), item['values'])
+
+    def update_cell(self, row: int, col: int, value):
+        self.spreadsheet.request("update_cell")
+        self._check_exists()
+        self._write(row, col, [[value]])
+
+    def _append(self, values: List[list]):
+        self._check_exists()
+        start = len(self._values()) + 1
+        self.row_count = max(self.row_count, start + len(values) - 1)
+        self.col_count = max(self.col_count, max((len(row) for row in values), default=0))
+        self._write(start, 1, values)
+
+    def append_rows(self, values: List[list], value_input_option: str = None):
+        self.spreadsheet.request("append_rows")
+        self._append(values)
+
+    def append_row(self, values: list, value_input_option: str = None):
+        self.spreadsheet.request("append_row")
+        self._append([values])
+
+    def col_values(self, col: int) -> List[str]:
+        self.spreadsheet.request("col_values")
+        self._check_exists()
+        values = [row[col - 1] if len(row) >= col else "" for row in self.cells]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def get_all_values(self) -> List[List[str]]:
+        self.spreadsheet.request("get_all_values")
+        self._check_exists()
+        return self._values()
+
+    def get_all_records(self, numericise_ignore: Optional[list] = None, **kwargs) -> List[Dict]:
+        self.spreadsheet.request("get_all_records")
+        self._check_exists()
+        values = self._values()
+        if not values:
+            return []
+
+        header = values[0]
+        keep_strings = numericise_ignore and 'all' in numericise_ignore
+        records = []
+        for row in values[1:]:
+            row = row + [""] * (len(header) - len(row))
+            records.append({
+                key: value if keep_strings or value == "" else numericise(value)
+                for key, value in zip(header, row)
+            })
+        return records
+
+class FakeSheetsManager(GoogleSheetsManager):
+    def __init__(self, spreadsheet: FakeSpreadsheet = None):
+        super().__init__()
+        self.fake = spreadsheet or FakeSpreadsheet()
+
+    def connect(self) -> bool:
+        self.sheet = self.fake
+        return True
@@ -0,0 +1,194 @@
+import sys
+import random
+import logging
+import argparse
+import itertools
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List
+
+from services.database import Database
+
+logger = logging.getLogger(__name__)
+
+SUBJECT_NAMES = [
+    "Математика", "Русский язык", "Английский язык", "Физика", "Химия",
+    "Биология", "История", "География", "Информатика", "Литература"
+]
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
+LESSON_TIMES = [
+    ("08:30", "09:15"), ("09:25", "10:10"), ("10:20", "11:05"), ("11:25", "12:10"),
+    ("12:20", "13:05"), ("13:15", "14:00"), ("14:10", "14:55"), ("15:05", "15:50")
+]
+ATTENDANCE_WEIGHTS = {'present': 85, 'late': 7, 'absent': 8}
+GRADE_WEIGHTS = {5: 30, 4: 35, 3: 25, 2: 8, 1: 2}
+INSERT_CHUNK = 10000
+
+def chunked(rows: Iterable[tuple], size: int = INSERT_CHUNK) -> Iterator[List[tuple]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def insert_rows(db: Database, query: str, rows: Iterable[tuple]) -> int:
+    count = 0
+    for chunk in chunked(rows):
+        with db.transaction():
+            db.executemany(query, chunk)
+        count += len(chunk)
+    return count
+
+def generate(db: Database, groups: int = 20, students_per_group: int = 25, teachers: int = 10, subjects: int = 10,
+             slots_per_group: int = 10, years: float = 1, graded_share: float = 0.2, pending_share: float = 0.05,
+             assignments_per_group: int = 20, seed: int = 42, today: date = None) -> Dict[str, int]:
+    rng = random.Random(seed)
+    today = today or date.today()
+    counts = {}
+
+    telegram_base = db.fetch_one("SELECT COALESCE(MAX(telegram_id), 0) as value FROM users")['value'] + 1
+    group_base = db.fetch_one("SELECT COALESCE(MAX(id), 0) as value FROM groups")['value'] + 1
+
+    subject_names = SUBJECT_NAMES[:subjects] + [f"Предмет {i}" for i in range(len(SUBJECT_NAMES) + 1, subjects + 1)]
+    with db.transaction():
+        db.executemany("INSERT OR IGNORE INTO subjects (name) VALUES (?)", [(name,) for name in subject_names])
+    counts['subjects'] = len(subject_names)
+
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO users (telegram_id, full_name, phone, role, status) VALUES (?, ?, ?, 'teacher', 'active')",
+            [(telegram_base + i, f"Учитель {telegram_base + i}", f"+7700{i:07d}") for i in range(teachers)]
+        )
+        teacher_ids = [
+            row['id'] for row in db.fetch_all(
+                "SELECT id FROM users WHERE role = 'teacher' AND telegram_id >= ? ORDER BY id", (telegram_base,)
+            )
+        ]
+
+        db.executemany(
+            "INSERT INTO groups (name, teacher_id) VALUES (?, ?)",
+            [(f"Группа {group_base + i}", teacher_ids[i % len(teacher_ids)] if teacher_ids else None)
+             for i in range(groups)]
+        )
+        group_rows = db.fetch_all("SELECT id, teacher_id FROM groups WHERE id >= ? ORDER BY id", (group_base,))
+
+        student_base = telegram_base + teachers
+        db.executemany(
+            "INSERT INTO users (telegram_id, full_name, phone, role, status, group_id) VALUES (?, ?, ?, 'student', ?, ?)",
+            [
+                (student_base + i, f"Ученик {student_base + i}", f"+7701{i:07d}",
+                 'pending' if rng.random() < pending_share else 'active', group_rows[i // students_per_group]['id'])
+                for i in range(groups * students_per_group)
+            ]
+        )
+    counts['teachers'] = len(teacher_ids)
+    counts['groups'] = len(group_rows)
+    counts['students'] = groups * students_per_group
+
+    students_by_group = {group['id']: [] for group in group_rows}
+    for row in db.fetch_all(
+        "SELECT id, group_id FROM users WHERE role = 'student' AND status = 'active' AND telegram_id >= ?",
+        (student_base,)
+    ):
+        students_by_group[row['group_id']].append(row['id'])
+
+    slots = {}
+    schedule_rows = []
+    for group in group_rows:
+        free = [(day, time) for day in DAYS for time in LESSON_TIMES]
+        group_slots = sorted(rng.sample(free, min(slots_per_group, len(free))), key=lambda slot: DAYS.index(slot[0]))
+        slots[group['id']] = [(day, rng.choice(subject_names)) for day, _ in group_slots]
+        schedule_rows.extend(
+            (group['id'], day, start, end, subject, group['teacher_id'])
+            for (day, (start, end)), (_, subject) in zip(group_slots, slots[group['id']])
+        )
+    counts['schedule'] = insert_rows(
+        db, "INSERT INTO schedule (group_id, day_of_week, start_time, end_time, subject, teacher_id) VALUES (?, ?, ?, ?, ?, ?)",
+        schedule_rows
+    )
+
+    start_date = today - timedelta(days=int(365 * years))
+    school_days = [start_date + timedelta(days=offset) for offset in range((today - start_date).days + 1)]
+    school_days = [day for day in school_days if day.weekday() < len(DAYS)]
+    statuses = list(ATTENDANCE_WEIGHTS)
+    status_weights = list(ATTENDANCE_WEIGHTS.values())
+    grades = list(GRADE_WEIGHTS)
+    grade_weights = list(GRADE_WEIGHTS.values())
+
+    def attendance_rows():
+        for group in group_rows:
+            lesson_days = {day for day, _ in slots[group['id']]}
+            students = students_by_group[group['id']]
+            for day in school_days:
+                if DAYS[day.weekday()] not in lesson_days:
+                    continue
+                marks = rng.choices(statuses, status_weights, k=len(students))
+                for student_id, status in zip(students, marks):
+                    yield day.isoformat(), group['id'], student_id, status, group['teacher_id']
+
+    def grade_rows():
+        for group in group_rows:
+            students = students_by_group[group['id']]
+            graded = max(1, int(len(students) * graded_share)) if students else 0
+            for day in school_days:
+                for lesson_day, subject in slots[group['id']]:
+                    if lesson_day != DAYS[day.weekday()]:
+                        continue
+                    for student_id in rng.sample(students, graded):
+                        grade = rng.choices(grades, grade_weights)[0]
+                        yield student_id, group['id'], subject, grade, day.isoformat(), group['teacher_id']
+
+    def assignment_rows():
+        for group in group_rows:
+            for number in range(1, assignments_per_group + 1):
+                deadline = start_date + timedelta(days=rng.randrange((today - start_date).days + 30))
+                yield (f"Задание {number}", f"Описание задания {number}", group['id'],
+                       group['teacher_id'], deadline.isoformat())
+
+    counts['attendance'] = insert_rows(
+        db, "INSERT INTO attendance (date, group_id, student_id, status, marked_by) VALUES (?, ?, ?, ?, ?)",
+        attendance_rows()
+    )
+    counts['grades'] = insert_rows(
+        db, "INSERT INTO grades (student_id, group_id, subject, grade, date, teacher_id) VALUES (?, ?, ?, ?, ?, ?)",
+        grade_rows()
+    )
+    counts['assignments'] = insert_rows(
+        db, "INSERT INTO assignments (title, description, group_id, teacher_id, deadline) VALUES (?, ?, ?, ?, ?)",
+        assignment_rows()
+    )
+
+    db.execute("ANALYZE")
+    logger.info(f"Generated school data: {counts}")
+    return counts
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Fill the database with a synthetic school")
+    parser.add_argument("--db", default="kulun_school.db")
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--students-per-group", type=int, default=25)
+    parser.add_argument("--teachers", type=int, default=10)
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--slots-per-group", type=int, default=10, help="weekly schedule slots per group")
+    parser.add_argument("--years", type=float, default=1, help="years of attendance and grades history")
+    parser.add_argument("--assignments-per-group", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="last day of the generated history, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = Database(args.db)
+    db.init_db()
+    try:
+        generate(
+            db, groups=args.groups, students_per_group=args.students_per_group, teachers=args.teachers,
+            subjects=args.subjects, slots_per_group=args.slots_per_group, years=args.years,
+            assignments_per_group=args.assignments_per_group, seed=args.seed, today=args.today
+        )
+    finally:
+        db.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
-from services.google_sheets import GoogleSheetsManager
+from services.google_sheets import get_sheets_manager
 
 def initialize_google_sheets():
-    sheets_manager = GoogleSheetsManager()
+    sheets_manager = get_sheets_manager()
 
     sheets_manager.get_worksheet("Users")
     sheets_manager.get_worksheet("Groups")
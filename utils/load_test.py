@@ -0,0 +1,300 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import itertools
+import shutil
+import statistics
+import tempfile
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import EditMessageText, SendMessage
+from aiogram.types import Chat, Message, TelegramObject
+
+from bot.main import create_dispatcher
+from bot.storage import SQLiteStorage
+from services.database import Database, count_queries
+from services.registry import ServiceRegistry
+from services.async_db import DatabaseExecutor
+from services.jobs import JobRunner
+from utils.auto_sync import AutoSyncScheduler
+from utils.generate_school_data import generate
+from utils.post_updates import load_updates
+
+logging.getLogger().setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BOT_ID = 100000
+TOKEN = f"{BOT_ID}:load-test"
+UNHANDLED = "unhandled"
+
+current_record: ContextVar[Optional[Dict]] = ContextVar('current_record', default=None)
+
+class FakeSession(BaseSession):
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method, timeout: int = None):
+        self.requests += 1
+        if isinstance(method, (SendMessage, EditMessageText)):
+            return Message(
+                message_id=getattr(method, "message_id", None) or next(self._message_ids),
+                date=int(time.time()),
+                chat=Chat(id=method.chat_id or 0, type='private'),
+                text=method.text
+            )
+        return True
+
+    async def stream_content(self, url: str, headers: dict = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True):
+        yield b""
+
+    async def close(self):
+        pass
+
+class HandlerRecorder(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        record = current_record.get()
+        if record is not None:
+            callback = data['handler'].callback
+            record['handler'] = f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+        return await handler(event, data)
+
+class UpdateFactory:
+    def __init__(self):
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._callback_ids = itertools.count(1)
+
+    def user(self, telegram_id: int) -> Dict:
+        return {'id': telegram_id, 'is_bot': False, 'first_name': f"User {telegram_id}"}
+
+    def chat(self, telegram_id: int) -> Dict:
+        return {'id': telegram_id, 'type': 'private'}
+
+    def message(self, telegram_id: int, text: str) -> Dict:
+        return {
+            'update_id': next(self._update_ids),
+            'message': {
+                'message_id': next(self._message_ids),
+                'date': int(time.time()),
+                'chat': self.chat(telegram_id),
+                'from': self.user(telegram_id),
+                'text': text
+            }
+        }
+
+    def callback(self, telegram_id: int, data: str) -> Dict:
+        return {
+            'update_id': next(self._update_ids),
+            'callback_query': {
+                'id': str(next(self._callback_ids)),
+                'chat_instance': str(telegram_id),
+                'from': self.user(telegram_id),
+                'data': data,
+                'message': {
+                    'message_id': next(self._message_ids),
+                    'date': int(time.time()),
+                    'chat': self.chat(telegram_id),
+                    'from': {'id': BOT_ID, 'is_bot': True, 'first_name': "KULUN School"},
+                    'text': ""
+                }
+            }
+        }
+
+class School:
+    def __init__(self, services: ServiceRegistry, seed: int = 42):
+        db = services.db
+        self.rng = random.Random(seed)
+        self.teachers = db.fetch_all("SELECT id, telegram_id FROM users WHERE role = 'teacher' AND status = 'active'")
+        self.students = db.fetch_all(
+            "SELECT telegram_id FROM users WHERE role = 'student' AND status = 'active' AND group_id IS NOT NULL"
+        )
+        self.subjects = [row['name'] for row in db.fetch_all("SELECT name FROM subjects")]
+        self.groups = defaultdict(list)
+        for group in db.fetch_all("SELECT id, name, teacher_id FROM groups WHERE teacher_id IS NOT NULL"):
+            group['students'] = [student['id'] for student in services.user_manager.get_group_students(group['id'])]
+            if group['students']:
+                self.groups[group['teacher_id']].append(group)
+        self.teachers = [teacher for teacher in self.teachers if self.groups[teacher['id']]]
+
+    def teacher_script(self, factory: UpdateFactory, teacher: Dict) -> List[Dict]:
+        telegram_id = teacher['telegram_id']
+        group = self.rng.choice(self.groups[teacher['id']])
+        toggled = self.rng.sample(group['students'], min(3, len(group['students'])))
+        grades = [self.rng.choice(["5", "4", "3", "-"]) for _ in group['students']]
+
+        return [
+            factory.message(telegram_id, "Посещаемость"),
+            factory.message(telegram_id, group['name']),
+            *(factory.callback(telegram_id, f"roll_{student_id}") for student_id in toggled),
+            factory.callback(telegram_id, "roll_save"),
+            factory.message(telegram_id, "Выставить оценки"),
+            factory.message(telegram_id, group['name']),
+            factory.message(telegram_id, self.rng.choice(self.subjects)),
+            factory.message(telegram_id, " ".join(grades)),
+            factory.message(telegram_id, "Успеваемость"),
+            factory.callback(telegram_id, self.rng.choice(["performance_7", "performance_30", "performance_all"])),
+            factory.message(telegram_id, "Мои группы")
+        ]
+
+    def student_script(self, factory: UpdateFactory, student: Dict) -> List[Dict]:
+        telegram_id = student['telegram_id']
+        return [
+            factory.message(telegram_id, "Мои результаты"),
+            factory.message(telegram_id, "Расписание"),
+            factory.message(telegram_id, "Мой профиль"),
+            factory.message(telegram_id, "Мои задания")
+        ]
+
+    def scripts(self, teachers: int, students: int, rounds: int) -> List[List[Dict]]:
+        factory = UpdateFactory()
+        scripts = []
+        for teacher in self.rng.sample(self.teachers, min(teachers, len(self.teachers))):
+            scripts.append([update for _ in range(rounds) for update in self.teacher_script(factory, teacher)])
+        for student in self.rng.sample(self.students, min(students, len(self.students))):
+            scripts.append([update for _ in range(rounds) for update in self.student_script(factory, student)])
+        return scripts
+
+def recorded_scripts(updates: List[Dict]) -> List[List[Dict]]:
+    scripts = defaultdict(list)
+    for update in updates:
+        event = next((value for key, value in update.items() if key != 'update_id' and isinstance(value, dict)), {})
+        scripts[event.get('from', {}).get('id')].append(update)
+    return list(scripts.values())
+
+async def replay(dp, bot: Bot, updates: List[Dict], records: List[Dict], think: float, rng: random.Random):
+    for update in updates:
+        if think:
+            await asyncio.sleep(rng.uniform(0, think))
+
+        record = {'handler': UNHANDLED, 'error': None}
+        token = current_record.set(record)
+        start = time.perf_counter()
+        try:
+            with count_queries() as queries:
+                await dp.feed_raw_update(bot, update)
+        except Exception as e:
+            record['error'] = str(e)
+            logger.error(f"Error processing update {update.get('update_id')}: {e}")
+        finally:
+            record['elapsed_ms'] = (time.perf_counter() - start) * 1000
+            record['queries'] = queries[0]
+            current_record.reset(token)
+        records.append(record)
+
+def percentile(values: List[float], share: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+def summarize(records: List[Dict]) -> Dict[str, Dict]:
+    by_handler = defaultdict(list)
+    for record in records:
+        by_handler[record['handler']].append(record)
+
+    summary = {}
+    for handler, items in sorted(by_handler.items()):
+        timings = sorted(item['elapsed_ms'] for item in items)
+        queries = [item['queries'] for item in items]
+        summary[handler] = {
+            'count': len(items),
+            'p50_ms': percentile(timings, 0.5),
+            'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99),
+            'avg_queries': statistics.fmean(queries),
+            'max_queries': max(queries),
+            'errors': sum(1 for item in items if item['error'])
+        }
+    return summary
+
+async def run(services: ServiceRegistry, scripts: List[List[Dict]], think: float, db_workers: int,
+              seed: int) -> tuple:
+    db_executor = DatabaseExecutor(db_workers)
+    job_runner = JobRunner()
+    auto_sync = AutoSyncScheduler(job_runner, db_executor, services.db, interval=0)
+    storage = SQLiteStorage(services.db, db_executor)
+    session = FakeSession()
+    bot = Bot(token=TOKEN, session=session)
+
+    dp = create_dispatcher(services, db_executor, job_runner, auto_sync, storage)
+    dp.message.middleware(HandlerRecorder())
+    dp.callback_query.middleware(HandlerRecorder())
+
+    records = []
+    rng = random.Random(seed)
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(replay(dp, bot, script, records, think, rng) for script in scripts))
+        elapsed = time.perf_counter() - start
+    finally:
+        await storage.close()
+        job_runner.shutdown()
+        db_executor.shutdown()
+
+    return records, elapsed, session.requests
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay updates through the bot dispatcher and report handler latency")
+    parser.add_argument("--db", default=None, help="run against a copy of this database instead of synthetic data")
+    parser.add_argument("--updates", default=None, help="JSON array or JSON lines file with recorded updates")
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--students-per-group", type=int, default=25)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--teachers", type=int, default=10, help="simulated teachers")
+    parser.add_argument("--students", type=int, default=50, help="simulated students")
+    parser.add_argument("--rounds", type=int, default=3, help="times every simulated user repeats its script")
+    parser.add_argument("--think", type=float, default=0.0, help="max random pause between updates, sec.")
+    parser.add_argument("--db-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "load_test.db")
+        if args.db:
+            shutil.copyfile(args.db, db_path)
+
+        db = Database(db_path)
+        services = ServiceRegistry(db)
+        services.init_storage()
+        try:
+            if not args.db:
+                generate(db, groups=args.groups, students_per_group=args.students_per_group,
+                         teachers=min(args.groups, 10), years=args.years, seed=args.seed)
+
+            if args.updates:
+                scripts = recorded_scripts(load_updates(args.updates))
+            else:
+                scripts = School(services, args.seed).scripts(args.teachers, args.students, args.rounds)
+
+            records, elapsed, api_requests = asyncio.run(run(services, scripts, args.think, args.db_workers, args.seed))
+        finally:
+            db.shutdown()
+
+    summary = summarize(records)
+    print(f"{'handler':<42} {'updates':>8} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9} "
+          f"{'queries':>8} {'max q':>6} {'errors':>7}")
+    for handler, result in summary.items():
+        print(f"{handler:<42} {result['count']:>8} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['avg_queries']:>8.1f} {result['max_queries']:>6} {result['errors']:>7}")
+
+    errors = sum(result['errors'] for result in summary.values())
+    print(f"\n{len(records)} update(s) from {len(scripts)} user(s) in {elapsed:.2f} sec.: "
+          f"{len(records) / elapsed if elapsed else 0:.1f} updates/sec., "
+          f"{sum(record['queries'] for record in records)} queries, {api_requests} Bot API calls, {errors} error(s)")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from collections import Counter
+from typing import Dict, List
+
+from aiohttp import ClientSession
+
+from config.config import WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET
+from bot.webhook import SECRET_HEADER
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def load_updates(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+
+    if content.startswith("["):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+async def post_updates(url: str, updates: List[Dict], secret_token: str = WEBHOOK_SECRET,
+                       concurrency: int = 1) -> Counter:
+    statuses = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {SECRET_HEADER: secret_token} if secret_token else {}
+
+    async with ClientSession(headers=headers) as session:
+        async def post(update: Dict):
+            async with semaphore:
+                try:
+                    async with session.post(url, json=update) as response:
+                        statuses[response.status] += 1
+                except Exception as e:
+                    logger.error(f"Error posting update {update.get('update_id')}: {e}")
+                    statuses['error'] += 1
+
+        await asyncio.gather(*(post(update) for update in updates))
+    return statuses
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="POST recorded Telegram updates to the webhook endpoint")
+    parser.add_argument("updates", help="JSON array or JSON lines file with updates")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    parser.add_argument("--secret", default=WEBHOOK_SECRET)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    updates = load_updates(args.updates)
+    started = time.perf_counter()
+    statuses = asyncio.run(post_updates(args.url, updates, args.secret, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    logger.info(f"Posted {len(updates)} update(s) in {elapsed:.2f} sec.: {dict(statuses)}")
+    return 0 if statuses.get(200, 0) == len(updates) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import sys
+import logging
+import argparse
+
+from services.database import Database
+from services.aggregates import rebuild_aggregates, verify_aggregates
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the summary tables against raw grades and attendance")
+    parser.add_argument("db", nargs="?", default=None)
+    parser.add_argument("--check", action="store_true", help="only report drift, exit with 1 if found")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db) if args.db else Database()
+    db.init_db()
+    try:
+        mismatched = verify_aggregates(db)
+        if mismatched:
+            logger.error(f"Aggregates do not match raw data: {', '.join(mismatched)}")
+        else:
+            logger.info("Aggregates match raw data")
+
+        if args.check or not mismatched:
+            return 1 if mismatched else 0
+
+        rebuild_aggregates(db)
+        mismatched = verify_aggregates(db)
+    finally:
+        db.shutdown()
+
+    if mismatched:
+        logger.error(f"Aggregates still differ after rebuild: {', '.join(mismatched)}")
+        return 1
+
+    logger.info("Aggregates rebuilt and match raw data")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())